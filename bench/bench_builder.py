@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""server/builder.py 확장성 벤치마크 — 합성 DB를 배수로 키우며 build 시간 측정
+
+세부항목 수 · 기업 수 · 사업장 수를 scale 배로 늘린 합성 trade.db를 임시 폴더에
+만들고 builder._build()를 돌린다. 선형이면 행당 시간(µs/row)이 scale과 무관하게
+평평해야 한다 (예전 구현은 subs × rows, companies × locations × rows로 증가).
+
+    python -m bench.bench_builder                # 기본 scale 1 2 4 8
+    python -m bench.bench_builder 1 4 16 --months 36
+"""
+import os, sys, time, argparse, tempfile, random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.database import init_db, get_connection, ReadPool, read_connection
+from server import builder
+
+
+def make_db(path, scale, months, n_items=16, seed=0):
+    """품목 n_items개 × (세부항목 4·scale, 기업 2·scale × 사업장 2·scale) 합성 DB"""
+    rnd = random.Random(seed)
+    init_db(path)
+    conn = get_connection(path)
+    yms = []
+    y, m = 2020, 1
+    for _ in range(months):
+        yms.append(f"{y}{m:02d}")
+        m += 1
+        if m > 12:
+            m, y = 1, y + 1
+    countries = [f"C{i:02d}" for i in range(20)]
+    conn.executemany("INSERT INTO countries VALUES (?,?)",
+                     [(c, f"국가{c}") for c in countries])
+    conn.execute("INSERT INTO meta VALUES ('period_start', ?)", (yms[0],))
+    conn.execute("INSERT INTO meta VALUES ('period_end', ?)", (yms[-1],))
+
+    td = []
+    for i in range(n_items):
+        hs = f"{9000 + i}"
+        conn.execute("INSERT INTO items VALUES (?,?,?,?)", (hs, f"품목{i}", 1, i))
+        for ym in yms:
+            td.append(("item", hs, "", "", ym, rnd.randint(1, 10**9), 0, 0))
+        for cd in countries[:5]:
+            for ym in yms:
+                td.append(("item_country", hs, "", cd, ym, rnd.randint(1, 10**8), 0, 0))
+        for s in range(4 * scale):
+            scode = f"{hs}{s:06d}"
+            conn.execute("INSERT INTO sub_items VALUES (?,?,?)", (hs, scode, f"세부{s}"))
+            for ym in yms:
+                td.append(("sub_item", hs, scode, "", ym, rnd.randint(1, 10**8), 0,
+                           rnd.randint(0, 10**5)))
+            for cd in countries[:3]:
+                for ym in yms:
+                    td.append(("sub_country", hs, scode, cd, ym,
+                               rnd.randint(1, 10**7), 0, rnd.randint(0, 10**4)))
+        for c in range(2 * scale):
+            ck = f"co{c}"
+            conn.execute("INSERT INTO companies VALUES (?,?,?)", (hs, ck, f"기업{c}"))
+            for l in range(2 * scale):
+                lk = f"loc{l}"
+                conn.execute("INSERT INTO company_locations VALUES (?,?,?,?)",
+                             (hs, ck, lk, f"사업장{l}"))
+                for ym in yms:
+                    td.append(("company_loc", hs, ck, lk, ym, rnd.randint(1, 10**7), 0, 0))
+    conn.executemany("INSERT INTO trade_data VALUES (?,?,?,?,?,?,?,?)", td)
+    conn.commit()
+    conn.close()
+    return len(td)
+
+
+def bench(scale, months, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        rows = make_db(path, scale, months)
+        pool = ReadPool(path)
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            with read_connection(pool) as conn:
+                builder._build(conn)
+            best = min(best, time.perf_counter() - t0)
+        pool.close()
+    return rows, best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("scales", nargs="*", type=int, default=[1, 2, 4, 8])
+    ap.add_argument("--months", type=int, default=24)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'scale':>5} {'rows':>10} {'build(s)':>9} {'µs/row':>7}")
+    for scale in args.scales:
+        rows, sec = bench(scale, args.months, args.repeat)
+        print(f"{scale:>5} {rows:>10,} {sec:>9.3f} {sec / rows * 1e6:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
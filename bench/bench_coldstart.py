@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""서버 콜드 스타트 벤치마크 — 프로세스 시작부터 첫 응답 바이트까지
+
+Render 무료 플랜은 유휴 시 컨테이너를 내리므로 깨어날 때마다 uvicorn import,
+앱 구성, init_db, 첫 요청 처리를 다시 치른다. 경로마다 uvicorn을 새로 띄우고
+(같은 프로세스에서 잰 경로가 다음 경로를 데우지 않게) 응답이 올 때까지 폴링해
+Popen → 첫 바이트 시간을 잰다. import만의 시간도 따로.
+
+    python -m bench.bench_coldstart                       # 기본 경로, 3회 중앙값
+    python -m bench.bench_coldstart --repeat 5 --out bench/coldstart.jsonl
+
+--out을 주면 결과를 JSON 한 줄로 덧붙인다 (커밋·시각 포함 — 추이 추적용).
+"""
+import os, sys, time, json, socket, argparse, statistics, subprocess, http.client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/api/health", "/api/provisional-data", "/"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_byte(port, path, timeout):
+    """응답 상태줄을 받을 때까지 폴링 → (Popen 기준이 아닌) 성공 시각, 상태"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "br, gzip"})
+            resp = conn.getresponse()
+            return time.perf_counter(), resp.status
+        except (ConnectionRefusedError, ConnectionResetError, http.client.RemoteDisconnected):
+            time.sleep(0.01)
+        finally:
+            conn.close()
+    raise TimeoutError(f"{path}: {timeout}s 안에 응답 없음")
+
+
+def cold(path, timeout):
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        t1, status = first_byte(port, path, timeout)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return t1 - t0, status
+
+
+def import_time():
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import server.main"], cwd=ROOT, check=True)
+    return time.perf_counter() - t0
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*", default=PATHS)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=60)
+    ap.add_argument("--out", help="결과를 JSON 한 줄로 덧붙일 파일")
+    args = ap.parse_args()
+
+    results = {"import server.main": statistics.median(
+        import_time() for _ in range(args.repeat))}
+    print(f"{'path':<24} {'median(s)':>9} {'min(s)':>7} {'max(s)':>7} status")
+    print(f"{'import server.main':<24} {results['import server.main']:>9.3f}")
+    for path in args.paths:
+        runs = [cold(path, args.timeout) for _ in range(args.repeat)]
+        secs = [t for t, _ in runs]
+        results[path] = statistics.median(secs)
+        print(f"{path:<24} {results[path]:>9.3f} {min(secs):>7.3f} {max(secs):>7.3f} "
+              f"{runs[-1][1]}")
+
+    if args.out:
+        record = {"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "rev": git_rev(),
+                  "repeat": args.repeat,
+                  "seconds": {k: round(v, 4) for k, v in results.items()}}
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
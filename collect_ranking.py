@@ -4,8 +4,10 @@
 - 4자리 HS 코드로 API 호출 → 6자리 hsCd 추출
 - 이미 수집된 월은 건너뛰고 최신 월만 수집
 - trade_data_v2.json의 "ranking_6d" 키에 저장
+- DB 쓰기는 전용 writer 스레드 하나가 담당 (BatchWriter): 수집 루프는 결과를 큐에 넣기만 하고,
+  writer가 여러 HS4를 한 트랜잭션으로 묶어 행 수·시간 임계치마다 커밋 (WAL + synchronous=NORMAL)
 """
-import os, sys, json, time, io, sqlite3
+import os, sys, json, time, io, queue, sqlite3, threading
 from datetime import datetime
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -145,8 +147,8 @@ def get_existing_months_from_db(conn):
     return {row[0] for row in cur.fetchall()}
 
 
-def save_batch_to_db(conn, batch, country_batch):
-    """수집된 배치 데이터(HS6 합계 + HS6×국가)를 DB에 저장"""
+def save_batch_to_db(conn, batch, country_batch, commit=True):
+    """수집된 배치 데이터(HS6 합계 + HS6×국가)를 DB에 저장 (commit=False면 커밋은 호출자가)"""
     rows = []
     for hs6, info in batch.items():
         name = info.get("name", "")
@@ -172,11 +174,107 @@ def save_batch_to_db(conn, batch, country_batch):
             crows
         )
 
-    if rows or crows:
+    if commit and (rows or crows):
         conn.commit()
     return len(rows), len(crows)
 
 
+class BatchWriter(threading.Thread):
+    """수집 결과 → DB 단일 writer 스레드
+
+    HS4마다 커밋하면 ~1,200번 fsync하고, dict → 행 변환과 INSERT가 수집 루프(as_completed)를
+    막는다. 여기서는 제한 크기 큐로 결과를 받아 한 연결·한 트랜잭션에 쌓다가
+      - 쌓인 행이 max_rows 이상이거나
+      - 첫 미커밋 배치 이후 max_seconds가 지나면
+    커밋한다. WAL + synchronous=NORMAL이라 커밋마다 fsync하지 않고 읽기(main 연결)도 막지 않는다.
+    끝나면(close) 남은 분을 커밋한다. WAL에서 나오려면 다른 연결이 없어야 하므로
+    journal_mode=DELETE 복귀는 호출자(main)가 writer 종료 뒤 자기 연결로 한다.
+    실패하면 미커밋 트랜잭션을 롤백하고 잃은 분량(HS6·행, 큐에 남은 배치)을 출력한다 —
+    rows/crows/hs6는 커밋된 것만 센다.
+    """
+    _STOP = object()
+
+    def __init__(self, db_path, max_rows=50_000, max_seconds=5.0, maxsize=64):
+        super().__init__(name="ranking-writer", daemon=True)
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.rows = self.crows = self.hs6 = self.commits = 0
+        self.error = None
+
+    def put(self, batch, country_batch):
+        """큐가 차 있으면 기다린다 (writer 실패 시 그 예외를 다시 던짐)"""
+        while True:
+            if self.error:
+                raise self.error
+            try:
+                self.queue.put((batch, country_batch), timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self):
+        """남은 배치를 모두 쓰고 스레드 종료까지 대기"""
+        if self.is_alive():
+            self.queue.put(self._STOP)
+            self.join()
+        if self.error:
+            raise self.error
+
+    def _commit(self, conn, rows, crows, hs6):
+        conn.commit()
+        self.commits += 1
+        self.rows += rows
+        self.crows += crows
+        self.hs6 += hs6
+
+    def run(self):
+        conn = sqlite3.connect(self.db_path)
+        p_rows = p_crows = p_hs6 = 0   # 마지막 커밋 이후 (실패 시 롤백되는 분)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            pending, deadline = 0, None
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None         # 시간 임계치
+                if item is self._STOP:
+                    break
+                if item is not None:
+                    batch, country_batch = item
+                    p_hs6 += len(batch)
+                    r, cr = save_batch_to_db(conn, batch, country_batch, commit=False)
+                    p_rows += r
+                    p_crows += cr
+                    pending += r + cr
+                    if pending and deadline is None:
+                        deadline = time.monotonic() + self.max_seconds
+                if pending and (pending >= self.max_rows or time.monotonic() >= deadline):
+                    self._commit(conn, p_rows, p_crows, p_hs6)
+                    p_rows = p_crows = p_hs6 = pending = 0
+                    deadline = None
+            if pending:
+                self._commit(conn, p_rows, p_crows, p_hs6)
+        except Exception as e:
+            conn.rollback()
+            self.error = e
+            # put()이 큐에서 기다리지 않도록 비워 둔다
+            dropped = 0
+            while not self.queue.empty():
+                if self.queue.get_nowait() is not self._STOP:
+                    dropped += 1
+            print(f"  [writer] 실패: {e} — 마지막 커밋 이후 HS6 {p_hs6}개 "
+                  f"(HS6 {p_rows}행 + 국가 {p_crows}행 이상) 롤백, 큐 미기록 배치 {dropped}개 폐기. "
+                  f"커밋 완료분: HS6 {self.hs6}개, {self.rows}행 + 국가 {self.crows}행",
+                  flush=True)
+        finally:
+            conn.close()
+
+
 def export_db_to_json(conn, json_path):
     """DB의 ranking_6d + ranking_6d_country → trade_data_v2.json 머지"""
     cur = conn.execute("SELECT hs_code, ym, name, exp_usd, wgt_kg FROM ranking_6d ORDER BY hs_code, ym")
@@ -306,40 +404,50 @@ def main():
     total = len(hs4_list)
     print(f"\n4자리 HS 코드 {total}개 수집 시작...\n")
 
-    new_count = 0
-    total_rows = 0
-    total_crows = 0
     start_time = time.time()
     WORKERS = int(os.environ.get("WORKERS", "5"))
     print(f"병렬 worker 수: {WORKERS}", flush=True)
+    # 커밋 임계치: 행 수 / 첫 미커밋 배치 이후 초
+    writer = BatchWriter(db_path,
+                         max_rows=int(os.environ.get("WRITER_BATCH_ROWS", "50000")),
+                         max_seconds=float(os.environ.get("WRITER_FLUSH_SECONDS", "5")),
+                         maxsize=WORKERS * 8)
+    writer.start()
 
     def _worker(hs4):
         return hs4, collect_hs4_batch(hs4, API_KEY, date_ranges)
 
     done = 0
-    with ThreadPoolExecutor(max_workers=WORKERS) as ex:
-        futures = {ex.submit(_worker, hs4): hs4 for hs4 in hs4_list}
-        for fut in as_completed(futures):
-            try:
-                hs4_done, (batch, country_batch) = fut.result()
-            except Exception as e:
-                print(f"  [ERR] {futures[fut]}: {e}", flush=True)
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+            futures = {ex.submit(_worker, hs4): hs4 for hs4 in hs4_list}
+            for fut in as_completed(futures):
+                try:
+                    hs4_done, (batch, country_batch) = fut.result()
+                except Exception as e:
+                    print(f"  [ERR] {futures[fut]}: {e}", flush=True)
+                    done += 1
+                    continue
+                if batch or country_batch:
+                    writer.put(batch, country_batch)
                 done += 1
-                continue
-            if batch or country_batch:
-                r, cr = save_batch_to_db(conn, batch, country_batch)
-                total_rows += r
-                total_crows += cr
-                new_count += len(batch)
-            done += 1
-            if done % 100 == 0 or done == total:
-                elapsed = time.time() - start_time
-                pct = done / total * 100
-                eta = elapsed / done * (total - done)
-                print(f"  [{done}/{total}] {pct:.0f}% — {elapsed:.0f}s 경과, 잔여 {eta:.0f}s — HS6 {total_rows}행, 국가 {total_crows}행", flush=True)
+                if done % 100 == 0 or done == total:
+                    elapsed = time.time() - start_time
+                    pct = done / total * 100
+                    eta = elapsed / done * (total - done)
+                    print(f"  [{done}/{total}] {pct:.0f}% — {elapsed:.0f}s 경과, 잔여 {eta:.0f}s — HS6 {writer.rows}행, 국가 {writer.crows}행 기록 (대기 {writer.queue.qsize()})", flush=True)
+    finally:
+        # 중단·실패해도 이미 받은 배치는 커밋, writer가 실패해도 WAL 정리 (-wal/-shm 잔여 없음)
+        try:
+            writer.close()
+        finally:
+            # writer 이전부터 열린 연결은 아직 WAL인 줄 모른다 — 한 번 읽어 헤더를 갱신해야
+            # journal_mode 변경이 실제로 적용된다 (안 그러면 no-op 후 다음 읽기에서 WAL로 복귀)
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            conn.execute("PRAGMA journal_mode=DELETE").fetchall()
 
     elapsed = time.time() - start_time
-    print(f"\n수집 완료: {elapsed:.0f}초, HS6 {total_rows}행 + 국가 {total_crows}행 저장")
+    print(f"\n수집 완료: {elapsed:.0f}초, HS6 {writer.rows}행 + 국가 {writer.crows}행 저장 (커밋 {writer.commits}회)")
 
     # DB → JSON 내보내기
     hs6_count, country_count = export_db_to_json(conn, json_path)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""세대 간 변경분 기록: 직전 세대 trade.db ↔ 새 trade.db.next → trade_changes, changesets
+
+재방문 클라이언트는 IndexedDB에 둔 지난 세대 본체를 /api/trade-data/changes?since=<세대>로
+받은 변경 행만 패치한다 (월간 갱신이면 새 달 한 개 열 + 정정된 행 정도).
+  - trade_data는 PK(data_type, hs_code, sub_code, entity_code, ym) 단위로 비교:
+    새 DB에만 있거나 값(exp/imp/wgt)이 다른 행 = 추가·변경, 옛 DB에만 있는 행 = 삭제
+  - 정의 테이블(items/sub_items/companies/company_locations)이 조금이라도 다르거나
+    사전(countries/regions/ranking_countries, HS6 이름)의 기존 항목 이름이 바뀌면
+    행 패치로 재현할 수 없으므로 full=1 — 새 코드 추가는 응답의 사전으로 충분
+  - total 행과 HS2/HS4 이름은 응답 head에 통째로 실리므로 비교하지 않는다
+
+비교는 ATTACH한 옛 DB와 PK 조인 한 번씩이라 빌드 시간에 수 초.
+변경분은 KEEP_GENERATIONS 세대만 보관 — 그보다 오래된 since는 전체 재다운로드.
+"""
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import DB_PATH
+from server.database import init_db, get_connection
+
+KEEP_GENERATIONS = 12
+
+_KEY = "data_type, hs_code, sub_code, entity_code, ym"
+
+# 어느 쪽이든 다르면 full (구조 자체가 바뀜)
+_DEFINITIONS = ("items", "sub_items", "companies", "company_locations")
+# 기존 코드의 이름이 바뀌었거나 빠졌을 때만 full (새 코드는 패치 응답 사전으로 전달)
+_DICTIONARIES = ("countries", "regions", "ranking_countries",
+                 "(SELECT hs_code, name FROM {db}.hs_names WHERE digits=6)")
+
+
+def _differs(conn, table):
+    """prev.table과 main.table 내용이 다른가 (양방향 EXCEPT)"""
+    return conn.execute(
+        f"SELECT 1 FROM (SELECT * FROM prev.{table} EXCEPT SELECT * FROM main.{table}) "
+        f"UNION ALL "
+        f"SELECT 1 FROM (SELECT * FROM main.{table} EXCEPT SELECT * FROM prev.{table}) "
+        f"LIMIT 1").fetchone() is not None
+
+
+def _renamed(conn, source):
+    """옛 사전 항목 중 새 DB에서 이름이 바뀌었거나 빠진 것이 있는가"""
+    if source.startswith("("):
+        old, new = source.format(db="prev"), source.format(db="main")
+    else:
+        old, new = f"prev.{source}", f"main.{source}"
+    return conn.execute(
+        f"SELECT 1 FROM {old} o LEFT JOIN {new} n ON n.{_code(source)} = o.{_code(source)} "
+        f"WHERE n.name IS NOT o.name LIMIT 1").fetchone() is not None
+
+
+def _code(source):
+    return "hs_code" if "hs_names" in source else "code"
+
+
+def update(gen, prev_path=DB_PATH, db_path=DB_PATH):
+    """db_path(새 세대 gen)에 prev_path(직전 세대) 대비 변경분 기록"""
+    init_db(db_path)
+    conn = get_connection(db_path)
+    base = gen - 1
+    with conn:
+        conn.execute("DELETE FROM trade_changes WHERE generation >= ? OR generation <= ?",
+                     (gen, gen - KEEP_GENERATIONS))
+        conn.execute("DELETE FROM changesets WHERE generation >= ? OR generation <= ?",
+                     (gen, gen - KEEP_GENERATIONS))
+
+    if not os.path.exists(prev_path) or os.path.samefile(prev_path, db_path):
+        with conn:
+            conn.execute("INSERT INTO changesets VALUES (?,?,1,0)", (gen, base))
+        print(f"changeset: 세대 {gen} — 비교할 직전 DB 없음 (전체)")
+        conn.close()
+        return
+
+    conn.execute("ATTACH DATABASE ? AS prev", (prev_path,))
+    try:
+        full = any(_differs(conn, t) for t in _DEFINITIONS) or \
+            any(_renamed(conn, s) for s in _DICTIONARIES)
+        with conn:
+            # 추가·변경: 새 DB 행 기준 PK 조인
+            conn.execute(f"""
+                INSERT INTO trade_changes ({'generation, ' + _KEY})
+                SELECT ?, n.data_type, n.hs_code, n.sub_code, n.entity_code, n.ym
+                FROM main.trade_data n
+                LEFT JOIN prev.trade_data o USING ({_KEY})
+                WHERE n.data_type != 'total'
+                  AND (o.ym IS NULL OR o.exp_usd IS NOT n.exp_usd
+                       OR o.imp_usd IS NOT n.imp_usd OR o.wgt IS NOT n.wgt)""", (gen,))
+            # 삭제: 옛 DB에만 있는 행
+            conn.execute(f"""
+                INSERT INTO trade_changes ({'generation, ' + _KEY})
+                SELECT ?, o.data_type, o.hs_code, o.sub_code, o.entity_code, o.ym
+                FROM prev.trade_data o
+                LEFT JOIN main.trade_data n USING ({_KEY})
+                WHERE o.data_type != 'total' AND n.ym IS NULL""", (gen,))
+            # 새로 ranking_6d에 오른 HS6: 안 바뀐 시군구 행도 (옛 세대엔 목록에서 빠져 있었음)
+            conn.execute(f"""
+                INSERT OR IGNORE INTO trade_changes ({'generation, ' + _KEY})
+                SELECT ?, {_KEY} FROM main.trade_data
+                WHERE data_type='ranking_region' AND hs_code='' AND sub_code IN (
+                    SELECT sub_code FROM main.trade_data
+                    WHERE data_type IN ('ranking', 'ranking_country') AND hs_code=''
+                    EXCEPT
+                    SELECT sub_code FROM prev.trade_data
+                    WHERE data_type IN ('ranking', 'ranking_country') AND hs_code='')""",
+                         (gen,))
+            n = conn.execute("SELECT COUNT(*) FROM trade_changes WHERE generation=?",
+                             (gen,)).fetchone()[0]
+            conn.execute("INSERT INTO changesets VALUES (?,?,?,?)",
+                         (gen, base, int(full), n))
+    finally:
+        conn.execute("DETACH DATABASE prev")
+    print(f"changeset: 세대 {base} → {gen} 변경 {n:,}행"
+          + (" · 정의/사전 변경 (전체)" if full else ""))
+    conn.close()
+
+
+if __name__ == "__main__":
+    # 수동 실행: python -m collector.changeset <세대> <직전 DB> <새 DB>
+    update(int(sys.argv[1]), sys.argv[2], sys.argv[3])
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""국가 역색인 파생: trade_data(ranking_country) → country_totals 테이블
+
+trade.html buildCountryIndex가 국가별 탭을 그리기 전에 브라우저에서
+ranking_6d[hs].countries 전부를 훑어 만들던 국가 → 품목 인덱스를 DB 쪽으로 옮긴다.
+  - 국가 → (HS6, 월별 수출) 조회는 부분 인덱스 idx_trade_country_inv가 담당
+  - 국가별 월 합계·품목 수·순위는 여기서 country_totals로 미리 집계
+    (/api/countries 요약이 월 하나만 인덱스로 읽게)
+
+집계는 SQL 한 번(GROUP BY + RANK 윈도 함수)이라 전체 재계산해도 수십 ms.
+"""
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import DB_PATH
+from server.database import init_db, get_connection
+
+
+def update(db_path=DB_PATH):
+    init_db(db_path)
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("DELETE FROM country_totals")
+        conn.execute("""
+            INSERT INTO country_totals (code, ym, exp_usd, n_items, rank)
+            SELECT entity_code, ym, SUM(exp_usd),
+                   SUM(exp_usd > 0),
+                   RANK() OVER (PARTITION BY ym ORDER BY SUM(exp_usd) DESC)
+            FROM trade_data
+            WHERE data_type='ranking_country' AND hs_code=''
+            GROUP BY entity_code, ym""")
+    n, nc, ymax = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT code), MAX(ym) FROM country_totals").fetchone()
+    print(f"country_totals: 국가 {nc}개 × 월 → {n:,}행 (최신 {ymax})")
+    conn.close()
+
+
+if __name__ == "__main__":
+    update()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""지도 집계 파생: country_totals·region_totals → map_features, map_totals
+
+trade.html 지도 탭(🌍 rMap3D, 🏭 rMapKorea)은 그릴 때마다 브라우저에서
+  - buildMapTotals: 국가별 전 품목 × 전 월을 합산
+  - regionKeyToCanon: 시군구 코드 → RNAMES 짧은이름 → 시도 전체명 → 행정구역 개편 별칭
+  - buildSigunguByCanon: 같은 GeoJSON 피처(canon)로 모이는 지역 합산
+을 했다. 여기서 데이터 코드 → GeoJSON 피처 키 매핑(map_features)과 피처별 월 합계
+(map_totals)를 빌드 때 한 번 만들어 두면 /api/map/*은 월 하나만 인덱스로 읽는다.
+
+피처 키:
+  world  static/country_meta.json의 alpha-3 (world.geo.json feature.id)
+  korea  korea_sgg.geo.json properties.canon ("경기도 화성시") — 도농복합시 자치구는
+         이미 parent canon으로 합쳐져 있어 피처 여러 개가 같은 키를 공유한다
+"""
+import os, sys, json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import BASE_DIR, DB_PATH
+from server.database import init_db, get_connection
+
+COUNTRY_META = os.path.join(BASE_DIR, "static", "country_meta.json")
+KOREA_GEO = os.path.join(BASE_DIR, "static", "korea_sgg.geo.json")
+
+# 데이터 키 ↔ geojson canon 매칭 보조 (행정구역 개편 반영) — trade.html REGION_ALIAS와 같은 표
+REGION_ALIAS = {
+    "경기도 여주군": "경기도 여주시", "경기도 포천군": "경기도 포천시",
+    "인천광역시 미추홀구": "인천광역시 남구", "대구광역시 군위군": "경상북도 군위군",
+    "세종특별자치시": "세종특별자치시 세종시",
+}
+SIDO_SHORT2FULL = {
+    "서울": "서울특별시", "부산": "부산광역시", "대구": "대구광역시", "인천": "인천광역시",
+    "광주": "광주광역시", "대전": "대전광역시", "울산": "울산광역시", "세종": "세종특별자치시",
+    "경기": "경기도", "강원": "강원특별자치도", "충북": "충청북도", "충남": "충청남도",
+    "전북": "전북특별자치도", "전남": "전라남도", "경북": "경상북도", "경남": "경상남도",
+    "제주": "제주특별자치도",
+}
+
+
+def region_canon(code, name, canons):
+    """시군구 코드 → korea_sgg.geo.json canon (매칭 불가면 None)
+
+    코드가 4~5자리 숫자면 regions.name("경기 화성시")의 시도 약칭을 전체명으로 풀고,
+    그 외(이미 "강원특별자치도 강릉시" 같은 전체명)는 코드 그대로 쓴다.
+    GeoJSON에 없는 자치구 단위("충청북도 청주시 흥덕구")는 상위 시 canon으로 올린다."""
+    s = code
+    if code.isdigit() and 4 <= len(code) <= 5:
+        parts = (name or "").split(" ")
+        if len(parts) < 2:
+            return None
+        s = " ".join([SIDO_SHORT2FULL.get(parts[0], parts[0])] + parts[1:])
+    s = REGION_ALIAS.get(s, s)
+    parts = s.split(" ")
+    while len(parts) > 2 and " ".join(parts) not in canons:
+        parts.pop()
+    return " ".join(parts)
+
+
+def update(db_path=DB_PATH):
+    init_db(db_path)
+    conn = get_connection(db_path)
+
+    with open(COUNTRY_META, encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(KOREA_GEO, encoding="utf-8") as f:
+        canons = {ft["properties"]["canon"] for ft in json.load(f)["features"]}
+    rows = [("world", r[0], meta[r[0]]["a3"], "")
+            for r in conn.execute("SELECT DISTINCT code FROM country_totals")
+            if (meta.get(r[0]) or {}).get("a3")]
+    n_world = len(rows)
+    unmatched = []
+    for code, name in conn.execute(
+            "SELECT t.code, r.name FROM (SELECT DISTINCT code FROM region_totals) t "
+            "LEFT JOIN regions r ON r.code = t.code"):
+        canon = region_canon(code, name, canons)
+        if canon is None:
+            unmatched.append(code)
+            continue
+        rows.append(("korea", code, canon, canon.split(" ")[0]))
+
+    with conn:
+        conn.execute("DELETE FROM map_features")
+        conn.executemany("INSERT INTO map_features VALUES (?,?,?,?)", rows)
+        conn.execute("DELETE FROM map_totals")
+        conn.execute("""
+            INSERT INTO map_totals (map, feature, ym, exp_usd)
+            SELECT 'world', f.feature, t.ym, SUM(t.exp_usd)
+            FROM country_totals t
+            JOIN map_features f ON f.map='world' AND f.code=t.code
+            GROUP BY f.feature, t.ym""")
+        conn.execute("""
+            INSERT INTO map_totals (map, feature, ym, exp_usd)
+            SELECT 'korea', f.feature, t.ym, SUM(t.exp_usd)
+            FROM region_totals t
+            JOIN map_features f ON f.map='korea' AND f.code=t.code
+            GROUP BY f.feature, t.ym""")
+    n_tot = conn.execute("SELECT COUNT(*) FROM map_totals").fetchone()[0]
+    n_canon = conn.execute(
+        "SELECT COUNT(DISTINCT feature) FROM map_features WHERE map='korea'").fetchone()[0]
+    print(f"map_features: 국가 {n_world}개, 시군구 {len(rows) - n_world}개 → canon {n_canon}개"
+          f"{f' (매칭 실패 {len(unmatched)}개: {unmatched[:5]})' if unmatched else ''}"
+          f" · map_totals {n_tot:,}행")
+    conn.close()
+
+
+if __name__ == "__main__":
+    update()
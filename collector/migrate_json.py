@@ -13,14 +13,14 @@ from server.config import DB_PATH, JSON_PATH
 from server.database import init_db, get_connection
 
 
-def migrate():
+def migrate(db_path=DB_PATH):
     if not os.path.exists(JSON_PATH):
         print(f"ERROR: {JSON_PATH} 파일 없음")
         sys.exit(1)
 
-    db_existed = os.path.exists(DB_PATH)
-    init_db()
-    conn = get_connection()
+    db_existed = os.path.exists(db_path)
+    init_db(db_path)
+    conn = get_connection(db_path)
     if db_existed:
         pre = conn.execute("SELECT COUNT(*) FROM trade_data").fetchone()[0]
         pre_min, pre_max = conn.execute(
@@ -183,19 +183,35 @@ def migrate():
     print(f"  items {len(d.get('items', {}))}개")
 
     # ── 6) ranking_6d ──
-    rk_count = 0
+    # HS6 합계(exp·wgt) + 국가별 + 시군구별을 모두 trade_data에 적재 →
+    # 서버가 50MB JSON을 메모리에 올리지 않고 DB 커서로 ranking_6d를 스트리밍.
+    # 지역은 item_region과 같은 이유(키 형식 변경 잔존 방지)로 매번 비우고 재적재.
+    conn.execute("DELETE FROM trade_data WHERE data_type='ranking_region'")
+    rk_rows, rk_names, rk_cnames = [], [], {}
     for hs6, rdata in d.get("ranking_6d", {}).items():
         rname = rdata.get("name", "")
         if rname:
-            conn.execute("INSERT OR REPLACE INTO hs_names VALUES (?,?,?)",
-                         (hs6, rname, len(hs6)))
-        for ym, val in rdata.get("exp", {}).items():
-            conn.execute(
-                "INSERT OR REPLACE INTO trade_data VALUES (?,?,?,?,?,?,?,?)",
-                ("ranking", "", hs6, "", ym, val, 0, 0))
-            td_count += 1
-            rk_count += 1
-    print(f"  ranking_6d {len(d.get('ranking_6d', {}))}개 항목, {rk_count}개 데이터포인트")
+            rk_names.append((hs6, rname, len(hs6)))
+        wgt = rdata.get("wgt") or {}
+        for ym, val in (rdata.get("exp") or {}).items():
+            rk_rows.append(("ranking", "", hs6, "", ym, val, 0, wgt.get(ym, 0)))
+        for cd, cdata in (rdata.get("countries") or {}).items():
+            if cdata.get("name"):
+                rk_cnames[cd] = cdata["name"]
+            cwgt = cdata.get("wgt") or {}
+            for ym, val in (cdata.get("exp") or {}).items():
+                rk_rows.append(("ranking_country", "", hs6, cd, ym, val, 0, cwgt.get(ym, 0)))
+        for rk, rv in (rdata.get("regions") or {}).items():
+            for ym, val in (rv.get("exp") or {}).items():
+                rk_rows.append(("ranking_region", "", hs6, rk, ym, val, 0, 0))
+    conn.executemany("INSERT OR REPLACE INTO hs_names VALUES (?,?,?)", rk_names)
+    conn.executemany("INSERT OR REPLACE INTO ranking_countries VALUES (?,?)",
+                     list(rk_cnames.items()))
+    conn.executemany(
+        "INSERT OR REPLACE INTO trade_data VALUES (?,?,?,?,?,?,?,?)", rk_rows)
+    td_count += len(rk_rows)
+    print(f"  ranking_6d {len(d.get('ranking_6d', {}))}개 항목, {len(rk_rows)}개 데이터포인트 "
+          f"(국가·시군구 포함)")
 
     conn.commit()
 
@@ -209,7 +225,7 @@ def migrate():
     for row in conn.execute(
             "SELECT data_type, COUNT(*) as cnt FROM trade_data GROUP BY data_type ORDER BY cnt DESC"):
         print(f"  {row['data_type']:15s} {row['cnt']:>8,}")
-    print(f"DB 파일 크기: {os.path.getsize(DB_PATH):,} bytes")
+    print(f"DB 파일 크기: {os.path.getsize(db_path):,} bytes")
 
     conn.close()
 
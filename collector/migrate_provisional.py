@@ -10,8 +10,14 @@
   - leaf c·a는 전 레코드 존재, v·w는 일부만 → 부재키는 NULL (0 채우기 금지)
   - 품목 순서(탭)·국가 순서(섹션 버튼)는 프론트가 Object.keys 순서에 의존 → sort_order로 보존
   - ym·cut 순서는 프론트가 항상 정렬하므로 무관
+
+증분 동작:
+  - 원본 파일 sha256을 meta.prov_source_sha256에 저장 → 같으면 재구축 생략
+  - 바뀌었으면 품목별 해시(meta.prov_item_hashes)를 비교해 변경 품목만 재작성
+  - 전 과정 단일 트랜잭션 + executemany 일괄 적재
+  - `--force`로 해시 무시하고 전체 재구축
 """
-import os, sys, json
+import os, sys, json, hashlib
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from server.config import DB_PATH, PROV_JSON_PATH
@@ -23,46 +29,93 @@ def _num(x):
     return x if isinstance(x, (int, float)) else None
 
 
-def migrate():
-    if not os.path.exists(PROV_JSON_PATH):
-        print(f"ERROR: {PROV_JSON_PATH} 파일 없음")
-        sys.exit(1)
+def _item_hash(iv):
+    """품목 단위 내용 해시. 국가 순서도 의미가 있으므로 키 정렬하지 않는다."""
+    raw = json.dumps(iv, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    init_db()
-    conn = get_connection()
 
-    # prov 테이블은 매 빌드 전체 재구축 (정적 JSON이 단일 진실원본)
-    conn.execute("DELETE FROM prov_data")
-    conn.execute("DELETE FROM prov_countries")
-    conn.execute("DELETE FROM prov_items")
+def _item_rows(ikey, iv):
+    """품목 1개 → (prov_countries 행, prov_data 행)"""
+    c_rows, d_rows = [], []
+    for c_order, (country, cv) in enumerate(iv.get("s", {}).items()):
+        c_rows.append((ikey, country, c_order))
+        for ym, ymv in cv.items():
+            for cut, leaf in ymv.items():
+                d_rows.append(
+                    (ikey, country, ym, cut,
+                     _num(leaf.get("c")), _num(leaf.get("v")),
+                     _num(leaf.get("w")), _num(leaf.get("a"))))
+    return c_rows, d_rows
 
-    with open(PROV_JSON_PATH, "r", encoding="utf-8") as f:
-        d = json.load(f)
-    print(f"JSON 로드 완료: {os.path.getsize(PROV_JSON_PATH):,} bytes, 품목 {len(d)}개")
 
-    n_items = n_countries = n_data = 0
-    for item_order, (ikey, iv) in enumerate(d.items()):
-        conn.execute(
+def migrate(force=False, db_path=DB_PATH):
+    if not os.path.exists(PROV_JSON_PATH):
+        print(f"ERROR: {PROV_JSON_PATH} 파일 없음")
+        sys.exit(1)
+
+    with open(PROV_JSON_PATH, "rb") as f:
+        raw = f.read()
+    src_hash = hashlib.sha256(raw).hexdigest()
+
+    init_db(db_path)
+    conn = get_connection(db_path)
+    meta = {r["key"]: r["value"] for r in conn.execute(
+        "SELECT key, value FROM meta WHERE key IN "
+        "('prov_source_sha256', 'prov_item_hashes')")}
+
+    if not force and meta.get("prov_source_sha256") == src_hash:
+        print(f"provisional_data.json 변경 없음 (sha256 {src_hash[:12]}) → 재구축 생략")
+        conn.close()
+        return
+
+    d = json.loads(raw.decode("utf-8"))
+    print(f"JSON 로드 완료: {len(raw):,} bytes, 품목 {len(d)}개")
+
+    # 품목 해시 이력이 없으면(첫 실행·구버전 DB) 전체 재구축
+    full = force or "prov_item_hashes" not in meta
+    old_hashes = {} if full else json.loads(meta["prov_item_hashes"])
+    new_hashes = {ikey: _item_hash(iv) for ikey, iv in d.items()}
+    changed = [k for k in d if old_hashes.get(k) != new_hashes[k]]
+    removed = [k for k in old_hashes if k not in d]
+
+    n_countries = n_data = 0
+    # 단일 트랜잭션: 중간 실패 시 이전 상태 그대로 (서버는 반쯤 지워진 prov_*를 보지 않음)
+    with conn:
+        if full:
+            # 해시 이력 밖의 옛 행까지 정리
+            conn.execute("DELETE FROM prov_data")
+            conn.execute("DELETE FROM prov_countries")
+            conn.execute("DELETE FROM prov_items")
+        for ikey in changed + removed:
+            conn.execute("DELETE FROM prov_data WHERE item_key=?", (ikey,))
+            conn.execute("DELETE FROM prov_countries WHERE item_key=?", (ikey,))
+        if removed:
+            conn.executemany("DELETE FROM prov_items WHERE item_key=?",
+                             [(k,) for k in removed])
+
+        # 품목 행은 수십 개뿐 → 탭 순서(sort_order) 변동까지 반영하도록 매번 전부 upsert
+        conn.executemany(
             "INSERT OR REPLACE INTO prov_items VALUES (?,?,?,?,?)",
-            (ikey, iv.get("h", ""), iv.get("d", ""), iv.get("u", ""), item_order))
-        n_items += 1
-
-        for c_order, (country, cv) in enumerate(iv.get("s", {}).items()):
-            conn.execute(
-                "INSERT OR REPLACE INTO prov_countries VALUES (?,?,?)",
-                (ikey, country, c_order))
-            n_countries += 1
-
-            for ym, ymv in cv.items():
-                for cut, leaf in ymv.items():
-                    conn.execute(
-                        "INSERT OR REPLACE INTO prov_data VALUES (?,?,?,?,?,?,?,?)",
-                        (ikey, country, ym, cut,
-                         _num(leaf.get("c")), _num(leaf.get("v")),
-                         _num(leaf.get("w")), _num(leaf.get("a"))))
-                    n_data += 1
-
-    conn.commit()
+            [(ikey, iv.get("h", ""), iv.get("d", ""), iv.get("u", ""), item_order)
+             for item_order, (ikey, iv) in enumerate(d.items())])
+
+        for ikey in changed:
+            c_rows, d_rows = _item_rows(ikey, d[ikey])
+            conn.executemany(
+                "INSERT OR REPLACE INTO prov_countries VALUES (?,?,?)", c_rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO prov_data VALUES (?,?,?,?,?,?,?,?)", d_rows)
+            n_countries += len(c_rows)
+            n_data += len(d_rows)
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?,?)",
+            [("prov_source_sha256", src_hash),
+             ("prov_item_hashes", json.dumps(new_hashes, ensure_ascii=False))])
+
+    print(f"변경 품목 {len(changed)}개 재작성 (국가 {n_countries:,}, leaf {n_data:,}), "
+          f"삭제 품목 {len(removed)}개, 유지 {len(d) - len(changed)}개")
 
     # ── 검증 요약 ──
     post_items = conn.execute("SELECT COUNT(*) FROM prov_items").fetchone()[0]
@@ -78,9 +131,9 @@ def migrate():
     print(f"prov_data      {post_data:>6,}  ({ymin}~{ymax})")
     print(f"비-NULL leaf    c={nonnull['c']:,} v={nonnull['v']:,} "
           f"w={nonnull['w']:,} a={nonnull['a']:,}")
-    print(f"DB 파일 크기: {os.path.getsize(DB_PATH):,} bytes")
+    print(f"DB 파일 크기: {os.path.getsize(db_path):,} bytes")
     conn.close()
 
 
 if __name__ == "__main__":
-    migrate()
+    migrate(force="--force" in sys.argv[1:])
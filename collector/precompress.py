@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""정적 HTML/JSON/GeoJSON → .gz / .br 사이드카 사전 압축
+
+서버는 요청마다 압축하지 않고 Accept-Encoding에 맞는 사이드카를 그대로 스트리밍한다
+(server/precompressed.py). 무료 티어의 CPU·대역폭을 아끼려고 빌드 시 최대 압축:
+  - gzip level 9
+  - brotli quality 11, lgwin 24 (brotli 패키지가 없으면 .br 생략)
+원본보다 오래된 사이드카는 서버가 무시하므로 원본만 바뀐 채 방치돼도 안전하다.
+
+Dockerfile에서 COPY 직후 `python -m collector.precompress`로 실행.
+"""
+import os, sys, gzip, shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import BASE_DIR
+
+try:
+    import brotli
+except ImportError:     # 로컬 개발 환경 — gzip만 생성
+    brotli = None
+
+# 서버가 FileResponse로 내보내는 정적 페이지·데이터 파일
+STATIC_TARGETS = [
+    "trade.html",
+    "provisional.html",
+    "trade_data_v2.json",
+    "provisional_data.json",
+    "confirmed_companies.json",
+    "business_days.json",
+]
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+CHUNK = 1 << 20
+
+
+def compress_file(path):
+    """path.gz, path.br 생성 (임시 파일 → rename). (원본, gz, br) 바이트 수 반환."""
+    sizes = [os.path.getsize(path), None, None]
+
+    tmp = path + ".gz.tmp"
+    with open(path, "rb") as src, open(tmp, "wb") as raw:
+        # mtime=0: 같은 입력이면 같은 바이트 (재빌드 간 ETag·캐시 안정)
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as gz:
+            shutil.copyfileobj(src, gz, CHUNK)
+    os.replace(tmp, path + ".gz")
+    sizes[1] = os.path.getsize(path + ".gz")
+
+    if brotli is not None:
+        tmp = path + ".br.tmp"
+        comp = brotli.Compressor(quality=11, lgwin=24)
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            while True:
+                chunk = src.read(CHUNK)
+                if not chunk:
+                    break
+                dst.write(comp.process(chunk))
+            dst.write(comp.finish())
+        os.replace(tmp, path + ".br")
+        sizes[2] = os.path.getsize(path + ".br")
+    return sizes
+
+
+def main():
+    targets = [os.path.join(BASE_DIR, n) for n in STATIC_TARGETS]
+    targets += sorted(os.path.join(STATIC_DIR, n) for n in os.listdir(STATIC_DIR)
+                      if n.endswith(".json"))
+    if brotli is None:
+        print("brotli 패키지 없음 → .br 생략 (gzip만)")
+    for path in targets:
+        if not os.path.exists(path):
+            print(f"  건너뜀 (없음): {os.path.relpath(path, BASE_DIR)}")
+            continue
+        raw, gz, br = compress_file(path)
+        br_s = f"br {br:>11,}" if br is not None else "br          -"
+        print(f"  {os.path.relpath(path, BASE_DIR):32s} {raw:>11,} → gz {gz:>11,} · {br_s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""HS6 랭킹 지표 사전 계산: trade_data(ranking) → ranking_metrics 테이블
+
+trade.html의 rRanking이 렌더·정렬 변경 때마다 HS6 5천여 개 전부에 대해 하던 계산
+(수출 MoM/YoY, 단가 시계열, 단가 중앙값 기준 1/6~6배 이상치 제외, 단가 MoM/YoY)을
+빌드 때 한 번만 해 (hs6, ym) 행으로 저장한다. /api/ranking은 (ym, exp_usd)
+인덱스로 해당 월만 읽어 정렬한다 (server/ranking.py).
+
+증분 동작:
+  - 입력(exp_usd, wgt)을 지표와 함께 저장해 두고 trade_data의 ranking 행과 비교
+  - 월이 추가·변경·삭제된 HS6만 재계산 (단가 중앙값이 HS6의 전체 월에 걸려 있어
+    한 달만 바뀌어도 이상치 경계가 움직이므로 HS6 단위로 통째로)
+  - 단일 트랜잭션 + executemany 일괄 적재
+"""
+import os, sys
+from itertools import groupby
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import DB_PATH
+from server.database import init_db, get_connection
+from server.months import prev_month, year_ago, change
+
+# 단가 이상치 경계: HS6 단가 중앙값의 [1/PRICE_BAND, PRICE_BAND]배 (중량 오보 차단)
+PRICE_BAND = 6
+
+
+def _prices(exp, wgt):
+    """단가(USD/kg) 시계열 — 중앙값(짝수 개면 아래쪽) 기준 이상치 월 제외"""
+    raw = {ym: e / wgt[ym] for ym, e in exp.items()
+           if (wgt.get(ym) or 0) > 0 and e > 0}
+    if not raw:
+        return {}
+    pv = sorted(raw.values())
+    med = pv[(len(pv) - 1) // 2]
+    return {ym: p for ym, p in raw.items()
+            if med / PRICE_BAND <= p <= med * PRICE_BAND}
+
+
+def metric_rows(hs6, series):
+    """series: [(ym, exp_usd, wgt)] → ranking_metrics 행들"""
+    exp = {ym: e for ym, e, _ in series}
+    wgt = {ym: w for ym, _, w in series}
+    price = _prices(exp, wgt)
+    rows = []
+    for ym, e, w in series:
+        pm, py = prev_month(ym), year_ago(ym)
+        rows.append((hs6, ym, e, w,
+                     change(exp, ym, pm), change(exp, ym, py),
+                     price.get(ym),
+                     change(price, ym, pm), change(price, ym, py)))
+    return rows
+
+
+def _series(cursor):
+    """(hs6, ym, exp, wgt) 정렬 커서 → {hs6: ((ym, exp, wgt), ...)}"""
+    return {hs6: tuple((r[1], r[2] or 0, r[3] or 0) for r in grp)
+            for hs6, grp in groupby(cursor, key=lambda r: r[0])}
+
+
+def update(full=False, db_path=DB_PATH):
+    init_db(db_path)
+    conn = get_connection(db_path)
+
+    src = _series(conn.execute(
+        "SELECT sub_code, ym, exp_usd, wgt FROM trade_data "
+        "WHERE data_type='ranking' AND hs_code='' ORDER BY sub_code, ym"))
+    old = {} if full else _series(conn.execute(
+        "SELECT hs6, ym, exp_usd, wgt FROM ranking_metrics ORDER BY hs6, ym"))
+
+    changed = [hs6 for hs6, s in src.items() if old.get(hs6) != s]
+    removed = [hs6 for hs6 in old if hs6 not in src]
+
+    with conn:
+        if full:
+            conn.execute("DELETE FROM ranking_metrics")
+        conn.executemany("DELETE FROM ranking_metrics WHERE hs6=?",
+                         [(h,) for h in changed + removed])
+        rows = [row for hs6 in changed for row in metric_rows(hs6, src[hs6])]
+        conn.executemany(
+            "INSERT INTO ranking_metrics VALUES (?,?,?,?,?,?,?,?,?)", rows)
+
+    total = conn.execute("SELECT COUNT(*) FROM ranking_metrics").fetchone()[0]
+    print(f"ranking_metrics: HS6 {len(changed)}개 재계산 ({len(rows):,}행), "
+          f"삭제 {len(removed)}개, 유지 {len(src) - len(changed)}개 → 총 {total:,}행")
+    conn.close()
+
+
+if __name__ == "__main__":
+    update(full="--full" in sys.argv[1:])
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""trade.db blue/green 갱신: 새 DB 파일을 빌드한 뒤 rename으로 원자 교체
+
+기존엔 migrate_json / migrate_provisional이 서비스 중인 trade.db를 제자리에서
+고쳤다. 여기서는:
+  1) 현재 trade.db를 trade.db.next로 복사 (누적 머지 의미 유지 — sqlite backup API)
+  2) trade.db.next에 migrate_json → migrate_provisional 적용, 파생 테이블
+     (ranking_metrics, country_totals, region_items/region_totals) 갱신
+  3) 현재 trade.db 대비 변경분(trade_changes) 기록, meta.generation +1,
+     journal_mode=DELETE로 정리 (-wal/-shm 잔여 없음)
+  4) 새 DB로 세대 산출물(dist/g<세대>/ — 확정치 전체 JSON, 본체 core.json,
+     HS2별 ranking/<hs2>.json, 각각의 v2-compact판 *.compact.json, 모두 .gz/.br) 생성
+  5) os.replace(trade.db.next, trade.db) — 같은 파일시스템 안 rename이라 원자적
+  6) 두 세대 이전 산출물 폴더 정리 (옛 세대를 서빙 중인 서버용으로 직전 세대는 보존)
+
+서빙 중인 서버는 옛 inode를 잡은 커넥션으로 계속 옛 세대를 응답하고,
+server/generation.py가 새 세대를 감지해 캐시를 데운 뒤 넘어간다.
+Dockerfile 빌드와 컨테이너 안 수동 갱신 모두 이 스크립트 하나로 처리.
+"""
+import os, sys, json, shutil, sqlite3
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import DB_PATH, ARTIFACT_DIR
+from server.database import get_connection, ReadPool
+from server import artifacts, compact
+from server.provisional_builder import build_provisional_json
+from server.summary import build_summary
+from server.builder import (write_full_json, build_core_json,
+                            build_ranking_shard)
+from collector import (migrate_json, migrate_provisional, ranking_metrics,
+                       country_index, region_index, map_index, changeset)
+from collector.precompress import compress_file
+
+NEXT_PATH = DB_PATH + ".next"
+
+
+def _remove(path):
+    for p in (path, path + "-wal", path + "-shm", path + "-journal"):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def _current_generation():
+    if not os.path.exists(DB_PATH):
+        return 0
+    conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    try:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key='generation'").fetchone()
+    except sqlite3.OperationalError:   # meta 테이블 없는 빈 DB
+        row = None
+    conn.close()
+    return int(row[0]) if row else 0
+
+
+def _release_legacy_wal():
+    """제자리 갱신 시절(WAL 모드) trade.db의 -wal을 정리.
+
+    SQLite는 DB 헤더와 무관하게 같은 이름의 -wal 파일이 있으면 WAL로 연다 →
+    교체 후 새 DB가 옛 WAL 프레임을 읽지 않도록 rename 전에 체크포인트한다.
+    읽는 프로세스가 잡고 있으면 실패하므로 그때는 교체를 중단한다."""
+    if not os.path.exists(DB_PATH + "-wal"):
+        return
+    conn = sqlite3.connect(DB_PATH, timeout=5)
+    try:
+        mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+    finally:
+        conn.close()
+    if mode != "delete" or os.path.exists(DB_PATH + "-wal"):
+        print("ERROR: 현재 trade.db의 WAL을 정리하지 못함 (사용 중) — 교체 중단")
+        sys.exit(1)
+
+
+def _build_artifacts(gen):
+    out = artifacts.artifact_dir(gen)
+    if os.path.exists(out):
+        shutil.rmtree(out)
+    os.makedirs(out)
+    pool = ReadPool(NEXT_PATH)
+    try:
+        write_full_json(artifacts.artifact_path(gen, artifacts.TRADE_DATA), pool)
+        _report(gen, artifacts.TRADE_DATA)
+        name = artifacts.compact(artifacts.TRADE_DATA)
+        _write_chunks(artifacts.artifact_path(gen, name), compact.iter_compact_json(pool))
+        _report(gen, name)
+
+        _write_json(artifacts.artifact_path(gen, artifacts.SUMMARY), build_summary(pool))
+        _report(gen, artifacts.SUMMARY)
+        _write_json(artifacts.artifact_path(gen, artifacts.PROVISIONAL),
+                    build_provisional_json(pool))
+        _report(gen, artifacts.PROVISIONAL)
+
+        core = build_core_json(pool)
+        for name, obj in ((artifacts.CORE, core),
+                          (artifacts.compact(artifacts.CORE), compact.encode(core))):
+            _write_json(artifacts.artifact_path(gen, name), obj)
+            _report(gen, name)
+
+        os.makedirs(os.path.join(out, "ranking"))
+        totals = {"json": [0, 0], "compact": [0, 0]}
+        for hs2 in core["ranking_shards"]:
+            shard = build_ranking_shard(hs2, pool)
+            name = artifacts.ranking_shard(hs2)
+            for fmt, path, obj in (
+                    ("json", artifacts.artifact_path(gen, name), shard),
+                    ("compact", artifacts.artifact_path(gen, artifacts.compact(name)),
+                     compact.encode(shard))):
+                _write_json(path, obj)
+                raw, gz, _ = compress_file(path)
+                totals[fmt][0] += raw
+                totals[fmt][1] += gz
+        for fmt, (raw, gz) in totals.items():
+            print(f"  ranking/*.{'compact.' if fmt == 'compact' else ''}json: "
+                  f"{len(core['ranking_shards'])}개 샤드 {raw:,} → gz {gz:,}")
+    finally:
+        pool.close()
+
+
+def _write_chunks(path, chunks):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp, path)
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _report(gen, name):
+    raw, gz, br = compress_file(artifacts.artifact_path(gen, name))
+    print(f"  {name}: {raw:,} → gz {gz:,}"
+          + (f" · br {br:,}" if br is not None else ""))
+
+
+def _prune_artifacts(gen):
+    if not os.path.isdir(ARTIFACT_DIR):
+        return
+    for name in os.listdir(ARTIFACT_DIR):
+        if name.startswith("g") and name[1:].isdigit() and int(name[1:]) < gen - 1:
+            shutil.rmtree(os.path.join(ARTIFACT_DIR, name))
+
+
+def refresh():
+    _remove(NEXT_PATH)
+    gen = _current_generation() + 1
+
+    if os.path.exists(DB_PATH):
+        src = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True)
+        dst = sqlite3.connect(NEXT_PATH)
+        src.backup(dst)
+        src.close()
+        dst.close()
+        print(f"현재 trade.db → {os.path.basename(NEXT_PATH)} 복사 "
+              f"({os.path.getsize(NEXT_PATH):,} bytes)")
+
+    migrate_json.migrate(db_path=NEXT_PATH)
+    migrate_provisional.migrate(db_path=NEXT_PATH)
+    ranking_metrics.update(db_path=NEXT_PATH)
+    country_index.update(db_path=NEXT_PATH)
+    region_index.update(db_path=NEXT_PATH)
+    map_index.update(db_path=NEXT_PATH)
+
+    changeset.update(gen, prev_path=DB_PATH, db_path=NEXT_PATH)
+
+    conn = get_connection(NEXT_PATH)
+    conn.executemany("INSERT OR REPLACE INTO meta VALUES (?,?)", [
+        ("generation", str(gen)),
+        ("generation_built_at", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    ])
+    conn.commit()
+    # 서빙 파일은 rollback 저널 모드로 — 읽기 전용 서버가 -wal/-shm을 만들지 않게
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.close()
+
+    print(f"\n세대 {gen} 산출물 생성 ({os.path.relpath(artifacts.artifact_dir(gen))})")
+    _build_artifacts(gen)
+
+    _release_legacy_wal()
+    os.replace(NEXT_PATH, DB_PATH)
+    _prune_artifacts(gen)
+    print(f"\n=== trade.db 교체 완료: generation {gen} ===")
+
+
+if __name__ == "__main__":
+    refresh()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""시군구 역색인 파생: item_region + ranking_region → region_items, region_totals
+
+trade.html buildRegionIndex가 브라우저에서 하던 일을 빌드 때 한 번만:
+  1) 지역별로 메인 품목 HS(items[*].regions)와 HS6(ranking_6d[*].regions)를 합침
+     — 같은 코드면 메인 품목 쪽을 씀
+  2) 같은 지역 안에서 다른 코드의 상위(prefix) 코드는 제외 (예: 854232가 있으면 8542 제외)
+     브라우저는 코드마다 지역 내 다른 코드 전부와 startsWith 비교(지역당 O(n²))였다.
+     여기서는 지역 코드들의 모든 상위 코드 집합(HS 계층: 10→6→4→2자리 …)을 한 번 만들고
+     그 집합에 든 코드만 빼므로 O(n × 코드 길이).
+  3) 지역·월별 합계·품목 수·순위 → region_totals
+
+builder.py와 같은 범위만 본다: 메인 품목은 items에 있는 HS, HS6는 합계나 국가 행이
+있는 것 (시군구 행만 있는 HS6는 ranking_6d에 안 나가므로 제외).
+"""
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.config import DB_PATH
+from server.database import init_db, get_connection
+
+
+def dedup_prefixes(codes):
+    """다른 코드의 상위(prefix) 코드를 뺀 집합"""
+    parents = {c[:k] for c in codes for k in range(1, len(c))}
+    return {c for c in codes if c not in parents}
+
+
+def update(db_path=DB_PATH):
+    init_db(db_path)
+    conn = get_connection(db_path)
+
+    by_region = {}   # region → {hs: src}
+    for r in conn.execute(
+            "SELECT DISTINCT t.entity_code, t.hs_code FROM trade_data t "
+            "JOIN items i ON i.hs_code = t.hs_code "
+            "WHERE t.data_type='item_region'"):
+        by_region.setdefault(r[0], {})[r[1]] = "item"
+    for r in conn.execute(
+            "SELECT DISTINCT entity_code, sub_code FROM trade_data "
+            "WHERE data_type='ranking_region' AND hs_code='' AND sub_code IN ("
+            "  SELECT sub_code FROM trade_data "
+            "  WHERE data_type IN ('ranking', 'ranking_country') AND hs_code='')"):
+        by_region.setdefault(r[0], {}).setdefault(r[1], "ranking")
+
+    rows, dropped = [], 0
+    for region, codes in by_region.items():
+        keep = dedup_prefixes(codes)
+        dropped += len(codes) - len(keep)
+        rows.extend((region, hs, codes[hs]) for hs in sorted(keep))
+
+    with conn:
+        conn.execute("DELETE FROM region_items")
+        conn.executemany("INSERT INTO region_items VALUES (?,?,?)", rows)
+        conn.execute("DELETE FROM region_totals")
+        conn.execute("""
+            INSERT INTO region_totals (code, ym, exp_usd, n_items, rank)
+            SELECT region, ym, SUM(exp_usd), SUM(exp_usd > 0),
+                   RANK() OVER (PARTITION BY ym ORDER BY SUM(exp_usd) DESC)
+            FROM region_series
+            GROUP BY region, ym""")
+    n_tot = conn.execute("SELECT COUNT(*) FROM region_totals").fetchone()[0]
+    print(f"region_items: 지역 {len(by_region)}개, 품목 {len(rows):,}개 "
+          f"(상위 코드 중복 {dropped}개 제외) · region_totals {n_tot:,}행")
+    conn.close()
+
+
+if __name__ == "__main__":
+    update()
@@ -5,15 +5,15 @@
 - 2개 API 엔드포인트 사용:
   1) /nitemtrade/getNitemtradeList — 품목별 국가별 수출입 (품목 총계 + 국가별 동시 수집)
   2) /sigunguperprlstperacrs/getSigunguPerPrlstPerAcrs — 시군구별 품목별 수출입
-- trade.html의 DEMO 데이터를 실제 데이터로 교체
+- DEMO 폴백 자산(static/demo.v1.json.gz) 갱신
 - trade_data_v2.json 별도 저장
 """
 
 import os
 import sys
+import gzip
 import json
 import time
-import re
 from datetime import datetime
 from urllib.parse import urlencode
 from urllib.request import urlopen, Request
@@ -780,29 +780,24 @@ def merge_with_existing(new_data, json_path):
     return out
 
 
-def update_html(data, html_path="trade.html"):
-    """trade.html의 DEMO 데이터를 실제 데이터로 교체"""
-    if not os.path.exists(html_path):
-        print(f"[WARN] {html_path} 파일을 찾을 수 없습니다.", file=sys.stderr)
-        return False
-
-    with open(html_path, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    json_str = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
-    new_line = f"const DEMO={json_str};"
-
-    pattern = r"const DEMO=\{.*?\};"
-    if re.search(pattern, content):
-        content = re.sub(pattern, new_line, content)
-    else:
-        print("[WARN] 'const DEMO=...' 패턴을 찾을 수 없습니다.", file=sys.stderr)
-        return False
-
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(content)
-
-    print(f"[OK] {html_path} 업데이트 완료")
+# trade.html이 API·정적 JSON 모두 실패했을 때만 받는 DEMO 폴백 자산.
+# 이름의 v1은 형식 버전 — 구조가 바뀌면 올리고 trade.html의 DEMO_URL도 같이 바꾼다.
+DEMO_ASSET = os.path.join("static", "demo.v1.json.gz")
+# ranking_6d, hs2_names, hs4_names는 DEMO에서 제외 (별도 fetch로 로드)
+DEMO_EXCLUDE = {"ranking_6d", "hs2_names", "hs4_names"}
+
+
+def write_demo(data, demo_path=DEMO_ASSET):
+    """DEMO 폴백 데이터를 gzip JSON 자산으로 저장 (trade.html 재작성 없음)"""
+    demo = {k: v for k, v in data.items() if k not in DEMO_EXCLUDE}
+    body = json.dumps(demo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(demo_path) or ".", exist_ok=True)
+    tmp = demo_path + ".tmp"
+    # mtime=0: 같은 데이터면 같은 바이트 (커밋 diff·ETag 안정)
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    os.replace(tmp, demo_path)
+    print(f"[OK] {demo_path} 저장 완료 ({len(body):,} → {os.path.getsize(demo_path):,} bytes)")
     return True
 
 
@@ -846,9 +841,8 @@ def main():
         json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
     print(f"[OK] {json_path} 저장 완료 ({os.path.getsize(json_path):,} bytes)")
 
-    # HTML 업데이트 (머지 결과 임베드)
-    html_path = os.path.join(script_dir, "trade.html")
-    update_html(data, html_path)
+    # DEMO 폴백 자산 (머지 결과)
+    write_demo(data, os.path.join(script_dir, DEMO_ASSET))
 
     print(f"\n완료 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
@@ -0,0 +1,42 @@
+"""데이터 세대별 빌드 산출물 경로 (dist/g<세대>/<이름>)
+
+collector.refresh가 새 DB로 교체하기 직전에 그 DB에서 무거운 응답을 미리 만들어
+(+ .gz/.br 사이드카) 세대 폴더에 둔다. 서버는 현재 세대 폴더에 파일이 있으면
+그걸 그대로 스트리밍하고, 없으면 DB에서 직접 만든다.
+"""
+import os
+from .config import ARTIFACT_DIR
+
+# 확정치 전체 (/api/trade-data) — builder.write_full_json 결과
+TRADE_DATA = "trade-data.json"
+# 분할 로드 (/api/trade-data/core, /api/ranking/shard/{hs2})
+CORE = "core.json"
+# 잠정치 전체 (/api/provisional-data) — 콜드 스타트 첫 요청이 빌드를 기다리지 않게
+PROVISIONAL = "provisional.json"
+# 첫 화면 요약 (/api/summary) — server/summary.py
+SUMMARY = "summary.json"
+
+
+def ranking_shard(hs2) -> str:
+    return f"ranking/{hs2}.json"
+
+
+def compact(name) -> str:
+    """같은 산출물의 v2-compact판 (server/compact.py) — core.json → core.compact.json"""
+    return name[:-len(".json")] + ".compact.json"
+
+
+def artifact_dir(gen) -> str:
+    return os.path.join(ARTIFACT_DIR, f"g{gen}")
+
+
+def artifact_path(gen, name) -> str:
+    return os.path.join(artifact_dir(gen), name)
+
+
+def existing_artifact(gen, name):
+    """현재 세대 산출물 경로, 없으면 None"""
+    if gen is None:
+        return None
+    path = artifact_path(gen, name)
+    return path if os.path.exists(path) else None
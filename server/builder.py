@@ -1,29 +1,139 @@
-"""DB에서 trade.html이 기대하는 JSON 구조 재조립"""
+"""DB에서 trade.html이 기대하는 JSON 구조 재조립
+
+두 가지 출력:
+  - build_full_json(): 전체를 dict로 (소규모·검증용)
+  - iter_full_json():  같은 구조를 DB 커서로 훑으며 JSON 조각(bytes)으로 흘려보냄.
+    한 번에 품목 1개 / HS6 1개 분량만 메모리에 두므로, 월이 쌓여도
+    최대 메모리가 일정하다 (예전 dict 조립 + 인메모리 직렬화는 512MB에서 OOM).
+    StreamingResponse와 write_full_json() 파일 저장이 같은 제너레이터를 쓴다.
+  - spooled(chunks): 응답용 — 조각을 임시 파일에 먼저 다 받아 커넥션을 반납한 뒤
+    파일에서 흘려보냄. 느린 클라이언트가 풀 커넥션을 붙잡지 않는다.
+
+분할 로드용:
+  - build_core_json():       ranking_6d를 뺀 본체 + ranking_shards {HS2: HS6 수} + generation
+  - build_ranking_shard(hs2): 해당 HS2로 시작하는 ranking_6d 조각
+
+모두 proj(server/projection.py)를 받는다: 월 범위·품목은 SQL 조건으로,
+fields에 없는 시계열 키는 조립 후 생략. 품목 제한은 items의 HS 코드이고
+ranking_6d에는 그 코드(앞 6자리)로 시작하는 HS6만 남긴다.
+"""
 import json
 import os
+import tempfile
 from collections import defaultdict
-from .database import get_connection
-from .config import BASE_DIR
-
-
-def _load_json_overrides():
-    """trade_data_v2.json 머지용 overrides:
-    - ranking_6d: db에 두면 100MB 한도 초과
-    - total: customs_trade_v2.py가 16개 품목 합으로 덮어쓰는 걸 collect_korea_total.py 결과로 우선
-    """
-    p = os.path.join(BASE_DIR, "trade_data_v2.json")
-    if not os.path.exists(p):
-        return {}
-    try:
-        with open(p, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def build_full_json() -> dict:
+from .config import STREAM_SPOOL_BYTES
+from .database import read_connection
+from .projection import ALL, drop_fields
+
+# 품목 단위로 모아 조립하는 trade_data 유형
+_ITEM_TYPES = ("item", "item_country", "item_region",
+               "sub_item", "sub_country", "company_loc")
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_full_json(pool=None, proj=ALL) -> dict:
     """trade_data_v2.json과 동일한 구조의 dict 반환"""
-    conn = get_connection()
+    with read_connection(pool) as conn:
+        return _build(conn, proj)
+
+
+def _build(conn, proj=ALL) -> dict:
+    result = _head(conn, proj)
+    result["items"] = dict(_iter_items(conn, result, proj))
+    result["ranking_6d"] = dict(_iter_projected_ranking(conn, "", proj))
+    return result
+
+
+def build_core_json(pool=None, proj=ALL) -> dict:
+    """첫 화면용 본체: 메타·사전·total·items + 랭킹 샤드 목록·세대 (ranking_6d 제외)"""
+    with read_connection(pool) as conn:
+        result = _head(conn, proj)
+        result["items"] = dict(_iter_items(conn, result, proj))
+        result["ranking_shards"] = ranking_shard_counts(conn)
+        # 재방문 델타 동기화 기준 (/api/trade-data/changes?since=)
+        row = conn.execute("SELECT value FROM meta WHERE key='generation'").fetchone()
+        result["generation"] = int(row[0]) if row else 0
+    return result
+
+
+def build_ranking_shard(hs2, pool=None, proj=ALL):
+    """ranking_6d 중 HS2 = hs2인 HS6만 {hs6: entry} — 그런 HS6가 아예 없으면 None
+
+    proj로 걸러져 비었을 뿐이면 {} (있는 샤드의 빈 창)."""
+    with read_connection(pool) as conn:
+        shard = dict(_iter_projected_ranking(conn, hs2, proj))
+        if not shard and conn.execute(
+                "SELECT 1 FROM trade_data WHERE data_type IN ('ranking', 'ranking_country') "
+                "AND hs_code='' AND sub_code >= ? AND sub_code < ? LIMIT 1",
+                (hs2, hs2 + ":")).fetchone() is None:   # ':'는 '9' 다음 문자
+            return None
+        return shard
+
+
+def ranking_shard_counts(conn) -> dict:
+    """{HS2: HS6 수} — _iter_ranking이 내보내는 HS6(합계 또는 국가 행 보유) 기준"""
+    return {r[0]: r[1] for r in conn.execute(
+        "SELECT substr(sub_code, 1, 2) AS hs2, COUNT(DISTINCT sub_code) "
+        "FROM trade_data WHERE data_type IN ('ranking', 'ranking_country') "
+        "AND hs_code='' GROUP BY hs2 ORDER BY hs2")}
+
+
+def iter_full_json(pool=None, chunk_size=1 << 16, proj=ALL):
+    """build_full_json()과 같은 내용을 UTF-8 JSON 조각으로 yield (약 chunk_size 단위)."""
+    with read_connection(pool) as conn:
+        buf, size = [], 0
+        for piece in _iter_pieces(conn, proj):
+            buf.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buf).encode("utf-8")
+                buf, size = [], 0
+        if buf:
+            yield "".join(buf).encode("utf-8")
+
+
+def spooled(chunks, chunk_size=1 << 16):
+    """chunks(커넥션을 쥔 제너레이터)를 끝까지 임시 파일에 받은 다음 그 파일을 yield.
+
+    DB 읽기는 클라이언트 속도와 무관하게 끝나고 커넥션은 첫 조각 전에 풀로 돌아간다.
+    STREAM_SPOOL_BYTES까지는 메모리, 넘으면 디스크 (최대 메모리는 그대로 일정)."""
+    with tempfile.SpooledTemporaryFile(max_size=STREAM_SPOOL_BYTES) as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.seek(0)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def write_full_json(path, pool=None):
+    """스트리밍 결과를 파일로 (임시 파일에 쓰고 rename — 읽는 쪽이 반쪽 파일을 보지 않게)."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        for chunk in iter_full_json(pool):
+            f.write(chunk)
+    os.replace(tmp, path)
+
+
+def _iter_pieces(conn, proj=ALL):
+    head = _head(conn, proj)
+    yield _dumps(head)[:-1]          # 닫는 '}' 제외하고 이어 붙임
+    yield ',"items":{'
+    for i, (hs, item) in enumerate(_iter_items(conn, head, proj)):
+        yield ("," if i else "") + _dumps(hs) + ":" + _dumps(item)
+    yield '},"ranking_6d":{'
+    for i, (hs6, entry) in enumerate(_iter_projected_ranking(conn, "", proj)):
+        yield ("," if i else "") + _dumps(hs6) + ":" + _dumps(entry)
+    yield "}}"
+
+
+def _head(conn, proj=ALL) -> dict:
+    """items/ranking_6d 앞부분: 메타 + 사전 + 전체 총계 (모두 수 KB~수백 KB)"""
     result = {}
 
     # ── 1) 메타데이터 ──
@@ -56,27 +166,63 @@ def build_full_json() -> dict:
     }
 
     # ── 3) 전체 총계 ──
-    # JSON override 우선 (collect_korea_total.py가 한국 전체 99 HS2 합으로 갱신)
-    # 없으면 db trade_data='total' 폴백 (구버전: 16개 모니터링 품목 합)
-    _json_overrides = _load_json_overrides()
-    _jt = _json_overrides.get("total")
-    if _jt and (_jt.get("exp") or _jt.get("imp")):
-        result["total"] = _jt
-    else:
-        total_exp, total_imp = {}, {}
-        for r in conn.execute(
-                "SELECT ym, exp_usd, imp_usd FROM trade_data WHERE data_type='total'"):
-            total_exp[r["ym"]] = r["exp_usd"]
-            total_imp[r["ym"]] = r["imp_usd"]
-        result["total"] = {"exp": total_exp, "imp": total_imp}
-
-    # ── 4) 품목 데이터 ──
-    # 모든 trade_data를 한번에 읽어 메모리에서 분류 (쿼리 횟수 최소화)
-    all_td = defaultdict(list)
+    # migrate_json이 최종 trade_data_v2.json의 total(collect_korea_total.py가
+    # 한국 전체 99 HS2 합으로 교정한 값)을 그대로 적재하므로 DB가 기준
+    total_exp, total_imp = {}, {}
     for r in conn.execute(
-            "SELECT data_type, hs_code, sub_code, entity_code, ym, exp_usd, imp_usd, wgt "
-            "FROM trade_data WHERE data_type != 'total' AND data_type != 'ranking'"):
-        all_td[(r["data_type"], r["hs_code"])].append(r)
+            "SELECT ym, exp_usd, imp_usd FROM trade_data "
+            "WHERE data_type='total' AND ym BETWEEN ? AND ? ORDER BY ym",
+            (proj.start, proj.end)):
+        total_exp[r["ym"]] = r["exp_usd"]
+        total_imp[r["ym"]] = r["imp_usd"]
+    result["total"] = drop_fields({"exp": total_exp, "imp": total_imp}, proj)
+    return result
+
+
+def _group_rows(rows) -> dict:
+    """trade_data 행을 한 번만 훑으며 전체 키(유형, sub, entity)로 바로 분류.
+
+    조립 단계는 dict 조회만 하므로 비용은 행 수에 선형
+    (예전엔 sub_code·사업장마다 해당 HS 행 전체를 다시 훑어 subs × rows)."""
+    g = {
+        "totals": [],
+        "countries": defaultdict(lambda: {"name": "", "exp": {}}),
+        "regions": defaultdict(lambda: {"name": "", "exp": {}}),
+        "sub_series": defaultdict(lambda: {"exp": {}, "wgt": {}}),     # sub →
+        "sub_countries": defaultdict(
+            lambda: defaultdict(lambda: {"name": "", "exp": {}, "wgt": {}})),  # sub → cd →
+        "locs": defaultdict(dict),                  # (company, loc) → {ym: exp}
+    }
+    for r in rows:
+        dt, ym = r["data_type"], r["ym"]
+        if dt == "item":
+            g["totals"].append(r)
+        elif dt == "item_country":
+            c = g["countries"][r["entity_code"]]
+            c["exp"][ym] = r["exp_usd"]
+            if r["wgt"]:
+                c.setdefault("wgt", {})[ym] = r["wgt"]
+        elif dt == "item_region":
+            g["regions"][r["entity_code"]]["exp"][ym] = r["exp_usd"]
+        elif dt == "sub_item":
+            si = g["sub_series"][r["sub_code"]]
+            si["exp"][ym] = r["exp_usd"]
+            if r["wgt"]:
+                si["wgt"][ym] = r["wgt"]
+        elif dt == "sub_country":
+            c = g["sub_countries"][r["sub_code"]][r["entity_code"]]
+            c["exp"][ym] = r["exp_usd"]
+            if r["wgt"]:
+                c["wgt"][ym] = r["wgt"]
+        elif dt == "company_loc":
+            g["locs"][(r["sub_code"], r["entity_code"])][ym] = r["exp_usd"]
+    return g
+
+
+def _iter_items(conn, head, proj=ALL):
+    """(hs, item dict)를 items.sort_order 순으로 — 품목 1개씩 조회·조립"""
+    all_countries = head["all_countries"]
+    all_regions = head["all_regions"]
 
     # 세부항목 정의
     all_subs = defaultdict(dict)
@@ -94,17 +240,28 @@ def build_full_json() -> dict:
             "SELECT hs_code, company_key, location_key, name FROM company_locations"):
         all_locs[r["hs_code"]][r["company_key"]][r["location_key"]] = r["name"]
 
-    items_dict = {}
-    for item_row in conn.execute(
-            "SELECT hs_code, name FROM items ORDER BY sort_order"):
+    item_rows = conn.execute(
+        "SELECT hs_code, name FROM items ORDER BY sort_order").fetchall()
+    for item_row in item_rows:
         hs = item_row["hs_code"]
+        if not proj.has_item(hs):
+            continue
+        g = _group_rows(conn.execute(
+            "SELECT data_type, sub_code, entity_code, ym, exp_usd, imp_usd, wgt "
+            "FROM trade_data WHERE data_type IN (?,?,?,?,?,?) AND hs_code=? "
+            "AND ym BETWEEN ? AND ?",
+            _ITEM_TYPES + (hs, proj.start, proj.end)))
         item = {"name": item_row["name"]}
 
+        def _locations(ck):
+            return {lk: {"name": lname, "exp": g["locs"].get((ck, lk), {})}
+                    for lk, lname in all_locs.get(hs, {}).get(ck, {}).items()}
+
         # 품목 총계
         item["total_exp"] = {}
         item["total_imp"] = {}
         total_wgt = {}
-        for r in all_td.get(("item", hs), []):
+        for r in g["totals"]:
             item["total_exp"][r["ym"]] = r["exp_usd"]
             item["total_imp"][r["ym"]] = r["imp_usd"]
             if r["wgt"]:
@@ -113,49 +270,27 @@ def build_full_json() -> dict:
             item["total_wgt"] = total_wgt
 
         # 국가별
-        countries = defaultdict(lambda: {"name": "", "exp": {}})
-        has_country_wgt = False
-        for r in all_td.get(("item_country", hs), []):
-            cd = r["entity_code"]
-            countries[cd]["exp"][r["ym"]] = r["exp_usd"]
-            if r["wgt"]:
-                if "wgt" not in countries[cd]:
-                    countries[cd]["wgt"] = {}
-                countries[cd]["wgt"][r["ym"]] = r["wgt"]
-                has_country_wgt = True
+        countries = g["countries"]
         for cd in countries:
-            countries[cd]["name"] = result["all_countries"].get(cd, cd)
+            countries[cd]["name"] = all_countries.get(cd, cd)
         item["countries"] = dict(countries)
 
         # 지역별
-        regions = defaultdict(lambda: {"name": "", "exp": {}})
-        for r in all_td.get(("item_region", hs), []):
-            cd = r["entity_code"]
-            regions[cd]["exp"][r["ym"]] = r["exp_usd"]
+        regions = g["regions"]
         for cd in regions:
-            regions[cd]["name"] = result["all_regions"].get(cd, cd)
+            regions[cd]["name"] = all_regions.get(cd, cd)
         item["regions"] = dict(regions)
 
         # 세부항목
         if hs in all_subs:
             sub_items = {}
             for scode, sname in all_subs[hs].items():
-                si = {"name": sname, "exp": {}, "wgt": {}}
-                for r in all_td.get(("sub_item", hs), []):
-                    if r["sub_code"] == scode:
-                        si["exp"][r["ym"]] = r["exp_usd"]
-                        if r["wgt"]:
-                            si["wgt"][r["ym"]] = r["wgt"]
+                series = g["sub_series"].get(scode, {"exp": {}, "wgt": {}})
+                si = {"name": sname, "exp": series["exp"], "wgt": series["wgt"]}
                 # 세부항목 국가별
-                si_countries = defaultdict(lambda: {"name": "", "exp": {}, "wgt": {}})
-                for r in all_td.get(("sub_country", hs), []):
-                    if r["sub_code"] == scode:
-                        cd = r["entity_code"]
-                        si_countries[cd]["exp"][r["ym"]] = r["exp_usd"]
-                        if r["wgt"]:
-                            si_countries[cd]["wgt"][r["ym"]] = r["wgt"]
+                si_countries = g["sub_countries"].get(scode, {})
                 for cd in si_countries:
-                    si_countries[cd]["name"] = result["all_countries"].get(cd, cd)
+                    si_countries[cd]["name"] = all_countries.get(cd, cd)
                 si["countries"] = dict(si_countries)
                 sub_items[scode] = si
             item["sub_items"] = sub_items
@@ -167,37 +302,103 @@ def build_full_json() -> dict:
                 # samyang은 별도 처리
                 if hs == "1902301010" and ck == "samyang":
                     continue
-                comp = {"name": cname, "locations": {}}
-                for lk, lname in all_locs.get(hs, {}).get(ck, {}).items():
-                    loc_exp = {}
-                    for r in all_td.get(("company_loc", hs), []):
-                        if r["sub_code"] == ck and r["entity_code"] == lk:
-                            loc_exp[r["ym"]] = r["exp_usd"]
-                    comp["locations"][lk] = {"name": lname, "exp": loc_exp}
-                companies[ck] = comp
+                companies[ck] = {"name": cname, "locations": _locations(ck)}
             if companies:
                 item["companies"] = companies
 
         # samyang (1902301010 전용)
         if hs == "1902301010" and "samyang" in all_companies.get(hs, {}):
-            samyang = {}
-            for lk, lname in all_locs.get(hs, {}).get("samyang", {}).items():
-                loc_exp = {}
-                for r in all_td.get(("company_loc", hs), []):
-                    if r["sub_code"] == "samyang" and r["entity_code"] == lk:
-                        loc_exp[r["ym"]] = r["exp_usd"]
-                samyang[lk] = {"name": lname, "exp": loc_exp}
+            samyang = _locations("samyang")
             if samyang:
                 item["samyang"] = samyang
 
-        items_dict[hs] = item
+        yield hs, drop_fields(item, proj)
 
-    result["items"] = items_dict
 
-    # ── 5) 랭킹 ──
-    # ranking_6d는 collect_ranking.py가 만든 trade_data_v2.json에서 머지
-    # (1.3M 행이라 db에 두면 100MB 초과; countries + wgt 포함)
-    result["ranking_6d"] = _json_overrides.get("ranking_6d", {})
+def _grouped(cursor):
+    """sub_code(=HS6) 순으로 정렬된 커서 → (hs6, [row]) 그룹"""
+    key, rows = None, []
+    for r in cursor:
+        if r["sub_code"] != key:
+            if rows:
+                yield key, rows
+            key, rows = r["sub_code"], []
+        rows.append(r)
+    if rows:
+        yield key, rows
 
-    conn.close()
-    return result
+
+def _prefix_range(prefix):
+    """sub_code LIKE 'prefix%'를 PK 범위 조건으로 (LIKE는 인덱스를 못 탐)"""
+    if not prefix:
+        return "", "\uffff"
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _iter_projected_ranking(conn, prefix, proj):
+    """proj.items가 있으면 그 코드(앞 6자리)로 시작하는 HS6만 — 코드별 PK 범위로 나눠 조회"""
+    if not proj.items:
+        yield from _iter_ranking(conn, prefix, proj)
+        return
+    codes = sorted({c[:6] for c in proj.items})
+    # 다른 코드로 이미 덮이는 긴 코드 제외 → 범위가 겹치지 않아 HS6 순서·중복 없음
+    codes = [c for c in codes if not any(c != o and c.startswith(o) for o in codes)]
+    for code in codes:
+        if code.startswith(prefix):
+            yield from _iter_ranking(conn, code, proj)
+        elif prefix.startswith(code):
+            yield from _iter_ranking(conn, prefix, proj)
+
+
+def _iter_ranking(conn, prefix="", proj=ALL):
+    """(hs6, {name, exp, wgt, countries[, regions]})를 HS6 오름차순으로.
+
+    합계·국가·시군구 세 커서를 PK 순서(sub_code, entity_code, ym)로 나란히 훑어
+    HS6 하나씩 병합 — 정렬 비용 없이 HS6 1개 분량만 메모리에 둔다.
+    prefix를 주면 그 코드로 시작하는 HS6만 (PK 범위 검색)."""
+    names = {r["hs_code"]: r["name"] for r in conn.execute(
+        "SELECT hs_code, name FROM hs_names WHERE digits=6")}
+    cnames = {r["code"]: r["name"] for r in conn.execute(
+        "SELECT code, name FROM ranking_countries")}
+    rnames = {r["code"]: r["name"] for r in conn.execute(
+        "SELECT code, name FROM regions")}
+    sql = ("SELECT sub_code, entity_code, ym, exp_usd, wgt FROM trade_data "
+           "WHERE data_type=? AND hs_code='' AND sub_code >= ? AND sub_code < ? "
+           "AND ym BETWEEN ? AND ? ORDER BY sub_code, entity_code, ym")
+    lo, hi = _prefix_range(prefix)
+    # 커서마다 별도 execute — 같은 커넥션에서 동시에 훑는다
+    groups = [_grouped(conn.cursor().execute(sql, (dt, lo, hi, proj.start, proj.end)))
+              for dt in ("ranking", "ranking_country", "ranking_region")]
+    heads = [next(g, None) for g in groups]
+    while heads[0] or heads[1]:
+        hs6 = min(h[0] for h in heads[:2] if h)
+        parts = [None, None, None]
+        for i, h in enumerate(heads):
+            # 시군구만 있는 HS6는 버림 (export_db_to_json과 동일)
+            while h and h[0] < hs6:
+                h = heads[i] = next(groups[i], None)
+            if h and h[0] == hs6:
+                parts[i] = h[1]
+                heads[i] = next(groups[i], None)
+        exp_rows, ctry_rows, reg_rows = parts
+
+        entry = {"name": names.get(hs6, ""), "exp": {}, "wgt": {}, "countries": {}}
+        for r in exp_rows or ():
+            entry["exp"][r["ym"]] = r["exp_usd"]
+            entry["wgt"][r["ym"]] = r["wgt"]
+        for r in ctry_rows or ():
+            cd = r["entity_code"]
+            c = entry["countries"].get(cd)
+            if c is None:
+                c = entry["countries"][cd] = {
+                    "name": cnames.get(cd, ""), "exp": {}, "wgt": {}}
+            c["exp"][r["ym"]] = r["exp_usd"]
+            c["wgt"][r["ym"]] = r["wgt"]
+        if reg_rows:
+            regions = entry["regions"] = {}
+            for r in reg_rows:
+                rk = r["entity_code"]
+                if rk not in regions:
+                    regions[rk] = {"name": rnames.get(rk, rk), "exp": {}}
+                regions[rk]["exp"][r["ym"]] = r["exp_usd"]
+        yield hs6, drop_fields(entry, proj)
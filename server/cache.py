@@ -0,0 +1,117 @@
+"""DB 파생 응답 공용 캐시 — 스레드풀 빌드 · single-flight · stale-while-refresh
+
+async 라우트에서 SQLite 조회·dict 조립을 그대로 부르면 그동안 이벤트 루프가 멈춰
+다른 요청이 모두 기다리고, 동시에 들어온 미스는 같은 빌드를 여러 번 돌린다.
+  - SingleFlight: 키별로 진행 중인 빌드(스레드풀) 하나를 공유 — 대기자가 취소돼도 계속
+  - GenerationCache: (데이터 세대, 값)을 키별로 보관
+      · 현재 세대 값이면 바로 반환
+      · 옛 세대 값이면 그대로 반환하고 재빌드는 백그라운드로 (stale-while-refresh)
+      · 없으면 single-flight 빌드를 기다림
+    파라미터별 키(월·정렬·코드 …)가 쌓이므로 LRU + 바이트 상한
+세대 번호와 그 세대의 읽기 풀은 server/generation.py가 넘겨주는 함수로 읽는다
+(순환 import 방지). 빌드는 요청 시점의 (세대, 풀)에 묶여 돈다 — 진행 중 빌드는
+(키, 세대)로 공유하고, 값은 실제로 읽은 세대 번호로 보관한다.
+조회 결과·빌드 시간·크기는 server/metrics.py로 (/api/metrics).
+"""
+import asyncio
+from collections import OrderedDict
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import metrics
+from .database import bound_read_pool
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}     # key → asyncio.Task
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def run(self, key, fn, *args):
+        """fn(*args)를 스레드풀에서 — 같은 키로 진행 중이면 그 결과를 같이 기다림"""
+        task = self._inflight.get(key)
+        if task is None:
+            async def call():
+                try:
+                    return await run_in_threadpool(fn, *args)
+                finally:
+                    self._inflight.pop(key, None)
+            task = self._inflight[key] = asyncio.ensure_future(call())
+        return await asyncio.shield(task)
+
+
+def _nbytes(value):
+    return getattr(value, "nbytes", 0)
+
+
+class GenerationCache:
+    def __init__(self, name, current_generation, max_entries=256, max_bytes=64 << 20,
+                 current_pool=None):
+        self.name = name
+        self._current = current_generation
+        self._pool = current_pool or (lambda: None)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key → (세대, 값)
+        self._bytes = 0
+        self._flight = SingleFlight()
+        metrics.register_cache(name, lambda: (len(self._entries), self._bytes))
+
+    async def get(self, key, fn, *args):
+        """현재 세대의 fn(*args) 값 (None도 캐시 — 404 결과 등)"""
+        # 세대 교체는 이벤트 루프에서 한 번에 일어나므로 둘은 항상 짝이 맞는다
+        gen, pool = self._current(), self._pool()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry[0] == gen:
+                metrics.CACHE_REQUESTS.inc(self.name, "hit")
+                return entry[1]
+            metrics.CACHE_REQUESTS.inc(self.name, "stale")
+            if (key, gen) not in self._flight:
+                task = asyncio.ensure_future(self._build(key, gen, pool, fn, args))
+                task.add_done_callback(_log_failure)
+            return entry[1]
+        metrics.CACHE_REQUESTS.inc(self.name, "miss")
+        return await self._build(key, gen, pool, fn, args)
+
+    async def _build(self, key, gen, pool, fn, args):
+        value = await self._flight.run((key, gen), self._timed, key, pool, fn, args)
+        # 값은 읽은 세대(gen)로 보관 — 빌드 중 세대가 바뀌었으면 다음 요청에서 stale로
+        # 보이고 재빌드된다. 이미 현재 세대 값이 들어와 있으면 덮지 않는다.
+        entry = self._entries.get(key)
+        if entry is None or entry[0] == gen or entry[0] != self._current():
+            self._store(key, gen, value)
+        return value
+
+    def _timed(self, key, pool, fn, args):
+        # 키 첫 요소(엔드포인트 종류)별 빌드 시간 — 파라미터 값은 라벨로 쓰지 않음
+        kind = key[0] if isinstance(key, tuple) else key
+        with metrics.CACHE_BUILD_SECONDS.time(self.name, str(kind)), bound_read_pool(pool):
+            return fn(*args)
+
+    def _store(self, key, gen, value):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= _nbytes(old[1])
+        self._entries[key] = (gen, value)
+        self._bytes += _nbytes(value)
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= _nbytes(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+
+def _log_failure(task):
+    """백그라운드 재빌드 실패 — 옛 값으로 계속 서빙, 다음 요청이 다시 시도"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[cache] 백그라운드 재빌드 실패: {task.exception()}")
@@ -0,0 +1,62 @@
+"""세대 간 변경분 조회 (/api/trade-data/changes?since=<세대>)
+
+collector/changeset.py가 세대마다 기록한 trade_changes(PK)를 현재 trade_data 값과
+묶어 내려준다. trade.html은 IndexedDB에 둔 지난 세대 본체(core)·랭킹 샤드를 이걸로
+패치하므로 재방문 때 전체 대신 바뀐 행만 받는다.
+
+  - since가 현재 세대면 빈 변경분
+  - since가 보관 범위 밖·미래이거나, 사이 세대 중 full(정의·사전 변경)이 있으면
+    {"full": true} — 클라이언트는 core를 새로 받는다
+  - core_only면 ranking* 행 제외 (ranking_6d 샤드를 캐시하지 않는 클라이언트용)
+"""
+from .builder import _head, ranking_shard_counts
+from .database import read_connection
+
+_KEY = "data_type, hs_code, sub_code, entity_code, ym"
+
+
+def changes(since, core_only=False, pool=None) -> dict:
+    with read_connection(pool) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key='generation'").fetchone()
+        gen = int(row[0]) if row else 0
+        out = {"since": since, "generation": gen}
+        if since == gen:
+            return dict(out, full=False, head=None, rows=[], deleted=[], names={})
+
+        sets = conn.execute(
+            "SELECT generation, full FROM changesets WHERE generation > ? "
+            "ORDER BY generation", (since,)).fetchall()
+        chain = [r["generation"] for r in sets]
+        if since > gen or chain != list(range(since + 1, gen + 1)) \
+                or any(r["full"] for r in sets):
+            return dict(out, full=True)
+
+        only = " AND data_type NOT LIKE 'ranking%'" if core_only else ""
+        rows, deleted = [], []
+        for r in conn.execute(f"""
+                SELECT c.data_type, c.hs_code, c.sub_code, c.entity_code, c.ym,
+                       t.exp_usd, t.imp_usd, t.wgt, t.rowid IS NULL AS gone
+                FROM (SELECT DISTINCT {_KEY} FROM trade_changes
+                      WHERE generation > ?{only}) c
+                LEFT JOIN trade_data t USING ({_KEY})
+                ORDER BY c.data_type, c.hs_code, c.sub_code, c.entity_code, c.ym""",
+                              (since,)):
+            if r["gone"]:
+                deleted.append(list(r)[:5])
+            else:
+                rows.append(list(r)[:8])
+
+        head = _head(conn)
+        head["ranking_shards"] = ranking_shard_counts(conn)
+        names = {}
+        if not core_only:
+            # 새로 생긴 HS6·랭킹 국가 이름 (나머지 사전은 head에 통째로)
+            names["hs6"] = {r[0]: r[1] for r in conn.execute(
+                "SELECT hs_code, name FROM hs_names WHERE digits=6 AND hs_code IN ("
+                "  SELECT sub_code FROM trade_changes WHERE generation > ? "
+                "  AND data_type LIKE 'ranking%')", (since,))}
+            names["ranking_countries"] = {r[0]: r[1] for r in conn.execute(
+                "SELECT code, name FROM ranking_countries WHERE code IN ("
+                "  SELECT entity_code FROM trade_changes WHERE generation > ? "
+                "  AND data_type='ranking_country')", (since,))}
+    return dict(out, full=False, head=head, rows=rows, deleted=deleted, names=names)
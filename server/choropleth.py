@@ -0,0 +1,216 @@
+"""지도 탭 SVG 단계구분도 (/api/map/{world,korea}.svg) — 서버 렌더링
+
+trade.html rMap3D·rMapKorea는 GeoJSON 두 개와 집계를 받아 브라우저에서 투영(projXY)하고
+색(landFill)을 칠했다. 저사양 기기에서도 지도가 바로 뜨도록 같은 그림을 서버에서 만든다.
+
+  - 지오메트리: static/<map>.<폭>.topo.json (build_country_meta.py, viewBox 폭 레벨)을
+    프로세스당 한 번 디코드·투영해 피처별 SVG path 문자열로 보관 (데이터와 무관)
+  - 값: server/maps.py 집계 (월·품목) → 색·data-* 속성만 매번 붙임
+  - 캐시: main.py가 (지도, 월, 지표, 품목)별로 세대 캐시에 둔다 (세대가 바뀌면 재빌드)
+
+투영·색 규칙은 trade.html과 같다 (MAP_*/KMAP_* 상수, 40% log + 60% linear 혼합 스케일).
+SVG 루트의 data-sum/min/max/n은 범례·캡션용, 피처 <g>의 data-*는 툴팁·클릭용.
+"""
+import functools
+import json
+import math
+import os
+from html import escape
+
+from . import maps
+from .topojson import decode, outer_rings
+from .months import pct, year_ago
+from .config import BASE_DIR
+
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+METRICS = ("exp", "yoy")
+# yoy 색 스케일 상한 (±%) — 넘으면 가장 진한 색
+YOY_CLAMP = 100.0
+
+# trade.html과 같은 투영 상수
+MAP_W, MAP_H = 1200, 480
+MAP_LAT_TOP, MAP_LAT_BOT = 85, -58
+MAP_CENTER_LNG = 150
+KMAP_W, KMAP_H = 600, 580
+KMAP_LNG_L, KMAP_LAT_T = 124.5, 38.7
+KMAP_SX = KMAP_W / (131.9 - KMAP_LNG_L)
+KMAP_SY = KMAP_H / (KMAP_LAT_T - 33.0)
+
+
+def _load(name):
+    with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _num(tenths):
+    s = f"{tenths / 10:.1f}"
+    return s[:-2] if s.endswith(".0") else s
+
+
+def _path(points):
+    """0.1px로 반올림한 뒤 첫 점만 절대, 나머지는 상대 좌표 (l) — 누적 오차 없음"""
+    pts = [(round(x * 10), round(y * 10)) for x, y in points]
+    out, (px, py) = [f"M{_num(pts[0][0])},{_num(pts[0][1])}l"], pts[0]
+    for x, y in pts[1:]:
+        if (x, y) != (px, py):
+            out.append(f"{_num(x - px)},{_num(y - py)} ")
+            px, py = x, y
+    return "".join(out).rstrip() + "z"
+
+
+def _split_wrap(ring):
+    """태평양 중심으로 옮긴 경도가 180° 넘게 튀는 곳에서 링을 자름 (trade.html splitWrap)"""
+    segs, prev = [[]], None
+    for lng, lat in ring:
+        sl = ((lng - MAP_CENTER_LNG + 540) % 360) - 180
+        if prev is not None and abs(sl - prev) > 180:
+            segs.append([])
+        segs[-1].append((sl, lat))
+        prev = sl
+    return [s for s in segs if len(s) >= 3]
+
+
+@functools.lru_cache(maxsize=None)
+def _world_paths():
+    """{alpha-2 (없으면 "_"+alpha-3): path d} — country_meta로 alpha-3 → alpha-2"""
+    meta = _load("country_meta.json")
+    a3to2 = {v["a3"]: a2 for a2, v in meta.items() if v and v.get("a3")}
+    sx, sy = MAP_W / 360, MAP_H / (MAP_LAT_TOP - MAP_LAT_BOT)
+    paths = {}
+    for ft in decode(_load(f"world.{MAP_W}.topo.json"))["features"]:
+        a3 = ft.get("id")
+        key = a3to2.get(a3) or f"_{a3 or 'x'}"
+        for ring in outer_rings(ft["geometry"]):
+            for seg in _split_wrap(ring):
+                paths.setdefault(key, []).append(
+                    _path(((lng + 180) * sx, (MAP_LAT_TOP - lat) * sy) for lng, lat in seg))
+    return {k: "".join(v) for k, v in paths.items()}, a3to2
+
+
+@functools.lru_cache(maxsize=None)
+def _korea_paths():
+    """{canon: (path d, 표시명, 시도 전체명)} — 도농복합시 자치구는 parent canon으로 합쳐짐"""
+    paths, info = {}, {}
+    for ft in decode(_load(f"korea.{KMAP_W}.topo.json"))["features"]:
+        props = ft.get("properties") or {}
+        canon = props.get("canon")
+        if not canon:
+            continue
+        full = props.get("full") or canon
+        info.setdefault(canon, (canon.split(" ", 1)[1] if " " in canon else props.get("name", canon),
+                                full.split(" ")[0]))
+        for ring in outer_rings(ft["geometry"]):
+            paths.setdefault(canon, []).append(
+                _path(((lng - KMAP_LNG_L) * KMAP_SX, (KMAP_LAT_T - lat) * KMAP_SY)
+                      for lng, lat in ring))
+    return {c: ("".join(p), *info[c]) for c, p in paths.items()}
+
+
+def _scale(values):
+    """값 → 0~1 (trade.html tNorm: 40% log + 60% linear)"""
+    vs = [v for v in values if v > 0]
+    if not vs:
+        return lambda v: 0.0
+    lo, hi = min(vs), max(vs)
+    lg_min, lg_span = math.log10(max(lo, 1)), (math.log10(hi + 1) - math.log10(max(lo, 1))) or 1
+
+    def t(v):
+        t_log = min(1, max(0, (math.log10(max(v, 1)) - lg_min) / lg_span))
+        t_lin = min(1, max(0, v / (hi or 1)))
+        return 0.4 * t_log + 0.6 * t_lin
+    return t
+
+
+def _fill(t, hue=150):
+    """옅은 무채 → 진한 형광 (trade.html landFill). hue=0이면 감소(빨강) 쪽"""
+    h = hue + t * 8 if hue else 0
+    return f"hsl({h:g},{12 + t * 88:g}%,{86 - t * 32:g}%)"
+
+
+def _colors(metric, values):
+    """{키: 값} → {키: fill} (값 없거나 exp<=0이면 빠짐 → no-data)"""
+    if metric == "yoy":
+        return {k: _fill(min(abs(v), YOY_CLAMP) / YOY_CLAMP, 150 if v >= 0 else 0)
+                for k, v in values.items() if v is not None}
+    t = _scale(values.values())
+    return {k: _fill(t(v)) for k, v in values.items() if v and v > 0}
+
+
+def _yoy(cur, prev):
+    return {k: pct(v, prev.get(k)) for k, v in cur.items() if prev.get(k)}
+
+
+def _svg(w, h, stats, metric, groups):
+    attrs = " ".join(f'data-{k}="{escape(str(v))}"' for k, v in stats.items() if v is not None)
+    return "".join([
+        f'<svg xmlns="http://www.w3.org/2000/svg" class="map3d-svg" viewBox="0 0 {w} {h}" '
+        f'preserveAspectRatio="xMidYMid meet" data-metric="{metric}" {attrs}>',
+        '<g class="map3d-land" stroke="#1a2440" stroke-width=".4" stroke-linejoin="round">',
+        *groups, "</g></svg>"])
+
+
+def _group(cls, fill, data, d):
+    attrs = " ".join(f'data-{k}="{escape(str(v))}"' for k, v in data.items())
+    return (f'<g class="{cls}" {attrs}><path d="{d}" fill="{fill or "#3d4a64"}"/></g>')
+
+
+def _month(map_name, month, metric, pool):
+    """기본 월: korea·yoy는 최신월, world exp는 None(전 기간 합계) 그대로"""
+    if month is None and (map_name == "korea" or metric == "yoy"):
+        return maps.latest_month(map_name, pool)
+    return month
+
+
+def world_svg(month=None, metric="exp", hs=None, pool=None) -> str:
+    month = _month("world", month, metric, pool)
+    agg = maps.world(month, hs, pool)
+    paths, a3to2 = _world_paths()
+    by_ck = {a3to2.get(a3, f"_{a3}"): f for a3, f in agg["features"].items()}
+    values = {ck: f["value"] for ck, f in by_ck.items()}
+    stats = {k: agg[k] for k in ("sum", "min", "max", "n")}
+    if metric == "yoy":
+        prev = maps.world(year_ago(month), hs, pool)["features"] if month else {}
+        values = _yoy(values, {a3to2.get(a3, f"_{a3}"): f["value"] for a3, f in prev.items()})
+        stats.update(min=min(values.values(), default=0), max=max(values.values(), default=0))
+    fills = _colors(metric, values)
+    total = agg["sum"] or 1
+    groups = []
+    for ck in sorted(paths, key=lambda k: (values.get(k) or 0, k)):
+        fill = fills.get(ck)
+        f = by_ck.get(ck)
+        data = {"ck": ck}
+        if fill and f:
+            data.update({"name": f["name"], "val": values[ck],
+                         "share": f"{f['value'] / total * 100:.2f}"})
+        groups.append(_group("map3d-c" if fill else "map3d-c no-data", fill, data, paths[ck]))
+    return _svg(MAP_W, MAP_H, {"month": month, "hs": hs, **stats}, metric, groups)
+
+
+def korea_svg(month=None, metric="exp", hs=None, pool=None) -> str:
+    month = _month("korea", month, metric, pool)
+    agg = maps.korea(month, hs, pool)
+    paths = _korea_paths()
+    feats = agg["features"]
+    values = {c: f["value"] for c, f in feats.items()}
+    # 캡션은 지도에 그려지는 지역 수 (trade.html matchedCnt)
+    drawn = [v for c, v in values.items() if c in paths and v > 0]
+    stats = {"sum": agg["sum"], "min": agg["min"], "max": agg["max"], "n": len(drawn)}
+    if metric == "yoy":
+        prev = maps.korea(year_ago(month), hs, pool)["features"] if month else {}
+        values = _yoy(values, {c: f["value"] for c, f in prev.items()})
+        stats.update(min=min(values.values(), default=0), max=max(values.values(), default=0))
+    fills = _colors(metric, values)
+    total = agg["sum"] or 1
+    groups = []
+    for c in sorted(paths, key=lambda k: (values.get(k) or 0, k)):
+        d, disp, sido = paths[c]
+        fill = fills.get(c)
+        data = {"canon": c, "disp": disp, "sido": sido}
+        if fill and c in feats:
+            data.update({"val": values[c], "share": f"{feats[c]['value'] / total * 100:.2f}",
+                         "code": feats[c]["regions"][0]["code"]})
+        groups.append(_group("map3d-c" if fill else "map3d-c no-data", fill, data, d))
+    return _svg(KMAP_W, KMAP_H, {"month": month, "hs": hs, **stats}, metric, groups)
+
+
+RENDERERS = {"world": world_svg, "korea": korea_svg}
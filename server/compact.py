@@ -0,0 +1,215 @@
+"""v2-compact: trade_data_v2 구조의 열(column) 지향 압축 표현 (?format=compact)
+
+기존 JSON은 시계열마다 "YYYYMM": 값 키를, 국가·지역·세부항목마다 "name"을
+수천 번 반복한다. v2-compact는:
+
+    {"format": "v2-compact",
+     "months": ["202301", ...],          # 공통 월 축 (오름차순)
+     "names":  ["미국", "중국", ...],     # 엔티티 이름 사전
+     "data":   <원 구조를 아래 규칙으로 바꾼 것>}
+
+  - 시계열(키가 exp/imp/wgt/total_exp/total_imp/total_wgt인 {ym: 값}):
+    [시작 인덱스, 값, 값, …] — months[시작]부터 이어지는 밀집 배열, 중간에 없는 월은
+    null, 앞뒤 빈 구간은 잘라냄 (빈 시계열은 [])
+  - 엔티티 맵({코드: {"name", ...}} — countries, regions, sub_items, companies,
+    locations 등): {"#": [코드], "n": [names 인덱스], "c": {필드: [행별 값 | null]}
+    [, "z": {필드: [값이 null인 행 인덱스]}]}
+    (c의 null = 그 행에 필드 없음 — 키가 있는 행만 있는 wgt 등 보존. 키는 있고 값이
+    null인 행은 z에 따로 적어 되살린다 — 그런 행이 없으면 z 생략)
+  - 최상위 items·ranking_6d는 {코드: 엔트리} 그대로 (HS 이름은 모두 달라 사전 이득이
+    없고, 품목·HS6 단위 스트리밍을 유지)
+
+디코드하면 원 구조와 같다 — 단 시계열의 값이 null인 월은 키 자체가 없어진다
+(trade.html은 둘을 구분하지 않는다). 왕복 테스트는 tests/test_compact.py,
+`python -m server.compact`는 현재 DB에 대해 왕복 검증·크기·파싱 시간 비교.
+"""
+import json
+
+from .builder import _head, _iter_items, _iter_projected_ranking, _dumps
+from .database import read_connection
+from .projection import ALL
+
+FORMAT = "v2-compact"
+SERIES_KEYS = frozenset(("exp", "imp", "wgt", "total_exp", "total_imp", "total_wgt"))
+# 엔티티 맵 규칙을 적용하지 않는 최상위 키
+_PLAIN_MAPS = frozenset(("items", "ranking_6d"))
+
+
+class Encoder:
+    def __init__(self, months):
+        self.months = list(months)
+        self._pos = {m: i for i, m in enumerate(self.months)}
+        self.names = []
+        self._name_ix = {}
+
+    def _name(self, name):
+        ix = self._name_ix.get(name)
+        if ix is None:
+            ix = self._name_ix[name] = len(self.names)
+            self.names.append(name)
+        return ix
+
+    def _series(self, s):
+        ix = [self._pos[ym] for ym, v in s.items() if v is not None]
+        if not ix:
+            return []
+        lo = min(ix)
+        arr = [lo] + [None] * (max(ix) - lo + 1)
+        for ym, v in s.items():
+            if v is not None:
+                arr[self._pos[ym] - lo + 1] = v
+        return arr
+
+    def value(self, v, key=None):
+        if key in SERIES_KEYS and isinstance(v, dict):
+            return self._series(v)
+        if isinstance(v, dict):
+            if key not in _PLAIN_MAPS and v and all(
+                    isinstance(x, dict) and "name" in x for x in v.values()):
+                return self._table(v)
+            return {k: self.value(x, k) for k, x in v.items()}
+        if isinstance(v, list):
+            return [self.value(x) for x in v]
+        return v
+
+    def _table(self, m):
+        codes = list(m)
+        fields = []
+        for row in m.values():
+            fields.extend(f for f in row if f != "name" and f not in fields)
+        out = {"#": codes,
+               "n": [self._name(m[c]["name"]) for c in codes],
+               "c": {f: [self.value(m[c][f], f) if f in m[c] else None for c in codes]
+                     for f in fields}}
+        nulls = {}
+        for f in fields:
+            ix = [i for i, c in enumerate(codes) if f in m[c] and m[c][f] is None]
+            if ix:
+                nulls[f] = ix
+        if nulls:
+            out["z"] = nulls
+        return out
+
+
+def _months_of(obj, key=None, out=None):
+    out = set() if out is None else out
+    if isinstance(obj, dict):
+        if key in SERIES_KEYS:
+            out.update(obj)
+        else:
+            for k, v in obj.items():
+                _months_of(v, k, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            _months_of(v, None, out)
+    return out
+
+
+def encode(obj) -> dict:
+    """trade_data_v2 형태 dict(전체·core·샤드) → v2-compact dict"""
+    enc = Encoder(sorted(_months_of(obj)))
+    data = enc.value(obj)
+    return {"format": FORMAT, "months": enc.months, "names": enc.names, "data": data}
+
+
+def decode(doc) -> dict:
+    """v2-compact → trade_data_v2 형태 (검증용 — 브라우저는 trade.html의 decodeCompact)"""
+    months, names = doc["months"], doc["names"]
+
+    def dec(v, key=None):
+        if key in SERIES_KEYS and isinstance(v, list):
+            return {months[v[0] + i]: x for i, x in enumerate(v[1:]) if x is not None}
+        if isinstance(v, dict):
+            if "#" in v:
+                out = {}
+                nulls = {f: set(ix) for f, ix in v.get("z", {}).items()}
+                for i, code in enumerate(v["#"]):
+                    row = {"name": names[v["n"][i]]}
+                    for f, col in v["c"].items():
+                        if col[i] is not None:
+                            row[f] = dec(col[i], f)
+                        elif i in nulls.get(f, ()):
+                            row[f] = None
+                    out[code] = row
+                return out
+            return {k: dec(x, k) for k, x in v.items()}
+        if isinstance(v, list):
+            return [dec(x) for x in v]
+        return v
+
+    return dec(doc["data"])
+
+
+def iter_compact_json(pool=None, chunk_size=1 << 16, proj=ALL):
+    """builder.iter_full_json의 v2-compact판 — 월 축은 DB에서 먼저, 이름 사전은 맨 끝에"""
+    with read_connection(pool) as conn:
+        months = [r[0] for r in conn.execute(
+            "SELECT DISTINCT ym FROM trade_data WHERE ym BETWEEN ? AND ? ORDER BY ym",
+            (proj.start, proj.end))]
+        enc = Encoder(months)
+        buf, size = [], 0
+        for piece in _iter_pieces(conn, enc, proj):
+            buf.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buf).encode("utf-8")
+                buf, size = [], 0
+        buf.append(',"names":' + _dumps(enc.names) + "}")
+        yield "".join(buf).encode("utf-8")
+
+
+def _iter_pieces(conn, enc, proj):
+    head = _head(conn, proj)
+    yield ('{"format":' + _dumps(FORMAT) + ',"months":' + _dumps(enc.months)
+           + ',"data":' + _dumps(enc.value(head))[:-1])
+    yield ',"items":{'
+    for i, (hs, item) in enumerate(_iter_items(conn, head, proj)):
+        yield ("," if i else "") + _dumps(hs) + ":" + _dumps(enc.value(item))
+    yield '},"ranking_6d":{'
+    for i, (hs6, entry) in enumerate(_iter_projected_ranking(conn, "", proj)):
+        yield ("," if i else "") + _dumps(hs6) + ":" + _dumps(enc.value(entry))
+    yield "}}"
+
+
+def _without_nulls(obj, key=None):
+    """비교용: 시계열의 null 값 월 제거 (decode가 되살리지 않는 부분)"""
+    if isinstance(obj, dict):
+        if key in SERIES_KEYS:
+            return {k: v for k, v in obj.items() if v is not None}
+        return {k: _without_nulls(v, k) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_without_nulls(v) for v in obj]
+    return obj
+
+
+def _check():
+    """현재 DB로 왕복 검증 + 원본 대비 크기·json.loads 시간"""
+    import gzip
+    import time
+    from .builder import build_full_json, build_core_json
+
+    def timed_loads(body, n=5):
+        t = time.perf_counter()
+        for _ in range(n):
+            json.loads(body)
+        return (time.perf_counter() - t) / n * 1000
+
+    full = build_full_json()
+    streamed = json.loads(b"".join(iter_compact_json()))
+    if decode(streamed) != _without_nulls(full):
+        raise SystemExit("스트리밍 v2-compact 왕복 불일치")
+    for label, obj in (("full", full), ("core", build_core_json())):
+        doc = encode(obj)
+        if decode(doc) != _without_nulls(obj):
+            raise SystemExit(f"{label} 왕복 불일치")
+        a = _dumps(obj).encode("utf-8")
+        b = _dumps(doc).encode("utf-8")
+        print(f"{label:5s} json {len(a):>11,} (gz {len(gzip.compress(a)):>9,}, "
+              f"parse {timed_loads(a):6.1f}ms) → v2-compact {len(b):>11,} "
+              f"(gz {len(gzip.compress(b)):>9,}, parse {timed_loads(b):6.1f}ms) "
+              f"×{len(a) / len(b):.1f}")
+    print("왕복 검증 OK")
+
+
+if __name__ == "__main__":
+    _check()
@@ -5,3 +5,19 @@ DB_PATH = os.path.join(BASE_DIR, "trade.db")
 JSON_PATH = os.path.join(BASE_DIR, "trade_data_v2.json")
 HTML_PATH = os.path.join(BASE_DIR, "trade.html")
 PROV_JSON_PATH = os.path.join(BASE_DIR, "provisional_data.json")
+
+# 읽기 전용 커넥션 풀 크기 (무료 티어 1 worker 기준 — 스레드풀 동시 DB 작업 상한)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "4"))
+
+# blue/green 교체 감지 주기 (trade.db 파일 identity만 stat — 요청 경로 밖)
+DB_POLL_SECONDS = float(os.environ.get("DB_POLL_SECONDS", "30"))
+
+# 데이터 세대별 빌드 산출물 (dist/g<세대>/ — collector.refresh가 DB 교체 전에 생성)
+ARTIFACT_DIR = os.path.join(BASE_DIR, "dist")
+
+# DB 파생 응답 캐시 (server/cache.py) — 파라미터별 항목 수·직렬화 본문 합계 상한
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "512"))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_MB", "64")) << 20
+
+# 산출물 없는 스트리밍 응답을 DB에서 다 뽑아 둘 임시 버퍼 — 넘으면 디스크로
+STREAM_SPOOL_BYTES = int(os.environ.get("STREAM_SPOOL_MB", "8")) << 20
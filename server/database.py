@@ -1,6 +1,13 @@
 """SQLite 스키마 정의 및 초기화"""
+import contextvars
+import os
+import queue
 import sqlite3
-from .config import DB_PATH
+import time
+import zlib
+from contextlib import contextmanager
+from . import metrics
+from .config import DB_PATH, DB_POOL_SIZE
 
 SCHEMA_SQL = """
 -- 메타데이터
@@ -28,6 +35,12 @@ CREATE TABLE IF NOT EXISTS regions (
     name TEXT NOT NULL
 );
 
+-- 랭킹(HS6) 국가명 — 관세청 API 원문 국가명 (all_countries 사전과 별개)
+CREATE TABLE IF NOT EXISTS ranking_countries (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
 -- 품목 정의
 CREATE TABLE IF NOT EXISTS items (
     hs_code    TEXT PRIMARY KEY,
@@ -69,6 +82,9 @@ CREATE TABLE IF NOT EXISTS company_locations (
 );
 
 -- 시계열 데이터 (통합)
+--   data_type: total | item | item_country | item_region | sub_item | sub_country
+--              | company_loc | ranking | ranking_country | ranking_region
+--   ranking*: hs_code='', sub_code=HS6, entity_code=국가코드/시군구명
 CREATE TABLE IF NOT EXISTS trade_data (
     data_type   TEXT NOT NULL,
     hs_code     TEXT NOT NULL DEFAULT '',
@@ -86,6 +102,125 @@ CREATE INDEX IF NOT EXISTS idx_trade_type_hs ON trade_data(data_type, hs_code);
 CREATE INDEX IF NOT EXISTS idx_trade_type_hs_sub ON trade_data(data_type, hs_code, sub_code);
 CREATE INDEX IF NOT EXISTS idx_hs_names_digits ON hs_names(digits);
 
+-- HS6 랭킹 지표 (collector/ranking_metrics.py가 ranking 행에서 파생, /api/ranking용)
+--   exp_usd·wgt: 입력 사본 (증분 비교용)
+--   price: 이상치(HS6 단가 중앙값의 1/6~6배 밖) 제외한 단가 USD/kg, 없으면 NULL
+--   mom·yoy·pmom·pyoy: 전월·전년동월 대비 %, 산출 불가면 NULL
+CREATE TABLE IF NOT EXISTS ranking_metrics (
+    hs6     TEXT NOT NULL,
+    ym      TEXT NOT NULL,
+    exp_usd INTEGER DEFAULT 0,
+    wgt     INTEGER DEFAULT 0,
+    mom     REAL,
+    yoy     REAL,
+    price   REAL,
+    pmom    REAL,
+    pyoy    REAL,
+    PRIMARY KEY (hs6, ym)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ranking_metrics_ym ON ranking_metrics(ym, exp_usd);
+
+-- 국가 → HS6 역색인 (/api/countries/{code}): ranking_country 행만 담는 부분 인덱스
+CREATE INDEX IF NOT EXISTS idx_trade_country_inv
+    ON trade_data(entity_code, sub_code, ym)
+    WHERE data_type='ranking_country' AND hs_code='';
+
+-- 국가별 월 합계·순위 (collector/country_index.py가 ranking_country 행에서 파생)
+--   n_items: 그 달 수출>0인 HS6 수, rank: 그 달 국가 간 수출 순위 (1=최대)
+CREATE TABLE IF NOT EXISTS country_totals (
+    code    TEXT NOT NULL,
+    ym      TEXT NOT NULL,
+    exp_usd INTEGER DEFAULT 0,
+    n_items INTEGER DEFAULT 0,
+    rank    INTEGER,
+    PRIMARY KEY (code, ym)
+);
+
+CREATE INDEX IF NOT EXISTS idx_country_totals_ym ON country_totals(ym, rank);
+
+-- 시군구 → 품목 역색인 (collector/region_index.py가 파생, /api/regions용)
+--   메인 품목(item_region)과 HS6(ranking_region)을 합친 뒤 같은 지역 안에서
+--   더 긴 코드의 prefix인 코드는 제외 (8542 vs 854232 이중계상 방지)
+--   src: 'item' | 'ranking' — 시계열이 있는 trade_data 유형
+CREATE TABLE IF NOT EXISTS region_items (
+    region TEXT NOT NULL,
+    hs     TEXT NOT NULL,
+    src    TEXT NOT NULL,
+    PRIMARY KEY (region, hs)
+);
+
+CREATE INDEX IF NOT EXISTS idx_region_items_hs ON region_items(hs);
+
+-- region_items의 월별 수출 (src에 따라 item_region / ranking_region 행)
+--   CROSS JOIN: region_items를 바깥 루프로 고정 → trade_data는 PK 검색
+CREATE VIEW IF NOT EXISTS region_series AS
+    SELECT ri.region, ri.hs, t.ym, t.exp_usd
+    FROM region_items ri CROSS JOIN trade_data t
+      ON t.data_type='item_region' AND t.hs_code=ri.hs AND t.sub_code=''
+     AND t.entity_code=ri.region
+    WHERE ri.src='item'
+    UNION ALL
+    SELECT ri.region, ri.hs, t.ym, t.exp_usd
+    FROM region_items ri CROSS JOIN trade_data t
+      ON t.data_type='ranking_region' AND t.hs_code='' AND t.sub_code=ri.hs
+     AND t.entity_code=ri.region
+    WHERE ri.src='ranking';
+
+-- 시군구별 월 합계·순위 (country_totals와 같은 형태, region_series 기준)
+CREATE TABLE IF NOT EXISTS region_totals (
+    code    TEXT NOT NULL,
+    ym      TEXT NOT NULL,
+    exp_usd INTEGER DEFAULT 0,
+    n_items INTEGER DEFAULT 0,
+    rank    INTEGER,
+    PRIMARY KEY (code, ym)
+);
+
+CREATE INDEX IF NOT EXISTS idx_region_totals_ym ON region_totals(ym, rank);
+
+-- 지도 집계 (collector/map_index.py가 파생, /api/map/*용)
+--   map_features: 데이터 코드 → GeoJSON 피처 키
+--     world: 국가 alpha-2 → world.geo.json feature.id (alpha-3)
+--     korea: 시군구 코드 → korea_sgg.geo.json properties.canon (+ 시도 전체명)
+--   map_totals: 피처별 월 수출 합계 (같은 피처로 모이는 코드는 합산)
+CREATE TABLE IF NOT EXISTS map_features (
+    map     TEXT NOT NULL,
+    code    TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    sido    TEXT DEFAULT '',
+    PRIMARY KEY (map, code)
+);
+
+CREATE TABLE IF NOT EXISTS map_totals (
+    map     TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    ym      TEXT NOT NULL,
+    exp_usd INTEGER DEFAULT 0,
+    PRIMARY KEY (map, ym, feature)
+);
+
+-- 세대 간 변경분 (collector/changeset.py가 직전 세대 DB와 비교해 기록, /api/trade-data/changes용)
+--   trade_changes: 추가·변경·삭제된 trade_data 행의 PK (값은 현재 trade_data에서 읽음)
+--   changesets: 세대별 요약. full=1이면 정의·사전 테이블이 바뀌어 행 단위로
+--               패치할 수 없는 세대 (클라이언트는 전체를 다시 받는다)
+CREATE TABLE IF NOT EXISTS trade_changes (
+    generation  INTEGER NOT NULL,
+    data_type   TEXT NOT NULL,
+    hs_code     TEXT NOT NULL DEFAULT '',
+    sub_code    TEXT NOT NULL DEFAULT '',
+    entity_code TEXT NOT NULL DEFAULT '',
+    ym          TEXT NOT NULL,
+    PRIMARY KEY (generation, data_type, hs_code, sub_code, entity_code, ym)
+);
+
+CREATE TABLE IF NOT EXISTS changesets (
+    generation INTEGER PRIMARY KEY,
+    base       INTEGER NOT NULL,        -- 비교 대상 (직전 세대)
+    full       INTEGER NOT NULL DEFAULT 0,
+    n_rows     INTEGER NOT NULL DEFAULT 0
+);
+
 -- 수집 이력
 CREATE TABLE IF NOT EXISTS collection_log (
     id           INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -135,9 +270,12 @@ CREATE TABLE IF NOT EXISTS prov_data (
 CREATE INDEX IF NOT EXISTS idx_prov_data_item ON prov_data(item_key);
 """
 
+# PRAGMA user_version에 찍는 스키마 버전 — SCHEMA_SQL이 바뀌면 자동으로 달라진다
+SCHEMA_VERSION = zlib.crc32(SCHEMA_SQL.encode("utf-8")) & 0x7FFFFFFF
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+
+def get_connection(path=DB_PATH):
+    conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
@@ -148,9 +286,179 @@ def get_connection():
     return conn
 
 
-def init_db():
-    """테이블 생성 (이미 있으면 무시)"""
-    conn = get_connection()
+class ReadPool:
+    """서버용 읽기 전용 커넥션 풀.
+
+    요청마다 connect + PRAGMA 5회를 반복하지 않도록 커넥션을 재사용한다.
+    sqlite3 커넥션은 SQL 문자열별 prepared statement를 캐시하므로
+    (cached_statements) 같은 쿼리는 재파싱 없이 바로 실행된다.
+    커넥션은 스레드풀 워커 사이를 오가므로 check_same_thread=False —
+    대신 풀에서 꺼낸 동안에는 한 스레드만 쓴다.
+
+    pin()한 풀은 커넥션 size개를 한 번에 열어 그 시점의 파일(inode)에 고정한다.
+    경로로 나중에 여는 커넥션은 rename으로 교체된 새 DB를 읽으므로, 그 뒤로는
+    손상돼 버린 커넥션을 다시 열 때 meta.generation이 다르면 거부한다.
+    """
+
+    def __init__(self, path=DB_PATH, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._sem = queue.Queue(maxsize=size)   # 동시 대여 수 제한
+        self._closed = False
+        self.generation = None                  # pin() 후 고정된 세대
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True,
+                               check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only=ON")
+        conn.execute("PRAGMA cache_size=-20000")       # 20MB 페이지 캐시
+        conn.execute("PRAGMA mmap_size=50000000")       # 50MB mmap
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if self.generation is not None and _generation(conn) != self.generation:
+            conn.close()
+            raise sqlite3.OperationalError(
+                f"{self.path}: 세대 {self.generation} 파일이 이미 교체됨")
+        return conn
+
+    def pin(self) -> int:
+        """커넥션 size개를 지금 열어 같은 파일에 고정하고 그 세대를 반환.
+
+        여는 도중 파일이 교체돼 세대가 섞이면 OperationalError (다음 폴링에서 재시도)."""
+        conns = []
+        try:
+            for _ in range(self.size):
+                conns.append(self._connect())
+            gens = {_generation(c) for c in conns}
+        except Exception:
+            for c in conns:
+                c.close()
+            raise
+        if len(gens) != 1:
+            for c in conns:
+                c.close()
+            raise sqlite3.OperationalError(f"{self.path}: 풀을 여는 중 파일이 교체됨")
+        for c in conns:
+            self._idle.put(c)
+        self.generation = gens.pop()
+        return self.generation
+
+    @contextmanager
+    def connection(self):
+        t0 = time.perf_counter()
+        self._sem.put(None)          # 풀 크기 초과 시 반납될 때까지 대기
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            t1 = time.perf_counter()
+            metrics.DB_CONNECTION_SECONDS.observe(t1 - t0, "wait")
+            broken = False
+            try:
+                yield conn
+            except sqlite3.DatabaseError:
+                broken = True
+                raise
+            finally:
+                # 손상된 커넥션, 이미 교체된(닫힌) 풀의 커넥션은 되돌리지 않는다
+                if broken or self._closed:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+                metrics.DB_CONNECTION_SECONDS.observe(time.perf_counter() - t1, "hold")
+        finally:
+            self._sem.get_nowait()
+
+    def close(self):
+        """유휴 커넥션을 닫는다. 대여 중인 커넥션은 반납 시점에 닫힌다."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_read_pool = ReadPool()
+# bound_read_pool()로 묶인 풀 — 없으면 서버 기본 풀
+_bound_pool = contextvars.ContextVar("read_pool", default=None)
+
+
+def read_connection(pool=None):
+    """풀에서 읽기 전용 커넥션을 빌린다: `with read_connection() as conn:`
+
+    pool을 주면 그 풀에서 (세대 교체 전 새 DB로 캐시를 미리 데울 때).
+    안 주면 bound_read_pool()로 묶인 풀, 그것도 없으면 서버 기본 풀."""
+    return (pool or _bound_pool.get() or _read_pool).connection()
+
+
+def current_read_pool():
+    """지금 설치된 서버 기본 풀 — generation.state["generation"]과 함께 교체된다"""
+    return _read_pool
+
+
+@contextmanager
+def bound_read_pool(pool):
+    """이 안에서 pool 없이 부른 read_connection()이 모두 pool을 쓰게 한다.
+
+    빌드 하나가 도중에 세대 교체가 일어나도 요청 시점 세대의 풀만 읽도록
+    (server/cache.py). 스레드풀 워커 안에서 건다."""
+    token = _bound_pool.set(pool)
+    try:
+        yield pool
+    finally:
+        _bound_pool.reset(token)
+
+
+def install_read_pool(pool):
+    """서버 기본 풀을 교체하고 옛 풀을 반환한다 (세대 교체).
+
+    옛 풀은 닫지 않는다 — 교체 직전 요청에 묶여 아직 돌고 있는 빌드가 옛 세대를
+    끝까지 읽을 수 있도록, 호출자가 잠시 뒤 close()한다."""
+    global _read_pool
+    old, _read_pool = _read_pool, pool
+    return old
+
+
+def _generation(conn) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key='generation'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def read_generation(pool=None) -> int:
+    """meta.generation — collector.refresh가 DB를 교체할 때마다 +1"""
+    with read_connection(pool) as conn:
+        return _generation(conn)
+
+
+def schema_current(path=DB_PATH) -> bool:
+    """DB의 user_version이 지금 SCHEMA_SQL과 같은지 (읽기 전용으로 헤더만 확인)"""
+    if not os.path.exists(path):
+        return False
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+
+
+def init_db(path=DB_PATH):
+    """테이블 생성 (이미 있으면 무시)
+
+    스키마 버전(user_version)이 같으면 DDL을 건너뛴다 — 서버 콜드 스타트가
+    SCHEMA_SQL 전체를 매번 실행하지 않도록. 수집기는 새 DB에 이걸 부르므로
+    collector.refresh가 만든 trade.db에는 버전이 찍혀 있다.
+    저널 모드는 건드리지 않는다 — 서빙 중인 trade.db는 collector.refresh가
+    DELETE 모드로 만들어 두고, 서버 기동 시 WAL로 바꾸면 교체가 막힌다."""
+    if schema_current(path):
+        return
+    conn = sqlite3.connect(path)
     conn.executescript(SCHEMA_SQL)
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
     conn.commit()
     conn.close()
@@ -0,0 +1,132 @@
+"""데이터 세대(generation) 감시 — blue/green DB 교체를 서버에 반영
+
+collector.refresh가 새 DB 파일을 완성한 뒤 rename으로 trade.db를 교체하면
+meta.generation이 1 올라간다. 서버는 요청마다 getmtime을 부르는 대신
+백그라운드에서 주기적으로 파일 identity(inode·mtime)만 확인하고,
+세대가 올라갔으면:
+  1) 새 DB용 읽기 풀을 열고
+  2) 등록된 캐시를 그 풀로 스레드풀에서 미리 데운 다음
+  3) 풀·캐시·세대 번호를 한 번에 교체한다.
+교체 직전까지 요청은 옛 세대(옛 inode를 잡은 풀 + 옛 캐시)로 응답한다.
+교체 전에 들어온 요청의 빌드는 끝까지 옛 풀로 읽고(server/cache.py), 옛 풀은
+한 폴링 주기 뒤에 닫는다.
+"""
+import asyncio
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import metrics
+from .cache import GenerationCache, SingleFlight
+from .config import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, DB_PATH, DB_POLL_SECONDS
+from .database import ReadPool, current_read_pool, install_read_pool
+
+# name → builder(pool): 세대마다 미리 만들어 둘 캐시 값
+_warmers = {}
+# name → 현재 세대의 값
+_values = {}
+state = {"generation": None, "file_id": None}
+# 워밍 전 동시 미스가 한 번만 빌드하도록 공유
+_flight = SingleFlight()
+# 파라미터별 DB 파생 응답 (월·정렬·코드 …) — 세대가 바뀌면 옛 값을 주며 백그라운드 재빌드
+responses = GenerationCache("responses", lambda: state["generation"],
+                            CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, current_read_pool)
+metrics.register_cache("warm", lambda: (len(_values), None))
+metrics.Gauge("trade_data_generation", "서빙 중인 데이터 세대 (meta.generation)",
+              fn=lambda: state["generation"])
+
+
+def register(name, builder):
+    """세대 교체 시 미리 데울 캐시 등록. builder(pool) → 값"""
+    _warmers[name] = builder
+
+
+def get(name):
+    """현재 세대의 캐시 값 (아직 없으면 None)"""
+    return _values.get(name)
+
+
+async def ensure(name):
+    """현재 세대 값. 아직 없으면(기동 직후 워밍 전 등) 빌드를 한 번만 돌리고
+    동시에 들어온 요청은 같은 빌드를 기다린다 (single-flight)."""
+    value = _values.get(name)
+    if value is not None:
+        metrics.CACHE_REQUESTS.inc("warm", "hit")
+        return value
+    metrics.CACHE_REQUESTS.inc("warm", "miss")
+    gen, pool = state["generation"], current_read_pool()
+    # (이름, 세대)로 공유 — 교체 뒤 요청이 교체 전 풀로 돌던 빌드에 합류하지 않게
+    value = await _flight.run((name, gen), _build, name, pool)
+    # 빌드 중 세대가 바뀌었으면 새 세대 캐시를 덮지 않는다
+    if state["generation"] == gen and name not in _values:
+        _values[name] = value
+    return value
+
+
+def _file_id():
+    try:
+        st = os.stat(DB_PATH)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def _open_next():
+    """새 읽기 풀 — 커넥션을 모두 지금 열어 이 시점의 파일에 고정 (ReadPool.pin)"""
+    pool = ReadPool(DB_PATH)
+    try:
+        return pool, pool.pin()
+    except Exception:
+        pool.close()
+        raise
+
+
+def _build(name, pool):
+    with metrics.CACHE_BUILD_SECONDS.time("warm", name):
+        return _warmers[name](pool)
+
+
+def _warm(pool):
+    return {name: _build(name, pool) for name in _warmers}
+
+
+async def refresh(force=False, warm=True) -> bool:
+    """trade.db가 바뀌었고 세대가 올라갔으면 캐시를 데운 뒤 교체. 교체 여부 반환.
+
+    warm=False면 데우지 않고 바로 교체 (콜드 스타트 — 이어서 preload()를 백그라운드로)."""
+    fid = _file_id()
+    if fid is None or (fid == state["file_id"] and not force):
+        return False
+    pool, gen = await run_in_threadpool(_open_next)
+    if not force and state["generation"] is not None and gen <= state["generation"]:
+        # 같은 세대 파일의 in-place 갱신 등 — 교체 대상 아님
+        pool.close()
+        state["file_id"] = fid
+        return False
+    values = await run_in_threadpool(_warm, pool) if warm else {}
+    # 여기부터 await 없음 → 이벤트 루프 기준 원자적 교체
+    old = install_read_pool(pool)
+    _values.clear()
+    _values.update(values)
+    state["generation"] = gen
+    state["file_id"] = fid
+    # 교체 전 요청에 묶인 빌드(server/cache.py)가 끝날 때까지 옛 풀은 한 주기 더 둔다
+    asyncio.get_running_loop().call_later(DB_POLL_SECONDS, old.close)
+    return True
+
+
+async def preload():
+    """등록된 캐시를 하나씩 ensure() — 첫 요청과 겹쳐도 빌드는 한 번 (single-flight)"""
+    for name in list(_warmers):
+        await ensure(name)
+
+
+async def watch():
+    """DB_POLL_SECONDS마다 refresh() — startup에서 task로 띄운다."""
+    while True:
+        await asyncio.sleep(DB_POLL_SECONDS)
+        try:
+            if await refresh():
+                print(f"[generation] 데이터 세대 {state['generation']} 적용")
+        except Exception as e:  # 교체 실패 시 옛 세대로 계속 서빙
+            print(f"[generation] 세대 교체 실패: {e}")
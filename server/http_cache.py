@@ -0,0 +1,167 @@
+"""HTTP 조건부 요청 — 콘텐츠 해시 ETag, Last-Modified, 304
+
+trade.html / provisional.html은 `cache:"no-cache"`로 fetch하므로 방문마다 재검증한다.
+응답마다 강한 ETag(내용 sha256 앞 32자)를 붙이고 If-None-Match / If-Modified-Since가
+맞으면 본문 없이 304를 돌려준다 → 재방문은 수백 바이트.
+
+해시는 요청마다 계산하지 않는다:
+  - 파일: (경로, mtime, 크기)별로 한 번만 계산해 메모리에 보관 (스레드풀에서)
+  - DB 응답: 세대 교체 때 Payload로 한 번 직렬화하면서 계산
+    (compress=True면 gzip/br 본문도 그때 한 번 만들어 두고 Accept-Encoding으로 고른다)
+"""
+import gzip
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:     # 로컬 개발 환경 — gzip만
+    brotli = None
+
+# 조건부 재검증을 강제 — 브라우저는 매번 묻되 바뀐 게 없으면 304만 받는다
+CACHE_CONTROL = "no-cache"
+
+_file_hashes = {}     # path → ((mtime_ns, size), hex)
+metrics.register_cache("file_hash", lambda: (len(_file_hashes), None))
+
+
+def _hash_file(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:32]
+
+
+async def file_hash(path, st) -> str:
+    """파일 내용 해시 (stat이 같으면 캐시값)"""
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _file_hashes.get(path)
+    if cached and cached[0] == key:
+        metrics.CACHE_REQUESTS.inc("file_hash", "hit")
+        return cached[1]
+    metrics.CACHE_REQUESTS.inc("file_hash", "miss")
+    digest = await run_in_threadpool(_hash_file, path)
+    _file_hashes[path] = (key, digest)
+    return digest
+
+
+def http_date(ts: float) -> str:
+    return formatdate(ts, usegmt=True)
+
+
+def accepted_encodings(header: str) -> dict:
+    """Accept-Encoding → {coding: q}"""
+    acc = {}
+    for part in (header or "").split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.partition("=")
+            if k.strip() == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        acc[token] = q
+    return acc
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교 — W/ 접두어 무시)"""
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == bare for t in header.split(","))
+
+
+def is_not_modified(request, etag: str, last_modified: float = None) -> bool:
+    """RFC 7232: If-None-Match가 있으면 그것만, 없을 때만 If-Modified-Since"""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return _etag_matches(inm, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    """304 — 본문·Content-Length 없이 검증 헤더만"""
+    return Response(status_code=304, headers=headers)
+
+
+def validator_headers(etag: str, last_modified: float = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+# 이보다 작은 본문은 압축 이득보다 헤더·CPU 비용이 큼
+MIN_COMPRESS = 1024
+
+
+class Payload:
+    """세대마다 한 번 직렬화해 두는 JSON 응답 본문 + ETag
+
+    compress=True면 gzip·brotli 본문도 미리 만들어 둔다 (precompressed_file의
+    사이드카와 같은 선택 규칙·표현별 ETag). 세대 캐시처럼 여러 번 서빙할 값에만."""
+
+    def __init__(self, body: bytes, last_modified: float = None,
+                 media_type: str = "application/json", compress: bool = False):
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{self.digest}"'
+        self.last_modified = last_modified
+        self.media_type = media_type
+        self.encoded = {}       # coding → bytes (선호 순서: br, gzip)
+        if compress and len(body) >= MIN_COMPRESS:
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=9)
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=9)
+
+    @classmethod
+    def from_obj(cls, obj, last_modified: float = None, compress: bool = False):
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls(body, last_modified, compress=compress)
+
+    @property
+    def nbytes(self) -> int:
+        """메모리 점유 (원문 + 압축본) — server/cache.py 바이트 상한용"""
+        return len(self.body) + sum(len(b) for b in self.encoded.values())
+
+    def _pick(self, request):
+        if not self.encoded:
+            return None
+        acc = accepted_encodings(request.headers.get("accept-encoding", ""))
+        for coding in self.encoded:
+            if acc.get(coding, acc.get("*", 0.0)) > 0:
+                return coding
+        return None
+
+    def response(self, request) -> Response:
+        coding = self._pick(request)
+        etag = f'"{self.digest}-{coding}"' if coding else self.etag
+        headers = validator_headers(etag, self.last_modified)
+        if self.encoded:
+            headers["Vary"] = "Accept-Encoding"
+        if is_not_modified(request, etag, self.last_modified):
+            return not_modified_response(headers)
+        if coding:
+            headers["Content-Encoding"] = coding
+            return Response(self.encoded[coding], media_type=self.media_type,
+                            headers=headers)
+        return Response(self.body, media_type=self.media_type, headers=headers)
@@ -0,0 +1,139 @@
+"""국가별·국내 지역별 수출 품목 — 역색인 조회 (trade.html 🌍·🏭 탭)
+
+국가: ranking_country 행 (부분 인덱스 idx_trade_country_inv) + country_totals
+지역: region_items(상위 코드 중복 제거 완료) → region_series 뷰 + region_totals
+
+  - *_summary(): 월 하나의 목록 (*_totals, 순위순) + 전 기간 합계(지도용)
+  - country() / region(): 1곳의 품목별 월 시계열, 그곳 최신월 수출액 내림차순
+  - regions_by_item(): 품목 1개의 지역별 시계열 (지역 탭 품목 드릴다운의 지역 비교)
+"""
+from .database import read_connection
+from .months import prev_month, year_ago, change
+
+
+def _summary(conn, table, names, month) -> dict:
+    if month is None:
+        month = conn.execute(f"SELECT MAX(ym) FROM {table}").fetchone()[0]
+    series, n_items = {}, {}
+    for r in conn.execute(f"SELECT code, ym, exp_usd, n_items FROM {table}"):
+        series.setdefault(r["code"], {})[r["ym"]] = r["exp_usd"]
+        if r["ym"] == month:
+            n_items[r["code"]] = r["n_items"]
+    ranked = [r[0] for r in conn.execute(
+        f"SELECT code FROM {table} WHERE ym=? ORDER BY rank, code", (month,))]
+    # 그 달 실적 없는 곳도 뒤에 (trade.html은 합계 0으로 목록 끝에 둠)
+    ranked += sorted(set(series) - set(ranked))
+    py = year_ago(month) if month else None
+    out = []
+    for i, code in enumerate(ranked):
+        s = series[code]
+        out.append({
+            "code": code, "name": names.get(code) or code, "rank": i + 1,
+            "exp": s.get(month) or 0, "n_items": n_items.get(code, 0),
+            "mom": change(s, month, prev_month(month)) if month else None,
+            "yoy": change(s, month, py) if month else None,
+            "total": sum(v or 0 for v in s.values()),
+        })
+    return {"month": month, "list": out}
+
+
+def _items(rows):
+    """(hs, ym, exp_usd) 정렬 행 → [{hs, name, exp}]"""
+    items, cur = [], None
+    for r in rows:
+        if cur is None or cur["hs"] != r[0]:
+            cur = {"hs": r[0], "name": "", "exp": {}}
+            items.append(cur)
+        cur["exp"][r[1]] = r[2]
+    return items
+
+
+def _detail(conn, code, name, totals_table, items, names) -> dict:
+    series = {r[0]: r[1] for r in conn.execute(
+        f"SELECT ym, exp_usd FROM {totals_table} WHERE code=? ORDER BY ym", (code,))}
+    month = max(series) if series else None
+    for it in items:
+        it["name"] = names.get(it["hs"]) or it["hs"]
+    items.sort(key=lambda it: -(it["exp"].get(month) or 0))
+    return {"code": code, "name": name or code,
+            "month": month, "series": series, "items": items}
+
+
+def _hs_names(conn, codes) -> dict:
+    """메인 품목명(items) 우선, 없으면 hs_names"""
+    if not codes:
+        return {}
+    marks = ",".join("?" * len(codes))
+    names = {r[0]: r[1] for r in conn.execute(
+        f"SELECT hs_code, name FROM hs_names WHERE hs_code IN ({marks})", codes)}
+    names.update({r[0]: r[1] for r in conn.execute(
+        f"SELECT hs_code, name FROM items WHERE hs_code IN ({marks})", codes)})
+    return names
+
+
+# ── 국가 ──
+
+def country_summary(month=None, pool=None) -> dict:
+    with read_connection(pool) as conn:
+        names = {r[0]: r[1] for r in conn.execute(
+            "SELECT code, name FROM ranking_countries")}
+        s = _summary(conn, "country_totals", names, month)
+    return {"month": s["month"], "countries": s["list"]}
+
+
+def country(code, pool=None):
+    """{code, name, month, series, items:[{hs, name, exp}]} — 데이터 없으면 None"""
+    with read_connection(pool) as conn:
+        items = _items(conn.execute(
+            "SELECT sub_code, ym, exp_usd FROM trade_data "
+            "WHERE data_type='ranking_country' AND entity_code=? AND hs_code='' "
+            "ORDER BY sub_code, ym", (code,)))
+        if not items:
+            return None
+        codes = [it["hs"] for it in items]
+        names = {r[0]: r[1] for r in conn.execute(
+            "SELECT hs_code, name FROM hs_names WHERE digits=6 AND hs_code IN "
+            f"({','.join('?' * len(codes))})", codes)}
+        row = conn.execute(
+            "SELECT name FROM ranking_countries WHERE code=?", (code,)).fetchone()
+        return _detail(conn, code, row and row[0], "country_totals", items, names)
+
+
+# ── 시군구 ──
+
+def _region_names(conn) -> dict:
+    return {r[0]: r[1] for r in conn.execute("SELECT code, name FROM regions")}
+
+
+def region_summary(month=None, pool=None) -> dict:
+    with read_connection(pool) as conn:
+        s = _summary(conn, "region_totals", _region_names(conn), month)
+    return {"month": s["month"], "regions": s["list"]}
+
+
+def region(code, pool=None):
+    with read_connection(pool) as conn:
+        items = _items(conn.execute(
+            "SELECT hs, ym, exp_usd FROM region_series WHERE region=? "
+            "ORDER BY hs, ym", (code,)))
+        if not items:
+            return None
+        names = _hs_names(conn, [it["hs"] for it in items])
+        row = conn.execute(
+            "SELECT name FROM regions WHERE code=?", (code,)).fetchone()
+        return _detail(conn, code, row and row[0], "region_totals", items, names)
+
+
+def regions_by_item(hs, pool=None):
+    """{hs, name, regions:[{code, name, exp}]} — 중복 제거 후 이 코드가 남은 지역만"""
+    with read_connection(pool) as conn:
+        rows = _items(conn.execute(
+            "SELECT region, ym, exp_usd FROM region_series WHERE hs=? "
+            "ORDER BY region, ym", (hs,)))
+        if not rows:
+            return None
+        rnames = _region_names(conn)
+        name = _hs_names(conn, [hs]).get(hs) or hs
+    return {"hs": hs, "name": name,
+            "regions": [{"code": r["hs"], "name": rnames.get(r["hs"]) or r["hs"],
+                         "exp": r["exp"]} for r in rows]}
@@ -1,12 +1,21 @@
 """FastAPI 서버: trade.html에 데이터 제공"""
+import asyncio
 import os
-from fastapi import FastAPI
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from . import artifacts, generation
 from .config import BASE_DIR, DB_PATH
-from .provisional_builder import build_provisional_json
-from .database import init_db
+from .builder import iter_full_json, build_core_json, build_ranking_shard, spooled
+from .http_cache import (Payload, file_hash, is_not_modified, not_modified_response,
+                         validator_headers)
+from .precompressed import precompressed_file
+from .provisional_builder import build_provisional_json, provisional_index
+from .ranking import query_ranking, SORTS as RANK_SORTS, MIN_EXP
+from .summary import build_summary
+from . import changes, choropleth, compact, locations, maps, metrics, projection, search
+from .database import current_read_pool, init_db
 
 app = FastAPI(title="수출입 대시보드 API")
 
@@ -16,96 +25,447 @@ app.add_middleware(
     allow_methods=["GET"],
     allow_headers=["*"],
 )
+# 가장 바깥 — CORS·오류 처리까지 포함한 시간과 실제 전송 바이트
+app.add_middleware(metrics.MetricsMiddleware)
 
-# 캐시: DB 파일 수정 시간 기준 (잠정치용 — 확정치는 정적 파일 스트리밍)
-_prov_cache = {"data": None, "mtime": 0}
+
+
+def _projection(request, allowed=projection.TRADE_FIELDS):
+    """from/to/fields/items 쿼리 → (Projection, None) 또는 (None, 400 응답)"""
+    q = request.query_params
+    try:
+        return projection.parse(q.get("from"), q.get("to"), q.get("fields"),
+                                q.get("items"), allowed), None
+    except ValueError as e:
+        return None, JSONResponse({"error": str(e)}, status_code=400)
+
+
+def _compact(fmt):
+    """format 쿼리 → v2-compact 여부 (잘못된 값이면 None)"""
+    return {"json": False, "compact": True}.get(fmt)
+
+
+def _format_error():
+    return JSONResponse({"error": "format은 json|compact"}, status_code=400)
+
+
+def _payload(build, *args):
+    """빌더 결과 → 사전 압축 Payload (None이면 None — 404 결과도 그대로 캐시)"""
+    result = build(*args)
+    return None if result is None else Payload.from_obj(result, compress=True)
+
+
+async def _cached(key, build, *args):
+    """DB 파생 응답 — 세대 캐시(server/cache.py): 스레드풀 빌드, 동시 미스는 빌드
+    하나를 공유, 세대가 바뀐 직후엔 옛 값을 주면서 백그라운드 재빌드"""
+    return await generation.responses.get(key, _payload, build, *args)
+
+
+def _svg_payload(build, *args):
+    return Payload(build(*args).encode("utf-8"), media_type="image/svg+xml", compress=True)
+
+
+def _encoded(build, use_compact, *args):
+    obj = build(*args)
+    return compact.encode(obj) if use_compact and obj is not None else obj
+
+
+def _provisional_payloads(pool=None):
+    """잠정치를 세대당 한 번 조회해 전체·요약·품목별로 직렬화 + 사전 압축 + ETag.
+    요청은 이 bytes를 그대로 내보낸다 (재직렬화·압축·mtime 조회 없음)."""
+    data = build_provisional_json(pool)
+    mtime = os.path.getmtime(pool.path if pool else DB_PATH)
+    return {
+        "all": Payload.from_obj(data, mtime, compress=True),
+        "index": Payload.from_obj(provisional_index(data), mtime, compress=True),
+        "items": {key: Payload.from_obj(item, mtime, compress=True)
+                  for key, item in data.items()},
+    }
+
+
+# 캐시: 데이터 세대(meta.generation) 기준 — generation.py가 교체 전에 미리 데움
+# (잠정치용 — 확정치는 세대별 산출물/정적 파일 스트리밍)
+generation.register("provisional", _provisional_payloads)
+generation.register("search", search.build_index)
+
+
+# 기동 직후 백그라운드로 미리 만들어 둘 응답 — 첫 화면들이 기본 파라미터로 부르는 것
+_HOT_RESPONSES = (
+    (("ranking", None, "yoy", MIN_EXP, 0), query_ranking, None, "yoy", MIN_EXP, 0),
+    (("countries", None), locations.country_summary, None),
+    (("regions", None), locations.region_summary, None),
+)
+# 해시(ETag)를 미리 계산해 둘 페이지 (+ 현재 세대 core 산출물)
+_HOT_FILES = ("trade.html", "provisional.html")
+
+
+async def _preload():
+    """콜드 스타트 후 워머·핫 응답·파일 해시를 차례로 데운다 (요청과 겹치면 빌드 공유)"""
+    try:
+        await generation.preload()
+        for key, build, *args in _HOT_RESPONSES:
+            await _cached(key, build, *args)
+        gen = generation.state["generation"]
+        paths = [os.path.join(BASE_DIR, name) for name in _HOT_FILES]
+        paths += [artifacts.existing_artifact(gen, name)
+                  for name in (artifacts.SUMMARY, artifacts.CORE,
+                               artifacts.compact(artifacts.CORE))]
+        for path in filter(None, paths):
+            if os.path.exists(path):
+                await file_hash(path, os.stat(path))
+    except Exception as e:  # 미리 데우기 실패 — 요청이 오면 그때 빌드
+        print(f"[startup] 미리 데우기 실패: {e}")
 
 
 @app.on_event("startup")
 async def startup():
+    # 스키마 버전이 같으면 DDL 생략, 캐시는 데우지 않고 바로 서빙 시작
     init_db()
+    await generation.refresh(force=True, warm=False)
+    app.state.preload = asyncio.create_task(_preload())
+    app.state.generation_watch = asyncio.create_task(generation.watch())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.preload.cancel()
+    app.state.generation_watch.cancel()
 
 
 @app.get("/api/trade-data")
-async def get_trade_data():
+async def get_trade_data(request: Request, format: str = "json"):
     """trade.html이 기대하는 완전한 JSON 구조 반환.
 
-    종전엔 builder로 DB→dict 재조립 후 인메모리 직렬화(53MB+)했는데,
-    무료 티어 RAM(512MB)에서 regions 데이터 증가로 OOM → 502가 남.
-    DB는 배포 시점에 trade_data_v2.json에서 생성돼 내용이 항상 동일하므로
-    정적 파일을 스트리밍(FileResponse)하는 것으로 대체 — 메모리 사용 수 MB."""
-    return FileResponse(os.path.join(BASE_DIR, "trade_data_v2.json"),
-                        media_type="application/json")
+    종전엔 builder로 DB→dict 재조립 후 인메모리 직렬화(53MB+)하다 무료 티어
+    RAM(512MB)에서 OOM → 502가 나서 배포 시점 정적 파일로 대체했었다.
+    지금은 collector.refresh가 세대마다 미리 만든 산출물(+.br/.gz)을 그대로
+    스트리밍하고, 산출물이 없으면 DB 커서로 품목/HS6 하나씩 JSON 조각을
+    흘려보낸다(iter_full_json) — 어느 쪽이든 최대 메모리가 데이터 누적과 무관.
+    DB 스트림은 임시 파일에 먼저 받아(spooled) 커넥션을 반납한 뒤 내보낸다.
+    (sync 제너레이터라 Starlette가 스레드풀에서 돌림 → 이벤트 루프 블로킹 없음)
+
+    from/to/fields/items를 주면 그 창·필드·품목만 DB에서 바로 스트리밍.
+    format=compact면 v2-compact (server/compact.py)."""
+    proj, error = _projection(request)
+    if error:
+        return error
+    use_compact = _compact(format)
+    if use_compact is None:
+        return _format_error()
+    name = artifacts.TRADE_DATA
+    if proj.is_all:
+        built = artifacts.existing_artifact(
+            generation.state["generation"],
+            artifacts.compact(name) if use_compact else name)
+        if built:
+            return await precompressed_file(request, built, "application/json")
+        if not os.path.exists(DB_PATH):
+            # DB 없는 배포: 정적 JSON (compact 요청이어도 — 클라이언트는 format 표식으로 구분)
+            return await precompressed_file(
+                request, os.path.join(BASE_DIR, "trade_data_v2.json"), "application/json")
+    # 스트리밍은 본문 해시를 미리 알 수 없음 → 세대(+파라미터) 기준 약한 ETag
+    tag = f'g{generation.state["generation"]}' + ("" if proj.is_all else f"-{proj.tag}")
+    headers = validator_headers(f'W/"{tag}{"-c" if use_compact else ""}"')
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified_response(headers)
+    # ETag의 세대와 같은 풀에서 읽는다 (스트림 시작 전에 세대가 바뀌어도)
+    pool = current_read_pool()
+    body = spooled(compact.iter_compact_json(pool, proj=proj) if use_compact
+                   else iter_full_json(pool, proj=proj))
+    return StreamingResponse(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/trade-data/core")
+async def get_trade_core(request: Request, format: str = "json"):
+    """첫 화면용 본체 — /api/trade-data에서 ranking_6d만 뺀 것 + ranking_shards.
+    ranking_6d(전체의 대부분)는 랭킹·국가·지역·검색 탭이 필요한 HS2 샤드만
+    /api/ranking/shard/{hs2}로 따로 받는다."""
+    proj, error = _projection(request)
+    if error:
+        return error
+    use_compact = _compact(format)
+    if use_compact is None:
+        return _format_error()
+    name = artifacts.compact(artifacts.CORE) if use_compact else artifacts.CORE
+    built = proj.is_all and artifacts.existing_artifact(
+        generation.state["generation"], name)
+    if built:
+        return await precompressed_file(request, built, "application/json")
+    payload = await _cached(("core", proj, use_compact), _encoded,
+                            build_core_json, use_compact, None, proj)
+    return payload.response(request)
+
+
+@app.get("/api/summary")
+async def get_summary(request: Request):
+    """첫 화면 요약 — 주요 품목 KPI(최신월·MoM·YoY·수지)와 총괄 탭 시계열 (수 KB).
+    trade.html은 core보다 먼저 받아 KPI·총괄을 그린다 (server/summary.py)."""
+    built = artifacts.existing_artifact(generation.state["generation"], artifacts.SUMMARY)
+    if built:
+        return await precompressed_file(request, built, "application/json")
+    payload = await _cached(("summary",), build_summary)
+    return payload.response(request)
+
+
+@app.get("/api/trade-data/changes")
+async def get_trade_changes(request: Request, since: int, parts: str = "all"):
+    """since 세대 이후 추가·변경·삭제된 trade_data 행 (재방문 클라이언트 패치용).
+    패치할 수 없으면(보관 범위 밖, 정의·사전 변경) {"full": true}."""
+    if since < 0 or parts not in ("all", "core"):
+        return JSONResponse({"error": "since는 0 이상 세대 번호, parts는 all|core"},
+                            status_code=400)
+    payload = await _cached(("changes", since, parts), changes.changes,
+                            since, parts == "core")
+    return payload.response(request)
+
+
+@app.get("/api/ranking/shard/{hs2}")
+async def get_ranking_shard(hs2: str, request: Request, format: str = "json"):
+    """ranking_6d 중 HS2 코드 하나 분량 {hs6: {name, exp, wgt, countries[, regions]}}"""
+    if len(hs2) != 2 or not hs2.isdigit():
+        return JSONResponse({"error": "hs2는 두 자리 숫자"}, status_code=400)
+    proj, error = _projection(request)
+    if error:
+        return error
+    use_compact = _compact(format)
+    if use_compact is None:
+        return _format_error()
+    name = artifacts.ranking_shard(hs2)
+    built = proj.is_all and artifacts.existing_artifact(
+        generation.state["generation"], artifacts.compact(name) if use_compact else name)
+    if built:
+        return await precompressed_file(request, built, "application/json")
+    payload = await _cached(("shard", hs2, proj, use_compact), _encoded,
+                            build_ranking_shard, use_compact, hs2, None, proj)
+    if payload is None:
+        return JSONResponse({"error": f"HS2 {hs2} 샤드 없음"}, status_code=404)
+    return payload.response(request)
+
+
+@app.get("/api/ranking")
+async def get_ranking(request: Request, month: str = None, sort: str = "yoy",
+                      min_exp: int = MIN_EXP, limit: int = 0):
+    """HS6 급등/급락 랭킹 (trade.html 🔥 탭) — 사전 계산된 ranking_metrics에서
+    해당 월만 인덱스로 읽어 정렬. limit=0이면 전체, TOP 15 차트 시계열 포함."""
+    if sort not in RANK_SORTS:
+        return JSONResponse({"error": f"sort는 {'|'.join(RANK_SORTS)} 중 하나"},
+                            status_code=400)
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    payload = await _cached(("ranking", month, sort, min_exp, limit), query_ranking,
+                            month, sort, min_exp, limit)
+    return payload.response(request)
+
+
+@app.get("/api/countries")
+async def get_countries(request: Request, month: str = None):
+    """국가별 요약: 해당 월(기본 최신) 수출·순위·MoM/YoY·품목 수 + 전 기간 합계"""
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    payload = await _cached(("countries", month), locations.country_summary, month)
+    return payload.response(request)
+
+
+@app.get("/api/countries/{code}")
+async def get_country(code: str, request: Request):
+    """국가 1개로 수출하는 HS6 품목 (월별 시계열, 최신월 수출액 내림차순)"""
+    payload = await _cached(("country", code), locations.country, code)
+    if payload is None:
+        return JSONResponse({"error": f"국가 {code} 데이터 없음"}, status_code=404)
+    return payload.response(request)
+
+
+@app.get("/api/regions")
+async def get_regions(request: Request, month: str = None):
+    """시군구별 요약: 해당 월(기본 최신) 수출·순위·MoM/YoY·품목 수 + 전 기간 합계"""
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    payload = await _cached(("regions", month), locations.region_summary, month)
+    return payload.response(request)
+
+
+@app.get("/api/regions/by-item/{hs}")
+async def get_regions_by_item(hs: str, request: Request):
+    """품목(HS) 1개의 시군구별 월 시계열 — 지역 탭 품목 드릴다운의 지역 비교용"""
+    payload = await _cached(("regions-by-item", hs), locations.regions_by_item, hs)
+    if payload is None:
+        return JSONResponse({"error": f"HS {hs} 지역 데이터 없음"}, status_code=404)
+    return payload.response(request)
+
+
+@app.get("/api/regions/{sgg}")
+async def get_region(sgg: str, request: Request):
+    """시군구 1곳의 수출 품목 (상위 코드 중복 제거, 최신월 수출액 내림차순)"""
+    payload = await _cached(("region", sgg), locations.region, sgg)
+    if payload is None:
+        return JSONResponse({"error": f"지역 {sgg} 데이터 없음"}, status_code=404)
+    return payload.response(request)
+
+
+@app.get("/api/map/world")
+async def get_map_world(request: Request, month: str = None, hs: str = None):
+    """세계 지도 국가별 수출 (world.geo.json feature.id = alpha-3 키).
+    month 없으면 전 기간 합계, hs(HS6)를 주면 그 품목 한정."""
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    payload = await _cached(("map", "world", month, hs), maps.world, month, hs)
+    return payload.response(request)
+
+
+@app.get("/api/map/korea")
+async def get_map_korea(request: Request, month: str = None, hs: str = None):
+    """시군구 지도 수출 (korea_sgg.geo.json properties.canon 키) + 시도 합계.
+    month 없으면 최신월, hs를 주면 그 품목 한정."""
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    payload = await _cached(("map", "korea", month, hs), maps.korea, month, hs)
+    return payload.response(request)
+
+
+@app.get("/api/map/{name}.svg")
+async def get_map_svg(name: str, request: Request, month: str = None,
+                      metric: str = "exp", hs: str = None):
+    """지도 탭 SVG 단계구분도 — (지도, 월, 지표, 품목)별로 서버가 그려 세대 캐시에 둔다.
+    GeoJSON·집계 없이 trade.html이 그대로 끼워 넣는다 (server/choropleth.py)."""
+    render = choropleth.RENDERERS.get(name)
+    if render is None:
+        return JSONResponse({"error": f"지도 {name} 없음"}, status_code=404)
+    if metric not in choropleth.METRICS:
+        return JSONResponse({"error": f"metric은 {'|'.join(choropleth.METRICS)} 중 하나"},
+                            status_code=400)
+    if month is not None and not (len(month) == 6 and month.isdigit()):
+        return JSONResponse({"error": "month는 YYYYMM"}, status_code=400)
+    if hs is not None and not hs.isdigit():
+        return JSONResponse({"error": "hs는 숫자 코드"}, status_code=400)
+    payload = await generation.responses.get(("map-svg", name, month, metric, hs),
+                                             _svg_payload, render, month, metric, hs)
+    return payload.response(request)
+
+
+@app.get("/api/search")
+async def get_search(request: Request, q: str = "", limit: int = search.DEFAULT_LIMIT,
+                     scope: str = "all"):
+    """HS 코드(prefix)·품목명(부분 일치) 검색 — 점수순 hits + 최신월 수출·YoY.
+    scope=ranking이면 ranking_6d에 있는 코드만 (국가별 탭 HS 한정 검색용)."""
+    if scope not in ("all", "ranking"):
+        return JSONResponse({"error": "scope는 all|ranking"}, status_code=400)
+    index = await generation.ensure("search")
+    hits = index.search(q, max(1, min(limit, search.MAX_LIMIT)), scope == "ranking")
+    return Payload.from_obj({"q": q, "hits": hits}).response(request)
 
 
 @app.get("/api/provisional-data")
-async def get_provisional_data():
+async def get_provisional_data(request: Request):
     """잠정치: provisional.html이 기대하는 {품목:{h,d,u,s}} 구조 반환.
-    정적 /provisional_data.json 과 semantic 동치 (프론트는 이걸 먼저 시도)."""
-    db_mtime = os.path.getmtime(DB_PATH) if os.path.exists(DB_PATH) else 0
-    if _prov_cache["data"] is None or db_mtime > _prov_cache["mtime"]:
-        _prov_cache["data"] = build_provisional_json()
-        _prov_cache["mtime"] = db_mtime
-    return JSONResponse(content=_prov_cache["data"])
+    정적 /provisional_data.json 과 semantic 동치 (프론트는 이걸 먼저 시도).
+    from/to/fields(c,v,w,a)/items(품목키)를 주면 그만큼만 조회."""
+    proj, error = _projection(request, projection.PROV_FIELDS)
+    if error:
+        return error
+    if not proj.is_all:
+        payload = await _cached(("provisional", proj), build_provisional_json, None, proj)
+        return payload.response(request)
+    warmed = generation.get("provisional")
+    if warmed is None:
+        # 기동 직후 워밍 전: 세대 산출물이 있으면 그걸, 없으면 빌드 한 번을 동시 요청이 공유
+        built = artifacts.existing_artifact(generation.state["generation"],
+                                            artifacts.PROVISIONAL)
+        if built:
+            return await precompressed_file(request, built, "application/json")
+        warmed = await generation.ensure("provisional")
+    return warmed["all"].response(request)
+
+
+@app.get("/api/provisional")
+async def get_provisional_index(request: Request):
+    """잠정치 요약: 품목마다 h·d·u + 대표 섹션("전세계", 없으면 첫 섹션)만.
+    provisional.html은 이걸로 탭·KPI·총괄을 그리고 품목 탭은 아래로 따로 받는다."""
+    return (await generation.ensure("provisional"))["index"].response(request)
+
+
+@app.get("/api/provisional/{item_key}")
+async def get_provisional_item(item_key: str, request: Request):
+    """잠정치 품목 1개 {h, d, u, s: 전체 섹션}"""
+    payload = (await generation.ensure("provisional"))["items"].get(item_key)
+    if payload is None:
+        return JSONResponse({"error": f"잠정치 품목 {item_key} 없음"}, status_code=404)
+    return payload.response(request)
 
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok", "db_exists": os.path.exists(DB_PATH)}
+    return {"status": "ok", "db_exists": os.path.exists(DB_PATH),
+            "generation": generation.state["generation"]}
+
+
+@app.get("/api/metrics")
+async def get_metrics(format: str = "prometheus"):
+    """라우트별 지연·바이트, 캐시 hit 비율, DB 시간, RSS, 데이터 세대 (server/metrics.py).
+    format=prometheus(텍스트 노출 형식) | json"""
+    if format == "json":
+        return Response(metrics.render_json(), media_type="application/json",
+                        headers={"Cache-Control": "no-store"})
+    if format != "prometheus":
+        return JSONResponse({"error": "format은 prometheus|json"}, status_code=400)
+    return Response(metrics.render_prometheus(),
+                    media_type="text/plain; version=0.0.4; charset=utf-8",
+                    headers={"Cache-Control": "no-store"})
 
 
 @app.get("/")
-async def index():
-    return FileResponse(os.path.join(BASE_DIR, "trade.html"))
+async def index(request: Request):
+    return await precompressed_file(request, os.path.join(BASE_DIR, "trade.html"))
 
 
 @app.get("/trade.html")
-async def trade_page():
-    return FileResponse(os.path.join(BASE_DIR, "trade.html"))
+async def trade_page(request: Request):
+    return await precompressed_file(request, os.path.join(BASE_DIR, "trade.html"))
 
 
 @app.get("/provisional.html")
-async def provisional_page():
-    return FileResponse(os.path.join(BASE_DIR, "provisional.html"))
+async def provisional_page(request: Request):
+    return await precompressed_file(request, os.path.join(BASE_DIR, "provisional.html"))
 
 
 @app.get("/provisional_data.json")
-async def provisional_data():
-    return FileResponse(os.path.join(BASE_DIR, "provisional_data.json"),
-                        media_type="application/json")
+async def provisional_data(request: Request):
+    return await precompressed_file(
+        request, os.path.join(BASE_DIR, "provisional_data.json"), "application/json")
 
 
 @app.get("/trade_data_v2.json")
-async def trade_data_json():
+async def trade_data_json(request: Request):
     """확정치 전체 JSON 정적 서빙 — trade.html의 폴백 2단.
     /api/trade-data가 메모리 부족(53MB 인메모리 직렬화)으로 502일 때
-    이 라우트가 없으면 DEMO 임베드로 떨어져 최신 total이 틀리게 보임."""
-    return FileResponse(os.path.join(BASE_DIR, "trade_data_v2.json"),
-                        media_type="application/json")
+    이 라우트가 없으면 DEMO 폴백 자산으로 떨어져 최신 total이 틀리게 보임."""
+    return await precompressed_file(
+        request, os.path.join(BASE_DIR, "trade_data_v2.json"), "application/json")
 
 
 @app.get("/business_days.json")
-async def business_days():
-    return FileResponse(os.path.join(BASE_DIR, "business_days.json"),
-                        media_type="application/json")
+async def business_days(request: Request):
+    return await precompressed_file(
+        request, os.path.join(BASE_DIR, "business_days.json"), "application/json")
 
 
 @app.get("/confirmed_companies.json")
-async def confirmed_companies():
-    return FileResponse(os.path.join(BASE_DIR, "confirmed_companies.json"),
-                        media_type="application/json")
+async def confirmed_companies(request: Request):
+    return await precompressed_file(
+        request, os.path.join(BASE_DIR, "confirmed_companies.json"), "application/json")
 
 
 @app.get("/static/{name}")
-async def static_file(name: str):
-    """국가 메타·세계 GeoJSON 등 정적 자산 (지도 시각화용)."""
+async def static_file(name: str, request: Request):
+    """국가 메타·세계 GeoJSON 등 정적 자산 (지도 시각화용), DEMO 폴백 자산."""
     if "/" in name or ".." in name:
         return JSONResponse({"error": "invalid"}, status_code=400)
     path = os.path.join(BASE_DIR, "static", name)
     if not os.path.exists(path):
         return JSONResponse({"error": "not found"}, status_code=404)
-    media = "application/json" if name.endswith(".json") else None
-    return FileResponse(path, media_type=media)
+    # .gz 자산(DEMO 폴백)은 Content-Encoding 없이 그대로 — trade.html이 직접 푼다
+    media = ("application/json" if name.endswith(".json")
+             else "application/gzip" if name.endswith(".gz") else None)
+    return await precompressed_file(request, path, media)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+"""지도 탭 집계 (/api/map/world, /api/map/korea) — GeoJSON 피처 키 기준
+
+collector/map_index.py가 만든 map_features(코드 → 피처)·map_totals(피처별 월 합계)를
+읽어 지도 한 장에 필요한 값만 내려준다. 브라우저는 코드 → 피처 매칭이나 전체
+데이터 합산 없이 피처 키로 바로 색을 칠한다.
+
+    world: {"map", "month", "hs", "features": {alpha-3: {"code", "name", "value"}},
+            "sum", "min", "max", "n"}
+    korea: {"map", "month", "hs", "features": {canon: {"value", "sido",
+                                                      "regions": [{"code", "name", "value"}]}},
+            "sido": {시도 전체명: {"value", "n"}}, "sum", "min", "max", "n"}
+
+month를 안 주면 world는 전 기간 합계(국가별 탭 지도 기존 기준), korea는 최신월.
+hs를 주면 그 품목 한정 — world는 ranking_country(HS6), korea는 region_series
+(상위 코드 중복 제거 후 그 코드가 남은 지역). 값이 0인 피처는 뺀다.
+sum/min/max/n은 features 기준 (trade.html 범례·캡션).
+"""
+from .database import read_connection
+
+
+def _stats(values) -> dict:
+    return {"sum": sum(values), "min": min(values, default=0),
+            "max": max(values, default=0), "n": len(values)}
+
+
+def _by_code(conn, map_name, hs, month):
+    """hs 한정: {데이터 코드: 수출} — month None이면 전 기간 합"""
+    if map_name == "world":
+        sql = ("SELECT entity_code, SUM(exp_usd) FROM trade_data "
+               "WHERE data_type='ranking_country' AND hs_code='' AND sub_code=?")
+    else:
+        sql = "SELECT region, SUM(exp_usd) FROM region_series WHERE hs=?"
+    args = [hs]
+    if month is not None:
+        sql += " AND ym=?"
+        args.append(month)
+    sql += " GROUP BY 1"
+    return {r[0]: r[1] or 0 for r in conn.execute(sql, args)}
+
+
+def latest_month(map_name, pool=None):
+    with read_connection(pool) as conn:
+        return conn.execute(
+            "SELECT MAX(ym) FROM map_totals WHERE map=?", (map_name,)).fetchone()[0]
+
+
+def world(month=None, hs=None, pool=None) -> dict:
+    with read_connection(pool) as conn:
+        feats = {r[0]: r[1] for r in conn.execute(
+            "SELECT code, feature FROM map_features WHERE map='world'")}
+        names = {r[0]: r[1] for r in conn.execute(
+            "SELECT code, name FROM ranking_countries")}
+        if hs:
+            values = {feats[c]: v for c, v in _by_code(conn, "world", hs, month).items()
+                      if c in feats}
+        elif month is None:
+            values = {r[0]: r[1] for r in conn.execute(
+                "SELECT feature, SUM(exp_usd) FROM map_totals WHERE map='world' "
+                "GROUP BY feature")}
+        else:
+            values = {r[0]: r[1] for r in conn.execute(
+                "SELECT feature, exp_usd FROM map_totals WHERE map='world' AND ym=?",
+                (month,))}
+    codes = {f: c for c, f in feats.items()}
+    features = {f: {"code": codes[f], "name": names.get(codes[f]) or codes[f], "value": v}
+                for f, v in sorted(values.items()) if v and v > 0}
+    return {"map": "world", "month": month, "hs": hs or None, "features": features,
+            **_stats([x["value"] for x in features.values()])}
+
+
+def korea(month=None, hs=None, pool=None) -> dict:
+    if month is None:
+        month = latest_month("korea", pool)
+    with read_connection(pool) as conn:
+        rows = conn.execute(
+            "SELECT f.code, f.feature, f.sido, r.name FROM map_features f "
+            "LEFT JOIN regions r ON r.code = f.code WHERE f.map='korea'").fetchall()
+        if hs:
+            by_code = _by_code(conn, "korea", hs, month)
+        else:
+            by_code = {r[0]: r[1] or 0 for r in conn.execute(
+                "SELECT code, exp_usd FROM region_totals WHERE ym=?", (month,))}
+    features, sido = {}, {}
+    for code, feat, sd, name in rows:
+        v = by_code.get(code) or 0
+        if v <= 0:
+            continue
+        f = features.setdefault(feat, {"value": 0, "sido": sd, "regions": []})
+        f["value"] += v
+        f["regions"].append({"code": code, "name": name or code, "value": v})
+    for feat, f in features.items():
+        f["regions"].sort(key=lambda r: -r["value"])
+        s = sido.setdefault(f["sido"], {"value": 0, "n": 0})
+        s["value"] += f["value"]
+        s["n"] += 1
+    features = dict(sorted(features.items()))
+    return {"map": "korea", "month": month, "hs": hs or None, "features": features,
+            "sido": dict(sorted(sido.items(), key=lambda kv: -kv[1]["value"])),
+            **_stats([f["value"] for f in features.values()])}
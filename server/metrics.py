@@ -0,0 +1,259 @@
+"""서버 계측 — /api/metrics (Prometheus 텍스트 · JSON)
+
+무료 티어(512MB)에서 OOM이 난 적이 있는데 보이는 게 없었다. 운영에서 켜 둬도 될 만큼
+가볍게 — 외부 의존성 없이 고정 버킷 히스토그램·카운터를 메모리에만 쌓는다.
+  - 라우트별 지연 히스토그램·응답 바이트·상태 (MetricsMiddleware, 라우트 템플릿 기준
+    — 매칭 안 된 경로는 "other"로 묶어 라벨 수가 늘지 않게)
+  - 서버 캐시별 hit/stale/miss와 크기 (server/cache.py, generation.py, http_cache.py)
+  - DB: 읽기 커넥션 대기·점유 시간, 캐시 빌드(= 조회+직렬화) 시간 종류별
+  - 프로세스 RSS·최대 RSS, 현재 데이터 세대
+관측은 스레드풀 워커에서도 오므로 지표마다 락 하나.
+"""
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:     # Windows 로컬 개발 — 최대 RSS 없음
+    resource = None
+
+# 초 단위 — 캐시 히트(~1ms)부터 스트리밍 전체 응답(수 초)까지
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []      # 등록 순서대로 출력
+_started = time.time()
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values = {}
+
+    def inc(self, *labels, value=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + value
+
+    def samples(self):
+        with self._lock:
+            return [(dict(zip(self.labels, k)), v) for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._values = {}   # labels → [버킷별 개수 …, +Inf 개수, 합]
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def samples(self):
+        """[(라벨, {"buckets": {le: 누적 개수}, "count", "sum"})]"""
+        with self._lock:
+            rows = [(k, list(v)) for k, v in self._values.items()]
+        out = []
+        for k, row in rows:
+            cum, buckets = 0, {}
+            for le, n in zip(self.buckets + (float("inf"),), row[:-1]):
+                cum += n
+                buckets[_le(le)] = cum
+            out.append((dict(zip(self.labels, k)),
+                        {"buckets": buckets, "count": cum, "sum": round(row[-1], 6)}))
+        return out
+
+
+class Gauge(_Metric):
+    """읽을 때 fn()으로 값을 구한다 — fn은 숫자 또는 {라벨 튜플: 숫자}"""
+    type = "gauge"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        if not isinstance(value, dict):
+            return [] if value is None else [({}, value)]
+        return [(dict(zip(self.labels, k)), v) for k, v in value.items() if v is not None]
+
+
+class _Timer:
+    def __init__(self, hist, labels):
+        self.hist, self.labels = hist, labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0, *self.labels)
+
+
+def _le(v):
+    return "+Inf" if v == float("inf") else repr(v)
+
+
+# ── 지표 ───────────────────────────────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "trade_http_request_duration_seconds",
+    "요청 처리 시간 (마지막 본문 바이트까지)", ("route",))
+REQUESTS = Counter("trade_http_requests_total", "요청 수", ("route", "status"))
+RESPONSE_BYTES = Counter(
+    "trade_http_response_bytes_total", "응답 본문 바이트 (압축 후, 실제 전송분)", ("route",))
+CACHE_REQUESTS = Counter(
+    "trade_cache_requests_total", "서버 캐시 조회 결과 (hit|stale|miss)", ("cache", "result"))
+CACHE_BUILD_SECONDS = Histogram(
+    "trade_cache_build_seconds", "캐시 빌드 시간 — DB 조회 + 조립·직렬화", ("cache", "kind"))
+DB_CONNECTION_SECONDS = Histogram(
+    "trade_db_connection_seconds", "읽기 커넥션 대기(wait)·점유(hold) 시간", ("phase",))
+
+_cache_sizes = {}   # 캐시 이름 → fn() → (항목 수, 바이트 또는 None)
+
+
+def register_cache(name, size_fn):
+    """캐시 크기 게이지에 포함 — size_fn() → (항목 수, 바이트 | None)"""
+    _cache_sizes[name] = size_fn
+
+
+def _cache_entries():
+    return {(n,): fn()[0] for n, fn in _cache_sizes.items()}
+
+
+def _cache_bytes():
+    return {(n,): fn()[1] for n, fn in _cache_sizes.items()}
+
+
+def _cache_hit_ratio():
+    """hit / 전체 (stale도 캐시가 응답한 것이므로 hit 쪽)"""
+    totals = {}
+    for labels, v in CACHE_REQUESTS.samples():
+        t = totals.setdefault(labels["cache"], [0, 0])
+        t[1] += v
+        if labels["result"] != "miss":
+            t[0] += v
+    return {(n,): round(h / t, 4) for n, (h, t) in totals.items() if t}
+
+
+def rss_bytes():
+    """현재 RSS (/proc — 리눅스 외에는 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024     # 리눅스는 KB
+
+
+Gauge("trade_cache_hit_ratio", "캐시별 (hit+stale) / 전체", ("cache",), _cache_hit_ratio)
+Gauge("trade_cache_entries", "캐시 항목 수", ("cache",), _cache_entries)
+Gauge("trade_cache_bytes", "캐시 본문 바이트 (원문+압축본)", ("cache",), _cache_bytes)
+Gauge("trade_process_resident_memory_bytes", "현재 RSS", fn=rss_bytes)
+Gauge("trade_process_peak_resident_memory_bytes", "최대 RSS", fn=peak_rss_bytes)
+Gauge("trade_process_uptime_seconds", "기동 후 경과 시간",
+      fn=lambda: round(time.time() - _started, 1))
+
+
+# ── 미들웨어 ───────────────────────────────────────────────────────────
+class MetricsMiddleware:
+    """순수 ASGI 미들웨어 — 본문을 버퍼링하지 않고 send 메시지만 센다
+    (StreamingResponse·FileResponse도 실제 전송 바이트·마지막 바이트까지의 시간)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        t0 = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            # 라우터가 매칭한 라우트를 scope에 남긴다 (경로 파라미터 전 템플릿)
+            route = scope.get("route")
+            name = getattr(route, "path", None) or "other"
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, name)
+            REQUESTS.inc(name, f"{state['status'] // 100}xx")
+            RESPONSE_BYTES.inc(name, value=state["bytes"])
+
+
+# ── 출력 ───────────────────────────────────────────────────────────────
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=None):
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render_prometheus() -> str:
+    lines = []
+    for m in _registry:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.type}")
+        for labels, value in m.samples():
+            if m.type == "histogram":
+                for le, n in value["buckets"].items():
+                    lines.append(f"{m.name}_bucket{_fmt_labels(labels, ('le', le))} {n}")
+                lines.append(f"{m.name}_sum{_fmt_labels(labels)} {value['sum']}")
+                lines.append(f"{m.name}_count{_fmt_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{m.name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def snapshot() -> dict:
+    """{지표 이름: {"type", "help", "samples": [{"labels", "value"}]}} — format=json"""
+    return {m.name: {"type": m.type, "help": m.help,
+                     "samples": [{"labels": labels, "value": value}
+                                 for labels, value in m.samples()]}
+            for m in _registry}
+
+
+def render_json() -> str:
+    return json.dumps(snapshot(), ensure_ascii=False, separators=(",", ":"))
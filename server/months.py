@@ -0,0 +1,25 @@
+"""YYYYMM 월 연산·증감률 — 서버 응답과 collector 파생 테이블이 함께 쓰는 규칙
+
+trade.html의 pm()/y12()/mom()/yoy()와 같다. 증감률은 반올림하지 않는다
+(표시는 trade.html ch()/chB()가 소수 1자리로) — /api/summary, /api/locations,
+/api/ranking, SVG data-*, 브라우저 계산이 모두 같은 값을 낸다.
+"""
+
+
+def prev_month(ym):
+    y, m = int(ym[:4]), int(ym[4:])
+    return f"{y - 1}12" if m == 1 else f"{y}{m - 1:02d}"
+
+
+def year_ago(ym):
+    return f"{int(ym[:4]) - 1}{ym[4:]}"
+
+
+def pct(cur, base):
+    """증감률(%) — 두 값이 모두 0·없음이 아니어야 산출, 아니면 None"""
+    return (cur - base) / base * 100 if cur and base else None
+
+
+def change(series, ym, prev):
+    """{ym: 값}에서 ym의 prev 대비 증감률"""
+    return pct(series.get(ym), series.get(prev))
@@ -0,0 +1,54 @@
+"""사전 압축 사이드카(.br / .gz) 선택 — 요청마다 압축 CPU를 쓰지 않는다
+
+collector/precompress.py(정적 파일)와 collector/refresh.py(DB 세대별 산출물)가
+원본 옆에 `<파일>.br`, `<파일>.gz`를 만들어 둔다. 여기서는 Accept-Encoding을 보고
+그중 하나를 FileResponse로 그대로 스트리밍하고 Content-Encoding·Vary를 붙인다.
+원본보다 오래된 사이드카는 쓰지 않는다 (원본만 갱신된 경우 identity로).
+ETag·304 처리는 http_cache.py.
+"""
+import mimetypes
+import os
+from fastapi.responses import FileResponse, JSONResponse
+
+from .http_cache import (accepted_encodings, file_hash, is_not_modified,
+                         not_modified_response, validator_headers)
+
+# 선호 순서: brotli가 gzip보다 10~20% 작다
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def pick_variant(path: str, accept_encoding: str, src_mtime_ns: int):
+    """(실제 파일 경로, Content-Encoding 또는 None)"""
+    acc = accepted_encodings(accept_encoding)
+    for coding, suffix in _ENCODINGS:
+        if acc.get(coding, acc.get("*", 0.0)) <= 0:
+            continue
+        try:
+            st = os.stat(path + suffix)
+        except FileNotFoundError:
+            continue
+        if st.st_mtime_ns >= src_mtime_ns:
+            return path + suffix, coding
+    return path, None
+
+
+async def precompressed_file(request, path, media_type=None):
+    """Accept-Encoding에 맞는 사이드카를 스트리밍하는 FileResponse (조건부 요청 지원).
+
+    ETag는 원본 내용 해시 + 인코딩 — 표현(br/gzip/identity)마다 다른 강한 ETag."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return JSONResponse({"error": "not found"}, status_code=404)
+    real, coding = pick_variant(path, request.headers.get("accept-encoding", ""),
+                                st.st_mtime_ns)
+    digest = await file_hash(path, st)
+    etag = f'"{digest}-{coding}"' if coding else f'"{digest}"'
+    headers = {"Vary": "Accept-Encoding", **validator_headers(etag, st.st_mtime)}
+    if is_not_modified(request, etag, st.st_mtime):
+        return not_modified_response(headers)
+    if coding:
+        headers["Content-Encoding"] = coding
+    # 사이드카 확장자(.gz)가 아닌 원본 이름 기준 Content-Type
+    media_type = media_type or mimetypes.guess_type(path)[0]
+    return FileResponse(real, media_type=media_type, headers=headers)
@@ -0,0 +1,81 @@
+"""응답 창·필드 제한 — /api/trade-data(·core·shard)와 /api/provisional-data의
+from= / to= / fields= / items= 쿼리 파라미터
+
+화면 대부분은 최근 12~14개월 exp만 쓰는데 응답은 쌓인 전 기간·전 필드를 싣는다.
+Projection을 builder에 넘기면:
+  - from/to(YYYYMM, 양끝 포함)와 items는 SQL 조건(ym 범위, hs_code/item_key)으로
+  - fields에 없는 시계열 키(exp/imp/wgt, 잠정치 c/v/w/a)는 응답에서 생략
+기본값(ALL)이면 지금과 똑같은 응답 — 세대 산출물을 그대로 서빙할 수 있다.
+"""
+import hashlib
+from typing import NamedTuple
+
+# 확정치 필드 → 응답 구조에서 그 필드를 담는 키
+TRADE_FIELDS = {"exp": ("exp", "total_exp"),
+                "imp": ("imp", "total_imp"),
+                "wgt": ("wgt", "total_wgt")}
+PROV_FIELDS = ("c", "v", "w", "a")
+
+
+class Projection(NamedTuple):
+    start: str = "000000"       # ym 하한 (포함)
+    end: str = "999999"         # ym 상한 (포함)
+    fields: tuple = ()          # 빈 값 = 전체
+    items: tuple = ()           # HS 코드 / 잠정치 품목키, 빈 값 = 전체
+
+    @property
+    def is_all(self) -> bool:
+        return self == ALL
+
+    @property
+    def tag(self) -> str:
+        """약한 ETag용 파라미터 요약"""
+        return hashlib.sha256(repr(tuple(self)).encode()).hexdigest()[:12]
+
+    def wants(self, field) -> bool:
+        return not self.fields or field in self.fields
+
+    def has_item(self, key) -> bool:
+        return not self.items or key in self.items
+
+
+ALL = Projection()
+
+
+def _ym(value, name):
+    if value is None or value == "":
+        return None
+    if len(value) != 6 or not value.isdigit():
+        raise ValueError(f"{name} 값은 YYYYMM")
+    return value
+
+
+def parse(start=None, end=None, fields=None, items=None, allowed=TRADE_FIELDS):
+    """쿼리 문자열 → Projection. 잘못된 값이면 ValueError (메시지는 응답용)"""
+    start, end = _ym(start, "from"), _ym(end, "to")
+    if start and end and start > end:
+        raise ValueError("from이 to보다 늦음")
+    fs = tuple(sorted({f.strip() for f in (fields or "").split(",") if f.strip()}))
+    bad = [f for f in fs if f not in allowed]
+    if bad:
+        raise ValueError(f"fields는 {','.join(allowed)} 중에서 (모름: {','.join(bad)})")
+    its = tuple(sorted({i.strip() for i in (items or "").split(",") if i.strip()}))
+    return Projection(start or ALL.start, end or ALL.end,
+                      () if set(fs) == set(allowed) else fs, its)
+
+
+def drop_fields(obj, proj, keys=TRADE_FIELDS):
+    """proj.fields에 없는 시계열 키를 중첩 dict에서 제거 (시계열 안으로는 내려가지 않음)"""
+    if not proj.fields:
+        return obj
+    drop = {k for f, ks in keys.items() if f not in proj.fields for k in ks}
+    keep = {k for f, ks in keys.items() if f in proj.fields for k in ks}
+    stack = [obj]
+    while stack:
+        d = stack.pop()
+        for k in list(d):
+            if k in drop:
+                del d[k]
+            elif k not in keep and isinstance(d[k], dict):
+                stack.append(d[k])
+    return obj
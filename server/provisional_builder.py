@@ -8,13 +8,27 @@
   - 품목 순서는 prov_items.sort_order, 국가 순서는 prov_countries.sort_order로 보존
     (프론트가 Object.keys 삽입순서에 의존 → 탭/섹션 버튼 순서)
   - leaf는 값이 NULL이 아닌 키만 emit (부재 v/w를 0으로 되살리지 않음)
+  - proj(server/projection.py): 품목키·월 범위는 SQL 조건, fields는 leaf 키(c/v/w/a) 제한
+  - provisional_index(): 탭 목록·KPI·총괄·일일수출용 요약 — 품목마다 대표 섹션 하나만
 """
 from collections import defaultdict
-from .database import get_connection
+from .database import read_connection
+from .projection import ALL, PROV_FIELDS
 
 
-def build_provisional_json() -> dict:
-    conn = get_connection()
+def build_provisional_json(pool=None, proj=ALL) -> dict:
+    """동기 함수 — 서버에서는 스레드풀에서 호출한다 (이벤트 루프 블로킹 방지)."""
+    with read_connection(pool) as conn:
+        return _build(conn, proj)
+
+
+def _build(conn, proj=ALL) -> dict:
+    leaf_fields = [f for f in PROV_FIELDS if proj.wants(f)]
+    # 품목 제한은 IN (?, …) 조건으로 (prov_data PK 선두 = item_key)
+    item_cond, item_args = "", ()
+    if proj.items:
+        item_cond = f" AND item_key IN ({','.join('?' * len(proj.items))})"
+        item_args = proj.items
 
     # 국가 순서: (item_key, country) → sort_order
     country_order = {}
@@ -26,22 +40,21 @@ def build_provisional_json() -> dict:
     #   grouped[item_key][country][ym][cut] = {비-NULL leaf만}
     grouped = defaultdict(lambda: defaultdict(lambda: defaultdict(dict)))
     for r in conn.execute(
-            "SELECT item_key, country, ym, cut, c, v, w, a FROM prov_data"):
+            "SELECT item_key, country, ym, cut, c, v, w, a FROM prov_data "
+            "WHERE ym BETWEEN ? AND ?" + item_cond,
+            (proj.start, proj.end) + item_args):
         leaf = {}
-        if r["c"] is not None:
-            leaf["c"] = r["c"]
-        if r["v"] is not None:
-            leaf["v"] = r["v"]
-        if r["w"] is not None:
-            leaf["w"] = r["w"]
-        if r["a"] is not None:
-            leaf["a"] = r["a"]
+        for f in leaf_fields:
+            if r[f] is not None:
+                leaf[f] = r[f]
         grouped[r["item_key"]][r["country"]][r["ym"]][r["cut"]] = leaf
 
     result = {}
     for item in conn.execute(
             "SELECT item_key, h, d, u FROM prov_items ORDER BY sort_order"):
         ikey = item["item_key"]
+        if not proj.has_item(ikey):
+            continue
         # 국가를 sort_order 순으로 정렬해 삽입 (섹션 버튼 순서 보존)
         countries = grouped.get(ikey, {})
         ordered_countries = sorted(
@@ -55,5 +68,20 @@ def build_provisional_json() -> dict:
             "s": s,
         }
 
-    conn.close()
     return result
+
+
+# provisional.html의 대표 섹션 규칙: "전세계", 없으면 첫 섹션
+WORLD = "전세계"
+
+
+def provisional_index(data) -> dict:
+    """{품목키: {h, d, u, s: {대표 섹션: 시계열}}} — 같은 모양이라 프론트 코드 그대로,
+    품목 탭을 열 때만 /api/provisional/{품목키}로 전체 섹션을 받는다."""
+    index = {}
+    for key, item in data.items():
+        sections = item["s"]
+        world = WORLD if WORLD in sections else next(iter(sections), None)
+        index[key] = {"h": item["h"], "d": item["d"], "u": item["u"],
+                      "s": {world: sections[world]} if world is not None else {}}
+    return index
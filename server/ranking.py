@@ -0,0 +1,82 @@
+"""HS6 급등/급락 랭킹 — ranking_metrics(collector/ranking_metrics.py 사전 계산) 조회
+
+trade.html rRanking의 표·차트와 같은 결과:
+  - rows: 해당 월 수출 min_exp 이상 HS6를 sort 기준 내림차순
+    (yoy·mom은 NULL을 0으로 취급, pyoy·pmom은 단가 산출 가능 품목만)
+  - top15: 차트용 TOP 15 두 개 (단가 정렬이면 단가 YoY/MoM, 아니면 수출 YoY/MoM)
+    — 0·NULL 제외, 해당 월까지 최근 12개월 시계열 포함
+"""
+from .database import read_connection
+
+SORTS = {
+    "yoy": "COALESCE(m.yoy, 0) DESC",
+    "mom": "COALESCE(m.mom, 0) DESC",
+    "val": "m.exp_usd DESC",
+    "pyoy": "m.pyoy DESC",
+    "pmom": "m.pmom DESC",
+}
+_PRICE_SORTS = ("pyoy", "pmom")
+MIN_EXP = 1_000_000
+TOP_N = 15
+CHART_MONTHS = 12
+
+
+def query_ranking(month=None, sort="yoy", min_exp=MIN_EXP, limit=0, pool=None) -> dict:
+    with read_connection(pool) as conn:
+        return _query(conn, month, sort, min_exp, limit)
+
+
+def _query(conn, month, sort, min_exp, limit) -> dict:
+    if month is None:
+        month = conn.execute("SELECT MAX(ym) FROM ranking_metrics").fetchone()[0]
+    result = {"month": month, "sort": sort, "min_exp": min_exp,
+              "count": 0, "rows": [], "months": [], "top15": {"yoy": [], "mom": []}}
+    if month is None:
+        return result
+
+    where = "m.ym = ? AND m.exp_usd >= ?"
+    if sort in _PRICE_SORTS:
+        where += f" AND m.{sort} IS NOT NULL"
+    params = (month, min_exp)
+    result["count"] = conn.execute(
+        f"SELECT COUNT(*) FROM ranking_metrics m WHERE {where}", params).fetchone()[0]
+    result["rows"] = [dict(r) for r in conn.execute(
+        "SELECT m.hs6 AS hs, COALESCE(NULLIF(n.name, ''), m.hs6) AS name, "
+        "m.exp_usd AS val, m.mom, m.yoy, m.price, m.pmom, m.pyoy "
+        "FROM ranking_metrics m "
+        "LEFT JOIN hs_names n ON n.hs_code = m.hs6 AND n.digits = 6 "
+        f"WHERE {where} ORDER BY {SORTS[sort]}, m.hs6 LIMIT ?",
+        params + (limit if limit > 0 else -1,))]
+
+    months = [r[0] for r in conn.execute(
+        "SELECT DISTINCT ym FROM ranking_metrics WHERE ym <= ? "
+        "ORDER BY ym DESC LIMIT ?", (month, CHART_MONTHS))][::-1]
+    result["months"] = months
+    price = sort in _PRICE_SORTS
+    for key in ("yoy", "mom"):
+        col = ("p" + key) if price else key
+        result["top15"][key] = _top(conn, month, min_exp, col, months, price)
+    return result
+
+
+def _top(conn, month, min_exp, col, months, price) -> list:
+    """col 기준 TOP 15 + months 축 시계열 (단가면 price·결측 NULL, 수출이면 exp·결측 0)"""
+    top = conn.execute(
+        "SELECT m.hs6, COALESCE(NULLIF(n.name, ''), m.hs6) AS name "
+        "FROM ranking_metrics m "
+        "LEFT JOIN hs_names n ON n.hs_code = m.hs6 AND n.digits = 6 "
+        f"WHERE m.ym = ? AND m.exp_usd >= ? AND m.{col} IS NOT NULL AND m.{col} != 0 "
+        f"ORDER BY m.{col} DESC, m.hs6 LIMIT ?", (month, min_exp, TOP_N)).fetchall()
+    if not top or not months:
+        return []
+    codes = [r["hs6"] for r in top]
+    series = {hs6: {} for hs6 in codes}
+    for r in conn.execute(
+            f"SELECT hs6, ym, exp_usd, price FROM ranking_metrics "
+            f"WHERE hs6 IN ({','.join('?' * len(codes))}) AND ym >= ? AND ym <= ?",
+            codes + [months[0], months[-1]]):
+        series[r["hs6"]][r["ym"]] = r["price"] if price else (r["exp_usd"] or 0)
+    miss = None if price else 0
+    return [{"hs": r["hs6"], "name": r["name"],
+             "series": [series[r["hs6"]].get(m, miss) for m in months]}
+            for r in top]
@@ -0,0 +1,160 @@
+"""HS 코드·품목명 검색 색인 (/api/search)
+
+trade.html의 searchHS는 hs2/hs4_names·ranking_6d 이름을 모두 내려받은 뒤 브라우저에서
+항목 전부를 훑었다. 여기서는 세대마다 한 번(generation.register) 색인을 만들어 둔다:
+  - HS 코드: 자리(숫자)별 트라이. 노드를 너비 우선·자식 오름차순으로 훑으면
+    (코드 길이, 코드) 순서 = 점수 순서라 limit개 채우면 바로 멈춘다.
+  - 이름: 한 글자·두 글자(n-gram) 역색인. 질의의 바이그램 목록을 교집합한 후보만
+    부분 문자열로 확인 — 한국어 품목명은 띄어쓰기가 제각각이라 형태소 대신 n-gram.
+
+색인 대상: 메인 품목, HS6(ranking_6d), 그 상위 HS4·HS2, 세부항목, 기업.
+점수는 searchHS와 같다: 코드 prefix 100-(길이 차), 이름 시작 90, 이름 포함 50.
+"""
+import re
+from collections import deque
+
+from .database import read_connection
+from .months import pct, year_ago
+
+DEFAULT_LIMIT = 12
+MAX_LIMIT = 50
+_NUMERIC = re.compile(r"^\d+$")
+
+
+def _latest(series):
+    """{ym: v} → (최신월, 값, YoY%) — YoY는 trade.html yoy()와 같은 규칙"""
+    if not series:
+        return None, None, None
+    ym = max(series)
+    cur = series[ym]
+    return ym, cur, pct(cur, series.get(year_ago(ym)))
+
+
+class SearchIndex:
+    def __init__(self, entries):
+        # entry: {hs, name, type, go, ranked, exp, ym, yoy[, n][, parent]}
+        self.entries = entries
+        self._trie = {}
+        self._grams = {}
+        for i, e in enumerate(entries):
+            if e["hs"] and e["type"] != "company":
+                node = self._trie
+                for ch in e["hs"]:
+                    node = node.setdefault(ch, {})
+                node.setdefault("", []).append(i)
+            name = e["name"].lower()
+            for n in (1, 2):
+                for k in range(len(name) - n + 1):
+                    self._grams.setdefault(name[k:k + n], set()).add(i)
+
+    def search(self, q, limit=DEFAULT_LIMIT, ranked_only=False):
+        q = (q or "").strip()
+        if not q:
+            return []
+        ok = (lambda e: e["ranked"]) if ranked_only else (lambda e: True)
+        if _NUMERIC.match(q):
+            hits = self._by_code(q, limit, ok)
+        else:
+            hits = self._by_name(q.lower(), limit, ok)
+        return [dict(e, score=s) for s, e in hits]
+
+    def _by_code(self, q, limit, ok):
+        node = self._trie
+        for ch in q:
+            node = node.get(ch)
+            if node is None:
+                return []
+        out, level = [], deque([node])
+        while level and len(out) < limit:
+            for _ in range(len(level)):
+                n = level.popleft()
+                for i in n.get("", ()):
+                    e = self.entries[i]
+                    if ok(e):
+                        out.append((100 - (len(e["hs"]) - len(q)), e))
+                level.extend(n[k] for k in sorted(n) if k)
+        return out[:limit]
+
+    def _by_name(self, lq, limit, ok):
+        grams = [lq] if len(lq) == 1 else [lq[k:k + 2] for k in range(len(lq) - 1)]
+        postings = sorted((self._grams.get(g, set()) for g in set(grams)), key=len)
+        cand = set(postings[0]).intersection(*postings[1:]) if postings else set()
+        out = []
+        for i in cand:
+            e = self.entries[i]
+            name = e["name"].lower()
+            if lq in name and ok(e):
+                out.append((90 if name.startswith(lq) else 50, e))
+        out.sort(key=lambda x: (-x[0], len(x[1]["hs"]), x[1]["hs"]))
+        return out[:limit]
+
+
+def build_index(pool=None) -> SearchIndex:
+    with read_connection(pool) as conn:
+        return SearchIndex(_entries(conn))
+
+
+def _entries(conn):
+    entries, seen = [], set()
+
+    def add(hs, name, typ, go=None, ranked=False, series=None, **extra):
+        ym, exp, yoy = _latest(series)
+        entries.append(dict(hs=hs, name=name or "", type=typ, go=go or hs,
+                            ranked=ranked, ym=ym, exp=exp, yoy=yoy, **extra))
+
+    item_series = {}
+    for r in conn.execute(
+            "SELECT hs_code, ym, exp_usd FROM trade_data WHERE data_type='item'"):
+        item_series.setdefault(r[0], {})[r[1]] = r[2]
+    rank_series = {}
+    for r in conn.execute("SELECT hs6, ym, exp_usd FROM ranking_metrics"):
+        rank_series.setdefault(r[0], {})[r[1]] = r[2]
+    ranked = {r[0] for r in conn.execute(
+        "SELECT DISTINCT sub_code FROM trade_data "
+        "WHERE data_type IN ('ranking', 'ranking_country') AND hs_code=''")}
+    names = {r[0]: r[1] for r in conn.execute("SELECT hs_code, name FROM hs_names")}
+
+    # 메인 품목
+    items = conn.execute("SELECT hs_code, name FROM items ORDER BY sort_order").fetchall()
+    for hs, name in items:
+        add(hs, name, "item", ranked=hs in ranked, series=item_series.get(hs))
+        seen.add(hs)
+
+    # HS6 + 상위 HS4·HS2 (최신월 합계·하위 HS6 수)
+    parents = {}
+    for hs6 in sorted(ranked):
+        if hs6 not in seen:
+            add(hs6, names.get(hs6, ""), "hs6", ranked=True, series=rank_series.get(hs6))
+            seen.add(hs6)
+        if len(hs6) == 6 and hs6.isdigit():
+            for p in (hs6[:4], hs6[:2]):
+                parents.setdefault(p, []).append(hs6)
+    for p in sorted(parents, key=lambda c: (-len(c), c)):
+        if p in seen:
+            continue
+        agg = {}
+        for hs6 in parents[p]:
+            for ym, v in rank_series.get(hs6, {}).items():
+                agg[ym] = agg.get(ym, 0) + (v or 0)
+        add(p, names.get(p, ""), f"hs{len(p)}", series=agg, n=len(parents[p]))
+        seen.add(p)
+
+    # 세부항목 → 클릭 시 부모 품목 탭
+    item_names = dict(items)
+    sub_series = {}
+    for r in conn.execute(
+            "SELECT hs_code, sub_code, ym, exp_usd FROM trade_data WHERE data_type='sub_item'"):
+        sub_series.setdefault((r[0], r[1]), {})[r[2]] = r[3]
+    for hs, sub, name in conn.execute(
+            "SELECT hs_code, sub_code, name FROM sub_items ORDER BY hs_code, sub_code"):
+        if sub in seen:
+            continue
+        add(sub, name, "sub", go=hs, series=sub_series.get((hs, sub)),
+            parent=item_names.get(hs, hs))
+        seen.add(sub)
+
+    # 기업 (코드 없음 — 이름으로만) → 부모 품목 탭
+    for hs, name in conn.execute(
+            "SELECT hs_code, name FROM companies ORDER BY hs_code, company_key"):
+        add(hs, name, "company", parent=item_names.get(hs, hs))
+    return entries
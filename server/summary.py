@@ -0,0 +1,76 @@
+"""첫 화면 요약 (/api/summary) — 주요 품목 KPI·총괄 탭 수치를 미리 계산
+
+trade.html의 rKPI·rOverview는 새로고침마다 전체 데이터에서 최신월, MoM/YoY,
+무역수지, 품목별 차트 시계열을 다시 뽑는다. 여기서 같은 값을 세대당 한 번 계산해
+수 KB짜리 문서로 내려주면 본체(core)가 오기 전에 첫 탭을 그릴 수 있다.
+
+    {"generated_at", "generation", "period",
+     "months": [총계 월 …],                      # 차트 X축 (오름차순)
+     "total": {"exp": [...], "imp": [...], "balance": [...],   # months에 맞춘 배열
+               "latest", "latest_exp", "latest_imp", "latest_balance",
+               "exp_mom", "exp_yoy", "imp_mom", "imp_yoy"},
+     "items": [{"hs", "name", "exp": [...],       # months에 맞춘 수출 (없으면 0)
+                "latest", "latest_exp", "latest_imp", "balance", "mom", "yoy"}, …]}
+
+items는 main_items 순서. latest는 각자의 마지막 월 (품목마다 총계와 다를 수 있다).
+MoM/YoY는 trade.html의 mom()/yoy()와 같은 규칙 — 두 달 중 하나라도 0·없음이면 null.
+"""
+import json
+
+from .database import read_connection
+from .months import prev_month, year_ago, change
+
+
+def _series(conn, data_type, hs_code=""):
+    exp, imp = {}, {}
+    for r in conn.execute(
+            "SELECT ym, exp_usd, imp_usd FROM trade_data WHERE data_type=? "
+            "AND hs_code=? AND sub_code='' AND entity_code='' ORDER BY ym",
+            (data_type, hs_code)):
+        exp[r["ym"]] = r["exp_usd"]
+        imp[r["ym"]] = r["imp_usd"]
+    return exp, imp
+
+
+def _latest(exp, imp):
+    lm = max(exp) if exp else None
+    if lm is None:
+        return {"latest": None}
+    e, i = exp.get(lm) or 0, imp.get(lm) or 0
+    return {"latest": lm, "latest_exp": e, "latest_imp": i, "balance": e - i,
+            "mom": change(exp, lm, prev_month(lm)),
+            "yoy": change(exp, lm, year_ago(lm))}
+
+
+def build_summary(pool=None) -> dict:
+    with read_connection(pool) as conn:
+        meta = {r["key"]: r["value"] for r in conn.execute("SELECT key, value FROM meta")}
+        names = {r["hs_code"]: r["name"] for r in conn.execute("SELECT hs_code, name FROM items")}
+        t_exp, t_imp = _series(conn, "total")
+        months = sorted(t_exp)
+        total = {"exp": [t_exp.get(m) or 0 for m in months],
+                 "imp": [t_imp.get(m) or 0 for m in months]}
+        total["balance"] = [e - i for e, i in zip(total["exp"], total["imp"])]
+        lt = _latest(t_exp, t_imp)
+        if lt["latest"]:
+            lm = lt["latest"]
+            total.update(latest=lm, latest_exp=lt["latest_exp"], latest_imp=lt["latest_imp"],
+                         latest_balance=lt["balance"],
+                         exp_mom=lt["mom"], exp_yoy=lt["yoy"],
+                         imp_mom=change(t_imp, lm, prev_month(lm)),
+                         imp_yoy=change(t_imp, lm, year_ago(lm)))
+        else:
+            total["latest"] = None
+
+        items = []
+        for hs in json.loads(meta.get("main_items", "[]")):
+            if hs not in names:
+                continue
+            exp, imp = _series(conn, "item", hs)
+            items.append({"hs": hs, "name": names[hs],
+                          "exp": [exp.get(m) or 0 for m in months], **_latest(exp, imp)})
+        gen = meta.get("generation")
+    return {"generated_at": meta.get("generated_at", ""),
+            "generation": int(gen) if gen else 0,
+            "period": {"start": meta.get("period_start", ""), "end": meta.get("period_end", "")},
+            "months": months, "total": total, "items": items}
@@ -0,0 +1,50 @@
+"""TopoJSON 디코드 — static/build_country_meta.py가 만든 <map>.<폭>.topo.json용
+
+trade.html topoToGeo와 같은 규칙 (arc 델타 누적 → transform 적용, 음수 인덱스 ~i는
+그 arc를 뒤집어 쓰고, 링 안에서 이어지는 arc는 첫 점을 빼고 붙인다).
+빌더(리포트의 디코드 시간)와 서버 SVG 렌더러(server/choropleth.py)가 함께 쓴다.
+"""
+
+
+def decode(topo) -> dict:
+    """TopoJSON → GeoJSON FeatureCollection (objects.features만)"""
+    (sx, sy), (tx, ty) = topo["transform"]["scale"], topo["transform"]["translate"]
+    arcs = []
+    for a in topo["arcs"]:
+        x = y = 0
+        pts = []
+        for dx, dy in a:
+            x += dx
+            y += dy
+            pts.append([x * sx + tx, y * sy + ty])
+        arcs.append(pts)
+
+    def ring(refs):
+        out = []
+        for i in refs:
+            a = arcs[i] if i >= 0 else arcs[~i][::-1]
+            out.extend(a if not out else a[1:])
+        return out
+
+    feats = []
+    for g in topo["objects"]["features"]["geometries"]:
+        geom = None
+        if g["type"] == "Polygon":
+            geom = {"type": "Polygon", "coordinates": [ring(r) for r in g["arcs"]]}
+        elif g["type"] == "MultiPolygon":
+            geom = {"type": "MultiPolygon",
+                    "coordinates": [[ring(r) for r in p] for p in g["arcs"]]}
+        feats.append({"type": "Feature", "id": g.get("id"),
+                      "properties": g.get("properties", {}), "geometry": geom})
+    return {"type": "FeatureCollection", "features": feats}
+
+
+def outer_rings(geometry) -> list:
+    """Polygon/MultiPolygon의 외곽 링 목록 (구멍 제외, 그 외 타입은 빈 목록)"""
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        return geometry["coordinates"][:1]
+    if geometry["type"] == "MultiPolygon":
+        return [p[0] for p in geometry["coordinates"] if p]
+    return []
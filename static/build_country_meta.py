@@ -8,11 +8,27 @@ GeoJSON과 ISO 3166 데이터를 합쳐서 trade.html이 사용할 country_meta.
 }
 
 centroid는 polygon 좌표의 단순 산술평균(가중치 없음). 시각화 위치 표시용으로 충분.
+
+지도 탭용 다중 해상도 지오메트리도 같이 만든다 (world.geo.json, korea_sgg.geo.json →
+<map>.<폭>.topo.json). 폭은 지도를 그릴 화면 픽셀 폭 — trade.html은 지도 영역 폭
+× devicePixelRatio를 덮는 가장 작은 레벨을 받는다. 레벨마다:
+  1) 좌표를 1/4픽셀 격자로 양자화 (정수)
+  2) 링이 갈라지는 점(junction)에서 잘라 arc로 만들고 같은 경계는 arc 하나를 공유
+     (이웃 시군구·국가 경계를 한 번만 저장, 역방향은 ~index — TopoJSON 규약)
+  3) arc마다 Douglas-Peucker(허용 오차 0.5픽셀) — 공유 arc를 한 번만 단순화하므로
+     이웃 경계 사이에 틈이 생기지 않는다
+  4) 1픽셀²보다 작아진 섬은 버림 (피처마다 가장 큰 폴리곤은 유지)
+trade.html은 외곽 링만 그리므로 구멍(hole) 링은 처음부터 뺀다.
+실행하면 레벨별 크기(원본·gzip)와 파싱+디코드 시간 리포트를 출력한다.
 """
-import json, os, statistics
+import json, os, sys, gzip, time, statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server.topojson import decode as decode_topology, outer_rings  # trade.html topoToGeo와 같은 규칙
 
 HERE = os.path.dirname(os.path.abspath(__file__))
 GEO = os.path.join(HERE, "world.geo.json")
+KOREA_GEO = os.path.join(HERE, "korea_sgg.geo.json")
 ISO = os.path.join(HERE, "iso_codes.json")
 OUT = os.path.join(HERE, "country_meta.json")
 
@@ -209,3 +225,216 @@ with open(OUT, "w", encoding="utf-8") as f:
     json.dump(out, f, ensure_ascii=False, indent=2)
 print(f"저장: {OUT}")
 print(f"총 {len(out)}개 alpha-2 국가 좌표")
+
+
+# ── 다중 해상도 TopoJSON ──
+
+# 지도별 (원본, 경도 폭, 레벨 폭[px]) — 레벨은 trade.html viewBox 폭(1200 / 600)의 ½·1·2배.
+# trade.html GEO_LEVELS와 같은 값이어야 한다.
+TOPO_LEVELS = {
+    "world": (GEO, 360.0, [600, 1200, 2400]),
+    "korea": (KOREA_GEO, 131.9 - 124.5, [300, 600, 1200]),
+}
+TOLERANCE = 2           # Douglas-Peucker 허용 오차 (격자 단위 = 0.5px)
+MIN_AREA = 16           # 이보다 작은 섬은 버림 (격자 단위² = 1px²)
+
+
+def quantize_ring(ring, x0, y0, cell):
+    """격자 정수 좌표, 연속 중복 제거, 닫힌 링(처음=끝) — 3점 미만이면 None"""
+    out = []
+    for lng, lat in ring:
+        p = (round((lng - x0) / cell), round((lat - y0) / cell))
+        if not out or out[-1] != p:
+            out.append(p)
+    if out[0] != out[-1]:
+        out.append(out[0])
+    return out if len(out) >= 4 else None
+
+
+def find_junctions(rings):
+    """이웃 점 쌍이 링마다 다른 점 = 경계가 갈라지는 곳"""
+    seen, junctions = {}, set()
+    for ring in rings:
+        pts = ring[:-1]
+        n = len(pts)
+        for i, p in enumerate(pts):
+            pair = frozenset((pts[i - 1], pts[(i + 1) % n]))
+            prev = seen.setdefault(p, pair)
+            if prev != pair:
+                junctions.add(p)
+    return junctions
+
+
+def _rotate_min(pts):
+    """junction 없는 닫힌 링의 정규형 (최소 점에서 시작) — 같은 링을 한 arc로"""
+    k = pts.index(min(pts))
+    return pts[k:] + pts[1:k + 1]
+
+
+def cut_ring(ring, junctions):
+    """닫힌 링 → arc 점 목록들 (양 끝이 junction, junction 없으면 링 전체 하나)"""
+    pts = ring[:-1]
+    starts = [i for i, p in enumerate(pts) if p in junctions]
+    if not starts:
+        return [_rotate_min(ring)]
+    k = starts[0]
+    pts = pts[k:] + pts[:k] + [pts[k]]
+    arcs, cur = [], [pts[0]]
+    for p in pts[1:]:
+        cur.append(p)
+        if p in junctions:
+            arcs.append(cur)
+            cur = [p]
+    return arcs
+
+
+def _seg_dist2(p, a, b):
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    px, py = p[0] - ax, p[1] - ay
+    d2 = dx * dx + dy * dy
+    if d2 == 0:
+        return px * px + py * py
+    t = max(0.0, min(1.0, (px * dx + py * dy) / d2))
+    ex, ey = px - t * dx, py - t * dy
+    return ex * ex + ey * ey
+
+
+def douglas_peucker(pts, tol):
+    """양 끝을 유지하는 DP. 닫힌 arc(처음=끝)는 최소 4점(삼각형)을 남긴다."""
+    n = len(pts)
+    if n <= 2:
+        return pts
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    tol2 = tol * tol
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        best, idx = -1.0, -1
+        for k in range(i + 1, j):
+            d = _seg_dist2(pts[k], pts[i], pts[j])
+            if d > best:
+                best, idx = d, k
+        if idx >= 0 and best > tol2:
+            keep[idx] = True
+            stack.extend(((i, idx), (idx, j)))
+    out = [p for p, k in zip(pts, keep) if k]
+    if pts[0] == pts[-1] and len(out) < 4:
+        # 닫힌 arc가 너무 줄면: 시작점에서 가장 먼 점 + 그 양쪽 구간에서 가장 먼 점
+        far = max(range(1, n - 1), key=lambda k: _seg_dist2(pts[k], pts[0], pts[0]))
+        side = max((k for k in range(1, n - 1) if k != far),
+                   key=lambda k: _seg_dist2(pts[k], pts[0], pts[far]), default=None)
+        idx = sorted({0, far, n - 1} | ({side} if side is not None else set()))
+        out = [pts[k] for k in idx]
+    return out
+
+
+def ring_area(pts):
+    return abs(sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(pts, pts[1:]))) / 2
+
+
+def build_topology(geo, span, width):
+    """GeoJSON FeatureCollection → TopoJSON dict (화면 폭 width px 기준)"""
+    cell = float(f"{span / (width * 4):.6g}")
+    feats = geo.get("features", [])
+    xs = [p[0] for f in feats for r in outer_rings(f.get("geometry")) for p in r]
+    ys = [p[1] for f in feats for r in outer_rings(f.get("geometry")) for p in r]
+    x0, y0 = min(xs), min(ys)
+
+    rings = []   # (피처 번호, 링)
+    for fi, f in enumerate(feats):
+        for r in outer_rings(f.get("geometry")):
+            q = quantize_ring(r, x0, y0, cell)
+            if q:
+                rings.append((fi, q))
+    junctions = find_junctions([r for _, r in rings])
+
+    # 고유 arc (정방향 키 → 번호), 링 = arc 참조 목록 (~i = 역방향)
+    table, arcs, ring_refs = {}, [], []
+    for fi, ring in rings:
+        refs = []
+        for arc in cut_ring(ring, junctions):
+            key = tuple(arc)
+            if key in table:
+                refs.append(table[key])
+                continue
+            rev = tuple(reversed(arc))
+            if arc[0] == arc[-1]:
+                rev = tuple(_rotate_min(list(rev)))
+            if rev in table:
+                refs.append(~table[rev])
+                continue
+            table[key] = len(arcs)
+            refs.append(len(arcs))
+            arcs.append(arc)
+        ring_refs.append((fi, refs))
+    simple = [douglas_peucker(a, TOLERANCE) for a in arcs]
+
+    def assemble(refs):
+        out = []
+        for i in refs:
+            a = simple[i] if i >= 0 else simple[~i][::-1]
+            out.extend(a if not out else a[1:])
+        return out
+
+    # 피처별 폴리곤 — 작아진 섬은 버리되 가장 큰 폴리곤은 유지
+    by_feat = {}
+    for fi, refs in ring_refs:
+        by_feat.setdefault(fi, []).append((ring_area(assemble(refs)), refs))
+    used, geoms = {}, []
+    for fi, f in enumerate(feats):
+        polys = sorted(by_feat.get(fi, []), key=lambda t: -t[0])
+        polys = [refs for k, (area, refs) in enumerate(polys) if k == 0 or area >= MIN_AREA]
+        polys = [[used.setdefault(i, len(used)) if i >= 0 else ~used.setdefault(~i, len(used))
+                  for i in refs] for refs in polys]
+        g = {"type": None}
+        if len(polys) == 1:
+            g = {"type": "Polygon", "arcs": [polys[0]]}
+        elif polys:
+            g = {"type": "MultiPolygon", "arcs": [[p] for p in polys]}
+        if f.get("id") is not None:
+            g["id"] = f["id"]
+        if f.get("properties"):
+            g["properties"] = f["properties"]
+        geoms.append(g)
+
+    out_arcs = [None] * len(used)
+    for i, j in used.items():
+        pts, delta, px, py = simple[i], [], 0, 0
+        for x, y in pts:
+            delta.append([x - px, y - py])
+            px, py = x, y
+        out_arcs[j] = delta
+    return {"type": "Topology",
+            "transform": {"scale": [cell, cell], "translate": [x0, y0]},
+            "arcs": out_arcs,
+            "objects": {"features": {"type": "GeometryCollection", "geometries": geoms}}}
+
+
+def _report_row(label, data, decode=None, repeat=5):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        obj = json.loads(data)
+        if decode:
+            decode(obj)
+    ms = (time.perf_counter() - t0) / repeat * 1000
+    gz = len(gzip.compress(data, 9, mtime=0))
+    return f"{label:<26} {len(data):>9,} {gz:>9,} {ms:>9.1f}"
+
+
+print(f"\n{'지오메트리':<26} {'bytes':>9} {'gzip':>9} {'parse(ms)':>9}  (arcs/points)")
+for map_name, (src, span, widths) in TOPO_LEVELS.items():
+    with open(src, "rb") as f:
+        raw = f.read()
+    print(_report_row(os.path.basename(src), raw))
+    geo = json.loads(raw)
+    for width in widths:
+        topo = build_topology(geo, span, width)
+        path = os.path.join(HERE, f"{map_name}.{width}.topo.json")
+        data = json.dumps(topo, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        n_pts = sum(len(a) for a in topo["arcs"])
+        print(_report_row(os.path.basename(path), data, decode_topology)
+              + f"  ({len(topo['arcs']):,}/{n_pts:,})")
@@ -1,31 +1,14 @@
 #!/usr/bin/env python3
-"""trade_data_v2.json → trade.html DEMO 동기화"""
-import os, json, re
+"""trade_data_v2.json → DEMO 폴백 자산(static/demo.v1.json.gz) 동기화"""
+import os, json
+
+from customs_trade_v2 import DEMO_ASSET, write_demo
 
 base = os.path.dirname(os.path.abspath(__file__))
 json_path = os.path.join(base, "trade_data_v2.json")
-html_path = os.path.join(base, "trade.html")
 
 with open(json_path, "r", encoding="utf-8") as f:
     data = json.load(f)
 
-# ranking_6d, hs2_names, hs4_names는 DEMO에서 제외 (별도 fetch로 로드)
-exclude_keys = {"ranking_6d", "hs2_names", "hs4_names"}
-demo_data = {k: v for k, v in data.items() if k not in exclude_keys}
-demo_str = json.dumps(demo_data, ensure_ascii=False)
-
-with open(html_path, "r", encoding="utf-8") as f:
-    html = f.read()
-
-# const DEMO={...}; 패턴 교체
-pattern = r'const DEMO=\{.*?\};'
-replacement = f'const DEMO={demo_str};'
-
-new_html, count = re.subn(pattern, replacement, html, count=1, flags=re.DOTALL)
-
-if count == 0:
-    print("ERROR: DEMO 패턴을 찾을 수 없습니다")
-else:
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(new_html)
-    print(f"DEMO 동기화 완료 ({os.path.getsize(html_path):,} bytes)")
+write_demo(data, os.path.join(base, DEMO_ASSET))
+print("DEMO 동기화 완료")
@@ -0,0 +1,4 @@
+import os, sys
+
+# `pytest`로 바로 돌려도 server 패키지를 찾도록 (collector 스크립트와 같은 방식)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,88 @@
+"""v2-compact 왕복 (server/compact.py encode → decode) — 손으로 만든 작은 core·샤드"""
+import copy
+import json
+
+from server.compact import FORMAT, decode, encode
+
+# 월 축: 202401~202406. 시계열마다 앞·뒤·중간이 비어 있는 경우를 섞었다.
+CORE = {
+    "generated_at": "2024-07-01",
+    "period": {"start": "202401", "end": "202406"},
+    "main_items": ["8542"],
+    "all_countries": {"US": "미국", "CN": "중국"},
+    "ranking_shards": {"85": 2, "01": 1},
+    "total_exp": {"202401": 10, "202402": 20, "202403": 30,
+                  "202404": 40, "202405": 50, "202406": 60},
+    "items": {
+        "8542": {
+            "name": "반도체",
+            "exp": {"202402": 5, "202405": 7},            # 앞·뒤 빈 달 + 중간 구멍
+            "imp": {},                                     # 빈 시계열
+            "countries": {
+                "US": {"name": "미국", "exp": {"202401": 1, "202406": 2},
+                       "wgt": {"202403": 0.5}},
+                "CN": {"name": "중국", "exp": {"202404": 3}},   # wgt 없음 (키 자체 부재)
+                "JP": {"name": "일본", "exp": {}, "wgt": None},  # 키는 있고 값이 null
+            },
+        },
+    },
+    "ranking_6d": {},
+}
+
+SHARD = {
+    "854231": {
+        "name": "프로세서",
+        "exp": {"202403": 100},
+        "wgt": None,
+        "countries": {
+            "US": {"name": "미국", "exp": {"202401": 4, "202403": 5}, "wgt": None},
+            "VN": {"name": "베트남", "exp": {"202406": 6}, "wgt": {"202406": 1}},
+        },
+    },
+    "854239": {"name": "기타", "exp": {}, "countries": {}},
+}
+
+
+def _roundtrip(obj):
+    # 실제 응답처럼 JSON 텍스트를 거쳐 디코드
+    return decode(json.loads(json.dumps(encode(copy.deepcopy(obj)))))
+
+
+def test_core_roundtrip_exact():
+    assert _roundtrip(CORE) == CORE
+
+
+def test_shard_roundtrip_exact():
+    assert _roundtrip(SHARD) == SHARD
+
+
+def test_series_gaps_and_trimmed_edges():
+    doc = encode(CORE)
+    assert doc["format"] == FORMAT
+    assert doc["months"] == ["202401", "202402", "202403", "202404", "202405", "202406"]
+    item = doc["data"]["items"]["8542"]
+    # 202402부터 202405까지 밀집 배열, 중간 빈 달은 null, 앞뒤는 잘림
+    assert item["exp"] == [1, 5, None, None, 7]
+    assert item["imp"] == []
+
+
+def test_entity_table_absent_vs_null_field():
+    table = encode(CORE)["data"]["items"]["8542"]["countries"]
+    assert table["#"] == ["US", "CN", "JP"]
+    # c의 null은 CN(필드 없음)·JP(값 null) 둘 다 — JP만 z에 적힌다
+    assert table["c"]["wgt"][1:] == [None, None]
+    assert table["z"] == {"wgt": [2]}
+    countries = _roundtrip(CORE)["items"]["8542"]["countries"]
+    assert "wgt" not in countries["CN"]
+    assert countries["JP"]["wgt"] is None
+
+
+def test_no_null_marker_when_unused():
+    table = encode({"countries": {"US": {"name": "미국", "exp": {"202401": 1}}}})
+    assert "z" not in table["data"]["countries"]
+
+
+def test_null_month_values_are_dropped():
+    # 문서화된 손실: 시계열 안의 null 값 월은 디코드하면 키가 없다
+    obj = {"exp": {"202401": 1, "202402": None, "202403": 3}}
+    assert _roundtrip(obj) == {"exp": {"202401": 1, "202403": 3}}